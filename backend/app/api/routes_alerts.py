@@ -0,0 +1,50 @@
+"""
+Alert API routes.
+
+Endpoints:
+    GET  /api/alerts           — Recent stress-band alert events (newest first)
+    GET  /api/alerts/state     — Band counts and every village currently outside Safe
+    POST /api/alerts/evaluate  — Run an evaluation now and return the alerts it raised
+
+With a shared status snapshot, only the producer worker evaluates; the
+other workers serve the events and state it publishes (503 until it has
+published) and answer /evaluate with 409 rather than re-sending alerts.
+"""
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.services.alert_engine import AlertsUnavailableError, alert_engine
+
+router = APIRouter(prefix="/api/alerts", tags=["Alerts"])
+
+
+@router.get("")
+async def list_alerts(
+    since: int = Query(default=0, ge=0, description="Only events with seq greater than this"),
+    limit: int = Query(default=100, ge=1, le=1_000),
+):
+    """Recent alert events; poll with ?since=<last seq seen> for new ones."""
+    try:
+        return alert_engine.recent(since=since, limit=limit)
+    except AlertsUnavailableError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+
+@router.get("/state")
+async def get_alert_state():
+    """Current band per stressed village, from the alert engine's state table."""
+    try:
+        return alert_engine.state()
+    except AlertsUnavailableError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+
+@router.post("/evaluate")
+async def evaluate_alerts():
+    """Evaluate band transitions against current data immediately."""
+    if not alert_engine.owns_alerts:
+        raise HTTPException(status_code=409, detail="Alerts are evaluated by another worker; retry")
+    events = await asyncio.to_thread(alert_engine.evaluate_current)
+    return {"raised": len(events), "events": events}
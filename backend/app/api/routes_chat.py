@@ -9,7 +9,8 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List
 
-from app.api.routes_villages import get_villages_status
+from app.services.shared_snapshot import shared_status
+from app.services.village_status import load_villages_status
 from app.services.ai_insight_engine import query_ollama
 from app.utils.logger import get_logger
 
@@ -47,7 +48,8 @@ async def chat_with_assistant(request: ChatRequest):
     """
     try:
         # 1. Gather live context (this uses our cached weather and DB data)
-        villages = await get_villages_status()
+        shared = shared_status.read()
+        villages = shared.rows() if shared is not None else load_villages_status()
         
         context_string = ""
         for v in villages:
@@ -87,5 +89,5 @@ async def chat_with_assistant(request: ChatRequest):
         return {"response": response_text.strip()}
         
     except Exception as e:
-        logger.error(f"Chat API failed: {e}")
+        logger.error("Chat API failed: %s", e)
         raise HTTPException(status_code=500, detail="Internal Server Error during chat generation.")
@@ -0,0 +1,167 @@
+"""
+Bulk ingestion API routes.
+
+Endpoints:
+    POST /api/ingest/groundwater   — Stream a CSV or NDJSON batch of groundwater readings
+    POST /api/ingest/rainfall-grid — Upload a gridded rainfall raster (raw, NetCDF or GeoTIFF)
+    GET  /api/ingest/rainfall-grids — List ingested rainfall grids
+
+CSV uploads need a header row. Columns / keys: village_id, gw_current_level
+(required); gw_min_required, gw_max_capacity, rainfall_dev_pct, recorded_at
+(optional, ISO-8601 with offset — used to keep the latest reading per village).
+
+Rainfall grids are streamed to disk and converted layer by layer into the
+memory-mapped grid store (see rainfall_grid).
+"""
+
+import asyncio
+import codecs
+import os
+import tempfile
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.config import settings
+from app.core.constants import INGEST_CHUNK_ROWS, RAINFALL_UPLOAD_CHUNK_BYTES
+from app.database.repository import village_repository
+from app.schemas.ingest_schema import IngestReport, RainfallGridReport
+from app.services.data_events import publish_village_data_changed
+from app.services.groundwater_ingest import SUPPORTED_FORMATS, GroundwaterIngestJob
+from app.services.rainfall_grid import (
+    RAW_PRESETS,
+    SUPPORTED_GRID_FORMATS,
+    GridFormatError,
+    ingest_rainfall_grid,
+    rainfall_grids,
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/api/ingest", tags=["Ingestion"])
+
+
+def _detect_format(request: Request, fmt: str | None) -> str:
+    if fmt:
+        return fmt
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    return "csv"
+
+
+@router.post("/groundwater", response_model=IngestReport)
+async def ingest_groundwater(
+    request: Request,
+    fmt: str | None = Query(default=None, alias="format", description="csv or ndjson (default: from Content-Type)"),
+):
+    """
+    Ingest a large batch of groundwater readings.
+
+    The body is read as a stream and validated in chunks of
+    INGEST_CHUNK_ROWS lines, so uploads are never held in memory whole.
+    Only the latest reading per village is kept and written.
+    """
+    fmt = _detect_format(request, fmt)
+    if fmt not in SUPPORTED_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{fmt}'")
+
+    job = GroundwaterIngestJob(fmt=fmt, known_village_ids=village_repository.snapshot().index)
+
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    lines: list[str] = []
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *complete, buffer = buffer.split("\n")
+        lines.extend(line.rstrip("\r") for line in complete)
+        if len(lines) >= INGEST_CHUNK_ROWS:
+            await asyncio.to_thread(job.add_lines, lines)
+            lines = []
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        lines.append(buffer.rstrip("\r"))
+    if lines:
+        await asyncio.to_thread(job.add_lines, lines)
+
+    return await asyncio.to_thread(job.commit)
+
+
+def _grid_report(meta: dict) -> dict:
+    active = meta["name"] in (settings.RAINFALL_GRID_DATASET, settings.RAINFALL_NORMAL_DATASET)
+    return {**meta, "active": active}
+
+
+@router.post("/rainfall-grid", response_model=RainfallGridReport)
+async def ingest_rainfall_grid_upload(
+    request: Request,
+    name: str = Query(..., description="Dataset name, e.g. imd_2024 or imd_normal"),
+    fmt: str = Query(..., alias="format", description="raw, netcdf or geotiff"),
+    kind: str = Query(default="daily", description="daily or normal (365- or 366-layer day-of-year climatology)"),
+    start_date: str | None = Query(default=None, description="Date of the first layer (YYYY-MM-DD)"),
+    variable: str | None = Query(default=None, description="NetCDF variable (default: first 3-D variable)"),
+    preset: str | None = Query(default=None, description=f"Raw grid preset: {', '.join(RAW_PRESETS)}"),
+    ny: int | None = Query(default=None, gt=0),
+    nx: int | None = Query(default=None, gt=0),
+    lat0: float | None = Query(default=None, description="Latitude of the south-west cell centre"),
+    lon0: float | None = Query(default=None, description="Longitude of the south-west cell centre"),
+    dlat: float | None = Query(default=None, gt=0),
+    dlon: float | None = Query(default=None, gt=0),
+    nodata: float | None = Query(default=None),
+):
+    """
+    Ingest a gridded rainfall raster into the memory-mapped grid store.
+
+    The body is streamed to a temporary file next to the store and then
+    converted one layer at a time, so neither the upload nor the raster is
+    held in memory whole. Re-ingesting a name replaces the dataset
+    atomically.
+    """
+    if fmt not in SUPPORTED_GRID_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{fmt}'")
+    if preset is not None and preset not in RAW_PRESETS:
+        raise HTTPException(status_code=422, detail=f"Unknown preset '{preset}'")
+
+    os.makedirs(rainfall_grids.directory, exist_ok=True)
+    fd, upload_path = tempfile.mkstemp(dir=rainfall_grids.directory, suffix=".upload")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pending: list[bytes] = []
+            pending_bytes = 0
+            async for chunk in request.stream():
+                pending.append(chunk)
+                pending_bytes += len(chunk)
+                if pending_bytes >= RAINFALL_UPLOAD_CHUNK_BYTES:
+                    await asyncio.to_thread(f.write, b"".join(pending))
+                    pending, pending_bytes = [], 0
+            if pending:
+                await asyncio.to_thread(f.write, b"".join(pending))
+
+        try:
+            meta = await asyncio.to_thread(
+                ingest_rainfall_grid,
+                upload_path, fmt, name,
+                kind=kind, start_date=start_date, directory=rainfall_grids.directory,
+                variable=variable, preset=preset,
+                ny=ny, nx=nx, lat0=lat0, lon0=lon0, dlat=dlat, dlon=dlon, nodata=nodata,
+            )
+        except GridFormatError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        except ImportError as exc:
+            raise HTTPException(status_code=501, detail=str(exc))
+    finally:
+        if os.path.exists(upload_path):
+            os.remove(upload_path)
+
+    report = _grid_report(meta)
+    if report["active"]:
+        publish_village_data_changed(village_repository.snapshot().ids)
+    return report
+
+
+@router.get("/rainfall-grids", response_model=list[RainfallGridReport])
+async def list_rainfall_grids():
+    """List the ingested rainfall grids."""
+    grids = [rainfall_grids.get(name) for name in rainfall_grids.names()]
+    return [_grid_report(grid.meta | {"name": grid.name}) for grid in grids if grid is not None]
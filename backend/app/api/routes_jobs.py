@@ -0,0 +1,40 @@
+"""
+Background job API routes.
+
+Endpoints:
+    GET    /api/jobs       — Recent jobs (newest first), without results
+    GET    /api/jobs/{id}  — Job status, plus the result once it has succeeded
+    DELETE /api/jobs/{id}  — Cancel a queued or running job
+"""
+
+from fastapi import APIRouter, HTTPException
+
+from app.services.job_runner import job_runner
+
+router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
+
+
+@router.get("")
+async def list_jobs():
+    """List tracked jobs, newest first."""
+    return [job.to_dict() for job in job_runner.list()]
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """Return a job's status and, once succeeded, its result."""
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict(include_result=True)
+
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job (a running job's worker is replaced)."""
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job_runner.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    return {"id": job_id, "status": "cancelling"}
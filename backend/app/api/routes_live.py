@@ -0,0 +1,56 @@
+"""
+Live update API route.
+
+Endpoints:
+    GET /api/live/stream — Server-Sent Events stream of dashboard deltas
+
+Clients receive a "snapshot" event on connect, then "villages",
+"weather" and "allocations" delta events as the hub detects changes, and
+"insight" events when a requested LLM advisory becomes available.
+Use the browser EventSource API; it reconnects automatically.
+"""
+
+import asyncio
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.constants import LIVE_KEEPALIVE_SECONDS
+from app.services.live_updates import live_hub
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/api/live", tags=["Live"])
+
+
+@router.get("/stream")
+async def stream_live_updates(request: Request):
+    """
+    Subscribe to the live update hub and stream its events as SSE.
+
+    Every client shares the hub's single computation; this handler only
+    forwards pre-encoded frames and sends keep-alive comments when idle.
+    """
+    queue = live_hub.subscribe()
+
+    async def event_source():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    frame = await asyncio.wait_for(queue.get(), timeout=LIVE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            live_hub.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,45 @@
+"""
+Map API routes.
+
+Endpoints:
+    GET /api/map/tiles/{z}/{x}/{y}.geojson  — Clustered village markers for one slippy-map tile
+
+Tiles support conditional GET (ETag / If-None-Match); the ETag changes
+whenever the village data or WSI values behind the map change. Until the
+village status can be computed, tiles answer 503.
+"""
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from app.core.constants import TILE_INDEX_ZOOM
+from app.services.map_tiles import TileIndexUnavailableError, tile_service
+from app.utils.http_cache import apply_cache_headers, compute_etag, etag_matches, not_modified
+
+router = APIRouter(prefix="/api/map", tags=["Map"])
+
+
+@router.get("/tiles/{z}/{x}/{y}.geojson")
+async def get_map_tile(z: int, x: int, y: int, request: Request):
+    """
+    GeoJSON FeatureCollection for tile z/x/y.
+
+    Features with properties.cluster = true aggregate several villages
+    (point_count, population, population-weighted wsi, max_wsi, bands);
+    the others are single villages (id, name, population, wsi, status).
+    """
+    if not 0 <= z <= TILE_INDEX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=422, detail=f"Invalid tile {z}/{x}/{y} (zoom 0–{TILE_INDEX_ZOOM})")
+
+    try:
+        version, body = await asyncio.to_thread(tile_service.tile, z, x, y)
+    except TileIndexUnavailableError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    etag = compute_etag(version, z, x, y)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    response = Response(content=body, media_type="application/geo+json")
+    apply_cache_headers(response, etag)
+    return response
@@ -0,0 +1,101 @@
+"""
+Profiling API routes (admin API key required).
+
+Endpoints:
+    POST /api/admin/profile                      — Sample all threads for N seconds, return the profile
+    GET  /api/admin/profile/status               — Session state and slow-request threshold
+    GET  /api/admin/slow-requests                — Captured slow requests (newest first)
+    GET  /api/admin/slow-requests/{request_id}   — Profile of one captured slow request
+
+Profiles are returned as format=summary (JSON, top functions), folded
+(collapsed stacks for flamegraph.pl / speedscope) or pstats (for
+pstats.Stats / snakeviz; 409 when no stack was sampled). Profiles cover
+one worker process; with several uvicorn workers, repeat the call until
+the slow worker answers.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from app.core.constants import PROFILE_DEFAULT_SECONDS, PROFILE_INTERVAL_MS, PROFILE_MAX_SECONDS
+from app.core.security import require_admin
+from app.services.profiling import ProfilerBusyError, profiling
+from app.utils.profiler import Profile
+
+router = APIRouter(prefix="/api/admin", tags=["Profiling"], dependencies=[Depends(require_admin)])
+
+PROFILE_FORMATS = ("summary", "folded", "pstats")
+
+
+def _profile_response(profile: Profile, fmt: str, name: str):
+    if fmt == "folded":
+        return Response(
+            content=profile.to_folded(),
+            media_type="text/plain; charset=utf-8",
+            headers={"Content-Disposition": f'attachment; filename="{name}.folded"'},
+        )
+    if fmt == "pstats":
+        try:
+            content = profile.to_pstats()
+        except ValueError as exc:
+            raise HTTPException(status_code=409, detail=f"{exc}; use format=summary or folded")
+        return Response(
+            content=content,
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{name}.pstats"'},
+        )
+    return profile.summary()
+
+
+def _check_format(fmt: str) -> None:
+    if fmt not in PROFILE_FORMATS:
+        raise HTTPException(status_code=422, detail=f"Unknown format '{fmt}'. Use one of: {', '.join(PROFILE_FORMATS)}")
+
+
+@router.post("/profile")
+async def run_profile(
+    seconds: float = Query(default=PROFILE_DEFAULT_SECONDS, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(default=PROFILE_INTERVAL_MS, ge=1, le=1000),
+    fmt: str = Query(default="summary", alias="format", description="summary, folded or pstats"),
+    idle: bool = Query(default=False, description="Include threads waiting for work"),
+):
+    """
+    Sample every thread of this worker for `seconds` and return the profile.
+
+    Send the slow traffic (or wait for it) while the call is running. Only
+    one session runs at a time (409 otherwise).
+    """
+    _check_format(fmt)
+    try:
+        profile = await profiling.profile(seconds, interval_ms, idle)
+    except ProfilerBusyError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return _profile_response(profile, fmt, f"profile-{int(profile.started_at)}")
+
+
+@router.get("/profile/status")
+async def profile_status():
+    """Profiling session state and slow-request capture settings."""
+    return profiling.status()
+
+
+@router.get("/slow-requests")
+async def list_slow_requests(limit: int = Query(default=50, ge=1)):
+    """Captured slow requests, newest first (profiles via /slow-requests/{request_id})."""
+    captured = list(profiling.slow_requests.captured)[:limit]
+    return [
+        {**{k: v for k, v in c.items() if k != "profile"}, "samples": c["profile"].samples}
+        for c in captured
+    ]
+
+
+@router.get("/slow-requests/{request_id}")
+async def get_slow_request_profile(
+    request_id: str,
+    fmt: str = Query(default="summary", alias="format", description="summary, folded or pstats"),
+):
+    """Stack profile captured while the request was over the latency threshold."""
+    _check_format(fmt)
+    captured = profiling.slow_requests.get(request_id)
+    if captured is None:
+        raise HTTPException(status_code=404, detail="No slow-request profile for this request ID")
+    return _profile_response(captured["profile"], fmt, f"slow-{request_id}")
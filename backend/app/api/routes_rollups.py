@@ -0,0 +1,76 @@
+"""
+Administrative rollup API routes.
+
+Endpoints:
+    GET /api/rollups/state                 — State-wide aggregate over every village
+    GET /api/rollups/districts             — One aggregate per district (highest WSI first)
+    GET /api/rollups/districts/{district}  — A district's aggregate plus its talukas
+    GET /api/rollups/talukas               — One aggregate per taluka (?district= to filter)
+
+Each aggregate carries village_count, population, population-weighted
+WSI, villages per stress band, deficit_liters and tankers_assigned. All
+endpoints are lookups into the incrementally maintained rollup index and
+support conditional GET (ETag / If-None-Match).
+"""
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from app.services.rollups import rollup_index
+from app.utils.http_cache import apply_cache_headers, compute_etag, etag_matches, not_modified
+
+router = APIRouter(prefix="/api/rollups", tags=["Rollups"])
+
+
+async def _etag(*params) -> str:
+    # The first read builds the index (weather fetch), so keep it off the event loop
+    return compute_etag(await asyncio.to_thread(rollup_index.etag_parts), *params)
+
+
+@router.get("/state")
+async def get_state_rollup(request: Request, response: Response):
+    """State-wide aggregate."""
+    etag = await _etag("state")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    apply_cache_headers(response, etag)
+    return rollup_index.unit("state", ())
+
+
+@router.get("/districts")
+async def get_district_rollups(request: Request, response: Response):
+    """Aggregates for every district."""
+    etag = await _etag("districts")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    apply_cache_headers(response, etag)
+    return rollup_index.rollup("district")
+
+
+@router.get("/districts/{district}")
+async def get_district_rollup(district: str, request: Request, response: Response):
+    """One district's aggregate, with its talukas."""
+    etag = await _etag("district", district)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    unit = rollup_index.unit("district", (district,))
+    if unit is None:
+        raise HTTPException(status_code=404, detail="District not found")
+    apply_cache_headers(response, etag)
+    return {**unit, "talukas": rollup_index.rollup("taluka", district=district)}
+
+
+@router.get("/talukas")
+async def get_taluka_rollups(
+    request: Request,
+    response: Response,
+    district: str | None = Query(default=None, description="Only talukas of this district"),
+):
+    """Aggregates for every taluka."""
+    etag = await _etag("talukas", district)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    apply_cache_headers(response, etag)
+    return rollup_index.rollup("taluka", district=district)
@@ -0,0 +1,83 @@
+"""
+What-if scenario API routes.
+
+Endpoints:
+    POST /api/scenarios/evaluate — Evaluate a batch of parameter perturbations
+                                   against live data and compare coverage
+    POST /api/scenarios/jobs     — Same, as a background job (poll /api/jobs/{id})
+"""
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException
+
+from app.core.constants import SCENARIO_PARALLEL_MIN_BATCH
+from app.database.repository import village_repository
+from app.schemas.scenario_schema import ScenarioRequest, ScenarioResponse
+from app.services.fleet_state import fleet_state
+from app.services.job_runner import JobFailedError, JobTimeoutError, job_runner
+from app.services.scenario_engine import (
+    BASELINE_PARAMS,
+    compare_with_baseline,
+    evaluate_batch,
+    prepare_base,
+    run_scenarios,
+    split_batches,
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/api/scenarios", tags=["Scenarios"])
+
+
+@router.post("/evaluate", response_model=ScenarioResponse)
+async def evaluate_scenarios(request: ScenarioRequest):
+    """
+    Evaluate what-if scenarios without touching the database.
+
+    Example body:
+        {"scenarios": [
+            {"name": "Rain -20%", "rainfall_dev_delta": -20},
+            {"name": "+15 tankers", "tanker_delta": 15}
+        ]}
+
+    Each scenario is compared against an unperturbed baseline computed
+    from the same snapshot. Large sweeps are split across the job
+    runner's worker processes.
+    """
+    villages = village_repository.snapshot()
+    tankers = fleet_state.available_tankers()
+    scenarios = [scenario.model_dump() for scenario in request.scenarios]
+
+    logger.info("Scenario sweep requested: %d scenarios", len(scenarios))
+
+    if len(scenarios) < SCENARIO_PARALLEL_MIN_BATCH:
+        return await asyncio.to_thread(run_scenarios, villages, tankers, scenarios)
+
+    base = prepare_base(villages, tankers)
+    batches = [[BASELINE_PARAMS]] + split_batches(scenarios, job_runner.workers)
+    try:
+        evaluated = await asyncio.gather(*(job_runner.run(evaluate_batch, base, batch) for batch in batches))
+    except JobTimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc))
+    except JobFailedError as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+    baseline = evaluated[0][0]
+    return compare_with_baseline(baseline, [result for batch in evaluated[1:] for result in batch])
+
+
+@router.post("/jobs", status_code=202)
+async def submit_scenario_job(request: ScenarioRequest):
+    """Queue a scenario sweep as a background job; the result is served by /api/jobs/{id}."""
+    villages = village_repository.snapshot()
+    tankers = fleet_state.available_tankers()
+    job = job_runner.submit(
+        "scenarios",
+        run_scenarios,
+        villages,
+        tankers,
+        [scenario.model_dump() for scenario in request.scenarios],
+    )
+    return job.to_dict()
@@ -2,61 +2,239 @@
 Tanker API routes — Phase 4 (Live DB).
 
 Endpoints:
-    GET /api/tankers/allocation — Calculate and return tanker allocation plan from live data
+    GET  /api/tankers/allocation          — Preview the tanker allocation plan from live data
+    POST /api/tankers/allocation/reserve  — Plan and reserve tankers (leased) for needy villages
+    POST /api/tankers/allocation/repair   — Incrementally repair reservations after a disruption
+    POST /api/tankers/allocation/jobs     — Plan preview as a background job (poll /api/jobs/{id})
+    GET  /api/tankers/fleet               — Fleet states plus available-capacity summary
+    GET  /api/tankers/travel-times        — Depot → village road travel times (road graph status)
+    POST /api/tankers/{tanker_id}/status  — Move a tanker through the fleet state machine
+
+The allocation endpoints take ?mode=priority (default, greedy by priority
+score) or ?mode=optimized (multi-depot, heterogeneous fleet, fairness).
+Every plan reports total_villages_in_need as the number of villages above
+the stress threshold, whether or not a tanker could be assigned.
+
+With a road graph configured (settings.ROAD_GRAPH_PATH), both planners
+and the repair use depot → village road travel times instead of
+straight-line distance.
+
+The allocation preview supports conditional GET (ETag / If-None-Match).
 """
 
-from fastapi import APIRouter
+import asyncio
+import math
 
-from app.database.queries import get_all_villages_with_groundwater, get_available_tankers
-from app.services.wsi_calculator import compute_wsi, compute_priority_score
-from app.services.tanker_allocator import allocate_tankers
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from app.database.repository import village_repository
+from app.schemas.tanker_schema import AllocationRepairRequest, TankerStatusUpdate
+from app.services.fleet_optimizer import build_optimized_plan, load_optimizer_inputs
+from app.services.fleet_state import (
+    FLEET_STATES,
+    PLANNING_MODES,
+    FleetConflictError,
+    InvalidTransitionError,
+    fleet_state,
+)
+from app.services.job_runner import JobFailedError, JobTimeoutError, job_runner
+from app.services.road_network import road_network
+from app.services.tanker_allocator import build_allocation_plan, select_needy_villages
+from app.utils.http_cache import apply_cache_headers, compute_etag, etag_matches, not_modified
 from app.utils.logger import get_logger
+from app.utils.single_flight import SingleFlight, flight_key
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/api/tankers", tags=["Tankers"])
 
+# Concurrent identical previews share one plan computation
+allocation_flight = SingleFlight("tankers.allocation")
+
+
+def _check_mode(mode: str) -> None:
+    if mode not in PLANNING_MODES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown mode '{mode}'. Use one of: {', '.join(PLANNING_MODES)}",
+        )
+
 
 @router.get("/allocation")
-async def get_tanker_allocation():
+async def get_tanker_allocation(request: Request, response: Response, mode: str = "priority"):
     """
     Compute tanker allocation plan from live Supabase data.
 
     Steps:
-    1. Fetch all villages with groundwater data from Supabase
+    1. Read the village snapshot from the repository and the available fleet
     2. Compute WSI and priority score for each village
-    3. Fetch available tankers from Supabase
-    4. Run deterministic allocation algorithm
-    5. Return allocation plan
-    """
-    # Step 1: Fetch village data
-    villages_raw = get_all_villages_with_groundwater()
-
-    # Step 2: Enrich with computed metrics
-    villages = []
-    for v in villages_raw:
-        wsi = compute_wsi(
-            gw_current_level=v["gw_current_level"],
-            gw_min_required=v["gw_min_required"],
-            rainfall_dev_pct=v["rainfall_dev_pct"],
+    3. Run deterministic allocation algorithm against available tankers
+    4. Return allocation plan
+
+    This is a preview — nothing is reserved. The allocation is a pure
+    function of the village/groundwater rows and the fleet state, so the
+    ETag is derived from those versions and a matching If-None-Match
+    returns 304 before any computation. Concurrent requests with the same
+    ETag share one plan computation.
+    """
+    _check_mode(mode)
+
+    # Step 1: Fetch village snapshot and available fleet
+    villages = village_repository.snapshot()
+    tankers = fleet_state.available_tankers()
+    travel = await asyncio.to_thread(road_network.matrix, villages)
+    travel_version = travel.version if travel is not None else None
+
+    if mode == "optimized":
+        depots, history = load_optimizer_inputs()
+        etag = compute_etag(villages.version, tankers, mode, depots, history, travel_version)
+    else:
+        etag = compute_etag(villages.version, tankers, travel_version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # Steps 2–3: Enrich with computed metrics and run allocation
+    if mode == "optimized":
+        # CPU-heavy: solve in a worker process so dashboard reads stay fast
+        def compute():
+            return job_runner.run(
+                build_optimized_plan, select_needy_villages(villages), tankers, depots, history, travel
+            )
+    else:
+        def compute():
+            return asyncio.to_thread(build_allocation_plan, villages=villages, tankers=tankers, travel=travel)
+
+    try:
+        plan = await allocation_flight.do(flight_key("allocation", mode, etag), compute)
+    except JobTimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc))
+    except JobFailedError as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+    # Step 4: Build response
+    apply_cache_headers(response, etag)
+    return plan
+
+
+@router.post("/allocation/jobs", status_code=202)
+async def submit_allocation_job(mode: str = "optimized"):
+    """Queue an allocation plan preview as a background job."""
+    _check_mode(mode)
+    villages = village_repository.snapshot()
+    tankers = fleet_state.available_tankers()
+    travel = await asyncio.to_thread(road_network.matrix, villages)
+
+    if mode == "optimized":
+        depots, history = load_optimizer_inputs()
+        job = job_runner.submit(
+            "allocation", build_optimized_plan, select_needy_villages(villages), tankers, depots, history, travel
+        )
+    else:
+        job = job_runner.submit("allocation", build_allocation_plan, villages, tankers, travel=travel)
+    return job.to_dict()
+
+
+@router.post("/allocation/reserve")
+async def reserve_tanker_allocation(mode: str = "priority"):
+    """
+    Plan an allocation and reserve the assigned tankers.
+
+    Each reservation is an optimistic compare-and-set on the tanker, so
+    concurrent callers never double-book a tanker; tankers lost to another
+    caller are reported under "conflicts" and their villages re-planned.
+    Reservations expire after FLEET_RESERVATION_LEASE_SECONDS unless the
+    tanker is dispatched.
+    """
+    _check_mode(mode)
+    villages = village_repository.snapshot()
+    return await asyncio.to_thread(fleet_state.reserve_allocation, villages, mode)
+
+
+@router.post("/allocation/repair")
+async def repair_tanker_allocation(delta: AllocationRepairRequest):
+    """
+    Repair the active reservations around a disruption without re-planning.
+
+    Example body:
+        {"removed_tankers": ["T002"], "village_ids": ["V004"]}
+
+    Only allocations touching the removed tankers or changed villages are
+    reworked; everything else — and every dispatched tanker — stays put.
+    """
+    villages = village_repository.snapshot()
+    try:
+        return await asyncio.to_thread(
+            fleet_state.repair_reservations, villages, delta.village_ids, delta.removed_tankers
         )
-        priority = compute_priority_score(population=v["population"], wsi=wsi)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"Tanker {exc.args[0]} not found")
 
-        villages.append({
-            **v,
-            "wsi": round(wsi, 2),
-            "priority_score": round(priority, 2),
-        })
 
-    # Step 3: Fetch tankers
-    tankers = get_available_tankers()
+@router.get("/fleet")
+async def get_fleet():
+    """Return every tanker's fleet state and a capacity summary."""
+    tankers = await asyncio.to_thread(fleet_state.all_tankers)
+    return {"summary": fleet_state.summary(), "tankers": tankers}
 
-    # Step 4: Run allocation
-    allocations = allocate_tankers(villages=villages, tankers=tankers)
 
-    # Step 5: Build response
+@router.get("/travel-times")
+async def get_travel_times(
+    depot_id: str | None = Query(default=None),
+    village_id: str | None = Query(default=None),
+):
+    """
+    Depot → village road travel times (minutes and road km) for the current
+    villages, filtered by depot and/or village, plus the road graph status.
+    Pairs without a road time have null values.
+    """
+    villages = village_repository.snapshot()
+    travel = await asyncio.to_thread(road_network.matrix, villages)
+    status = road_network.status()
+    if travel is None:
+        return {**status, "travel_times": []}
+
+    depot_ids = [depot_id] if depot_id is not None else travel.depot_ids
+    village_ids = [village_id] if village_id is not None else travel.village_ids
+    if depot_id is not None and depot_id not in travel.depot_index:
+        raise HTTPException(status_code=404, detail=f"Depot {depot_id} not found")
+    if village_id is not None and village_id not in travel.village_index:
+        raise HTTPException(status_code=404, detail=f"Village {village_id} not found")
+
+    seconds, km = travel.submatrix(depot_ids, village_ids)
     return {
-        "total_villages_in_need": len(allocations),
-        "total_tankers_assigned": len(allocations),
-        "allocations": allocations,
+        **status,
+        "travel_times": [
+            {
+                "depot_id": d,
+                "village_id": v,
+                "travel_min": None if math.isnan(seconds[i, j]) else round(float(seconds[i, j]) / 60.0, 1),
+                "road_km": None if math.isnan(km[i, j]) else round(float(km[i, j]), 2),
+            }
+            for i, d in enumerate(depot_ids)
+            for j, v in enumerate(village_ids)
+        ],
     }
+
+
+@router.post("/{tanker_id}/status")
+async def update_tanker_status(tanker_id: str, update: TankerStatusUpdate):
+    """
+    Move a tanker to a new fleet state.
+
+    Returns 404 for an unknown tanker, 422 for an unknown state and 409
+    when the transition is not allowed or the tanker changed concurrently.
+    """
+    if update.status not in FLEET_STATES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown status '{update.status}'. Use one of: {', '.join(FLEET_STATES)}",
+        )
+
+    try:
+        return await asyncio.to_thread(
+            fleet_state.transition, tanker_id, update.status, update.village_id
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Tanker {tanker_id} not found")
+    except (InvalidTransitionError, FleetConflictError) as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
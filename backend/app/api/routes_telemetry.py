@@ -0,0 +1,71 @@
+"""
+Tanker telemetry API routes.
+
+Endpoints:
+    POST /api/telemetry/pings                    — Ingest a batch of GPS pings
+    GET  /api/telemetry/tankers                  — Latest position, ETA and progress of every tanker
+    GET  /api/telemetry/tankers/{tanker_id}      — One tanker's position, ETA and recent track
+
+The ping body is {"pings": [{"tanker_id", "lat", "lng", "ts", "speed_kmh"}, ...]}
+(or the bare list); ts is Unix seconds and defaults to the time received.
+Pings are parsed without a per-ping model so large batches validate in
+about a millisecond per thousand pings; see schemas.telemetry_schema.GpsPing
+for the shape. Positions are those held by the answering worker, so with
+several uvicorn workers all pings must go to one of them (see
+services.telemetry).
+"""
+
+import asyncio
+import json
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.core.constants import TELEMETRY_MAX_BATCH
+from app.schemas.telemetry_schema import TelemetryIngestReport
+from app.services.telemetry import telemetry
+
+router = APIRouter(prefix="/api/telemetry", tags=["Telemetry"])
+
+
+def _parse_pings(body: bytes) -> list:
+    try:
+        payload = json.loads(body)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=f"Invalid JSON: {exc}")
+    pings = payload.get("pings") if isinstance(payload, dict) else payload
+    if not isinstance(pings, list):
+        raise HTTPException(status_code=422, detail="Body must be {\"pings\": [...]} or a list of pings")
+    if len(pings) > TELEMETRY_MAX_BATCH:
+        raise HTTPException(status_code=422, detail=f"At most {TELEMETRY_MAX_BATCH} pings per batch")
+    return pings
+
+
+@router.post("/pings", response_model=TelemetryIngestReport)
+async def ingest_pings(request: Request):
+    """
+    Append a batch of GPS pings to the tankers' in-memory tracks.
+
+    Pings for unknown tankers or with out-of-range coordinates or times are
+    rejected; pings no newer than a tanker's latest fix are counted as
+    stale. Positions reach the database on the next persistence run.
+    """
+    body = await request.body()
+    return await asyncio.to_thread(lambda: telemetry.ingest(_parse_pings(body)))
+
+
+@router.get("/tankers")
+async def list_tanker_positions(en_route: bool = Query(default=False, description="Only Reserved / Dispatched tankers")):
+    """Latest fix, speed, ETA and delivery progress for every tanker."""
+    positions = await asyncio.to_thread(telemetry.positions)
+    if en_route:
+        positions = [p for p in positions if p["village_id"] is not None]
+    return positions
+
+
+@router.get("/tankers/{tanker_id}")
+async def get_tanker_position(tanker_id: str, since: float | None = Query(default=None, description="Only fixes after this Unix time")):
+    """One tanker's latest fix, ETA and progress, plus its recent in-memory track."""
+    positions = await asyncio.to_thread(telemetry.positions, [tanker_id])
+    if not positions:
+        raise HTTPException(status_code=404, detail=f"Tanker '{tanker_id}' not found")
+    return {**positions[0], "track": telemetry.track(tanker_id, since) or []}
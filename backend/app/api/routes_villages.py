@@ -3,21 +3,52 @@ Village API routes — Phase 4 (Live DB + Live Weather).
 
 Endpoints:
     GET /api/villages/status                — Fetch all villages with live weather + computed WSI
-    GET /api/villages/{village_id}/insight   — Generate AI advisory for a specific village
+    GET /api/villages/risk                  — Monte Carlo WSI / deficit uncertainty bands per village
+    GET /api/villages/{village_id}/insight   — Advisory for a specific village (template now, AI when ready)
+    GET /api/villages/{village_id}/insight/upgrade — Poll the AI advisory generated in the background
+    GET /api/villages/{village_id}/forecast  — 5-day weather forecast for a specific village
+
+The status, risk and forecast endpoints support conditional GET (ETag / If-None-Match).
 """
 
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import math
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 
-from app.database.queries import get_all_villages_with_groundwater, get_village_by_id
-from app.services.wsi_calculator import compute_wsi, compute_priority_score, calculate_rainfall_deviation
+from app.core.admission import charge_llm
+from app.core.constants import (
+    INSIGHT_POLL_SECONDS,
+    MC_DEFAULT_SAMPLES,
+    MC_GW_SIGMA_M,
+    MC_MAX_SAMPLES,
+    MC_RAIN_SIGMA_PCT,
+    WSI_CRITICAL_THRESHOLD,
+)
+from app.database.repository import village_repository
+from app.services.wsi_calculator import compute_wsi, wsi_status_label
 from app.services.ai_insight_engine import generate_drought_insight
-from app.services.weather_service import fetch_weather
+from app.services.insight_templates import render_insight_template
+from app.services.insight_tiers import PENDING, RATE_LIMITED, READY, insight_upgrades
+from app.services.job_runner import JobFailedError, JobTimeoutError, job_runner
+from app.services.rainfall_grid import rainfall_grids
+from app.services.risk_simulator import simulate_village_risk
+from app.services.shared_snapshot import shared_status
+from app.services.village_status import compute_villages_status, fetch_status_inputs
+from app.utils.http_cache import apply_cache_headers, compute_etag, etag_matches, not_modified
 from app.utils.logger import get_logger
+from app.utils.single_flight import SingleFlight, flight_key
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/api/villages", tags=["Villages"])
 
+# Concurrent identical requests share one computation (see single_flight)
+status_flight = SingleFlight("villages.status")
+insight_flight = SingleFlight("villages.insight")
+
+INSIGHT_TIERS = ("auto", "template", "llm")
+
 # ---------------------------------------------------------------------------
 # Expected monthly rainfall (mm/hr equivalent) per village.
 # TODO: Replace with historical averages from a database table.
@@ -32,139 +63,255 @@ EXPECTED_RAINFALL_MM = {
 DEFAULT_EXPECTED_RAINFALL = 2.0
 
 
-def _wsi_status_label(wsi: float) -> str:
-    """Return a human-readable status label for a WSI value."""
-    if wsi > 70:
-        return "Severe Stress"
-    if wsi > 40:
-        return "Moderate Stress"
-    return "Safe"
-
-
 @router.get("/status")
-async def get_villages_status():
+async def get_villages_status(request: Request, response: Response):
     """
-    Fetch all villages from Supabase, enrich with live weather data from
+    Read all villages from the repository snapshot, enrich with live weather data from
     OpenWeather, compute WSI and priority for each, and return sorted by
     priority (highest first).
 
     Weather data is cached in-memory for 15 minutes per village.
     If the weather API is unavailable, the system falls back to the
     database-stored rainfall_dev_pct value.
+
+    The ETag is derived from the groundwater rows and weather readings the
+    result is computed from; a matching If-None-Match short-circuits with
+    304 before any WSI computation or serialisation.
+
+    Concurrent requests are coalesced: the weather fetch is shared per
+    snapshot version and the WSI computation per ETag. In multi-worker
+    deployments the view is served from the shared snapshot when it is
+    current.
+    """
+    shared = shared_status.read()
+    if shared is not None:
+        if etag_matches(request, shared.etag):
+            return not_modified(shared.etag)
+        apply_cache_headers(response, shared.etag)
+        return shared.rows()
+
+    version = village_repository.snapshot().version
+    villages, weather = await status_flight.do(
+        flight_key("status.inputs", version),
+        lambda: asyncio.to_thread(fetch_status_inputs),
+    )
+
+    etag = compute_etag(villages.version, weather, rainfall_grids.version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    results = await status_flight.do(
+        flight_key("status.compute", etag),
+        lambda: asyncio.to_thread(compute_villages_status, villages, weather),
+    )
+    apply_cache_headers(response, etag)
+    return results
+
+
+@router.get("/risk")
+async def get_villages_risk(
+    request: Request,
+    response: Response,
+    samples: int = Query(default=MC_DEFAULT_SAMPLES, ge=10, le=MC_MAX_SAMPLES),
+    gw_sigma: float = Query(default=MC_GW_SIGMA_M, ge=0, description="Groundwater noise std-dev (m)"),
+    rain_sigma: float = Query(default=MC_RAIN_SIGMA_PCT, ge=0, description="Rainfall deviation noise std-dev (pp)"),
+    seed: int | None = Query(default=None, description="RNG seed for reproducible results"),
+):
+    """
+    Monte Carlo uncertainty bands for every village.
+
+    Samples noisy groundwater and rainfall inputs, then returns WSI and
+    deficit percentiles (p10/p50/p90), the probability of exceeding
+    WSI_CRITICAL_THRESHOLD and tankers needed, sorted by risk. This runs
+    separately from /status so risk ranking never slows the main view.
+
+    With a seed the result is deterministic and served with an ETag.
     """
-    villages = get_all_villages_with_groundwater()
-
-    results = []
-    for v in villages:
-        # ---- Live Weather Integration ----
-        lat = v.get("lat", 0.0)
-        lon = v.get("lng", 0.0)
-        weather = fetch_weather(village_id=v["id"], lat=lat, lon=lon)
-
-        # Retrieve the seasonal cumulative deviation from the database
-        base_dev_pct = v.get("rainfall_dev_pct", 0.0)
-        
-        actual_rain = weather["rainfall_mm_last_hour"]
-
-        if weather["humidity_percent"] > 0:
-            if actual_rain > 0:
-                # When actual rain happens, it relieves the existing drought deficit.
-                # Example: If deficit is -15%, and it rains 2mm, we improve deviation.
-                # Using a factor of +5% deviation improvement per mm of rain.
-                rainfall_dev_pct = min(100.0, base_dev_pct + (actual_rain * 5.0))
-            else:
-                # If it's not currently raining, reverting to hourly expectation produces 
-                # an unrealistic -100% deficit. We instead stick to the realistic seasonal base.
-                rainfall_dev_pct = base_dev_pct
-        else:
-            # Weather API failed completely, fallback to DB
-            rainfall_dev_pct = base_dev_pct
-
-        wsi = compute_wsi(
-            gw_current_level=v["gw_current_level"],
-            gw_min_required=v["gw_min_required"],
-            rainfall_dev_pct=rainfall_dev_pct,
+    villages = village_repository.snapshot()
+
+    etag = None
+    if seed is not None:
+        etag = compute_etag(villages.version, samples, gw_sigma, rain_sigma, seed)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    try:
+        results = await job_runner.run(
+            simulate_village_risk,
+            villages,
+            samples=samples,
+            gw_sigma=gw_sigma,
+            rain_sigma=rain_sigma,
+            threshold=WSI_CRITICAL_THRESHOLD,
+            seed=seed,
         )
-        priority = compute_priority_score(population=v["population"], wsi=wsi)
-
-        results.append({
-            **v,
-            "wsi": round(wsi, 2),
-            "priority_score": round(priority, 2),
-            "rainfall_dev_pct": round(rainfall_dev_pct, 2),
-            "live_weather": {
-                "rainfall_mm": weather["rainfall_mm_last_hour"],
-                "humidity": weather["humidity_percent"],
-                "temp_c": weather["temperature_celsius"],
-            },
-        })
-
-    results.sort(key=lambda r: r["priority_score"], reverse=True)
+    except JobTimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc))
+    except JobFailedError as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+    if etag is not None:
+        apply_cache_headers(response, etag)
     return results
 
 
 @router.get("/{village_id}/insight")
 async def get_village_insight(
     village_id: str,
+    request: Request,
     lang: str = Query(default="English", description="Response language"),
+    tier: str = Query(default="auto", description="auto (template now, LLM when ready), template or llm (wait)"),
 ):
     """
-    Fetch village data from Supabase, compute WSI deterministically,
-    then pass pre-computed metrics to the AI engine for a 3-bullet advisory.
+    Read village data from the repository, compute WSI deterministically,
+    and return the 3-point advisory.
+
+    With tier=auto the deterministic template advisory is returned at once
+    while the AI engine generates its version in the background; poll
+    /{village_id}/insight/upgrade (every retry_after seconds) or listen for
+    "insight" events on /api/live/stream to swap it in. tier=llm waits for
+    the AI engine (503 if it fails); tier=template never calls it.
+
+    Concurrent requests for the same village, language and village data
+    share a single LLM call. Only tier=llm is rate limited as an LLM route
+    (429 when the caller's LLM bucket is empty); tier=auto takes an LLM
+    token only when it starts a new generation — if none is left it still
+    returns the template, with llm_status "rate_limited" and the seconds
+    until a retry may start one — and tier=template is never charged.
     """
-    village = get_village_by_id(village_id)
+    if tier not in INSIGHT_TIERS:
+        raise HTTPException(status_code=422, detail=f"Unknown tier '{tier}'. Use one of: {', '.join(INSIGHT_TIERS)}")
+    village = village_repository.get(village_id)
     if not village:
         raise HTTPException(status_code=404, detail="Village not found")
 
-    wsi = compute_wsi(
-        gw_current_level=village["gw_current_level"],
-        gw_min_required=village["gw_min_required"],
-        rainfall_dev_pct=village["rainfall_dev_pct"],
+    metrics = _insight_metrics(village)
+    key = flight_key("insight", lang.strip().lower(), village.to_dict())
+
+    if tier == "llm":
+        insight = await insight_flight.do(
+            key, lambda: asyncio.to_thread(generate_drought_insight, **metrics, target_language=lang)
+        )
+        if insight.startswith("Error:"):
+            raise HTTPException(status_code=503, detail=insight)
+        return _insight_response(village, lang, "llm", insight, READY)
+
+    template = render_insight_template(**metrics, target_language=lang)
+    if tier == "template":
+        return _insight_response(village, lang, "template", template, None)
+
+    if insight_upgrades.would_start(key):
+        wait = charge_llm(request.scope)
+        if wait > 0:
+            retry_after = max(1, math.ceil(wait))
+            return _insight_response(village, lang, "template", template, RATE_LIMITED, retry_after=retry_after)
+    entry = insight_upgrades.ensure(
+        key,
+        lambda: insight_flight.do(
+            key, lambda: asyncio.to_thread(generate_drought_insight, **metrics, target_language=lang)
+        ),
+        village_id=village.id,
+        language=lang,
     )
-    status_label = _wsi_status_label(wsi)
+    return _tiered_response(village, lang, template, entry)
 
-    # Compute groundwater drop (max_capacity - current)
-    g_drop = round(village.get("gw_max_capacity", 0) - village["gw_current_level"], 2)
-
-    insight = generate_drought_insight(
-        village_name=village["name"],
-        population=village["population"],
-        wsi=round(wsi, 2),
-        status=status_label,
-        r_dev=village["rainfall_dev_pct"],
-        g_drop=g_drop,
-        tankers=0,  # Will be computed from tanker allocator in future phases
-        target_language=lang,
+
+@router.get("/{village_id}/insight/upgrade")
+async def get_village_insight_upgrade(
+    village_id: str,
+    lang: str = Query(default="English", description="Response language"),
+):
+    """
+    Poll the background LLM advisory started by /{village_id}/insight.
+
+    Never starts a generation (and is not rate limited as an LLM route).
+    404 when none is tracked for the village's current data — e.g. the
+    data changed since — in which case the insight should be re-requested.
+    """
+    village = village_repository.get(village_id)
+    if not village:
+        raise HTTPException(status_code=404, detail="Village not found")
+
+    entry = insight_upgrades.get(flight_key("insight", lang.strip().lower(), village.to_dict()))
+    if entry is None:
+        raise HTTPException(status_code=404, detail="No advisory generation for the current village data")
+
+    template = render_insight_template(**_insight_metrics(village), target_language=lang)
+    return _tiered_response(village, lang, template, entry)
+
+
+def _insight_metrics(village) -> dict:
+    """Deterministic inputs of the advisory (shared by the template and the AI engine)."""
+    wsi = compute_wsi(
+        gw_current_level=village.gw_current_level,
+        gw_min_required=village.gw_min_required,
+        rainfall_dev_pct=village.rainfall_dev_pct,
     )
 
-    if insight.startswith("Error:"):
-        raise HTTPException(status_code=503, detail=insight)
+    # Compute groundwater drop (max_capacity - current)
+    g_drop = round((village.gw_max_capacity or 0) - village.gw_current_level, 2)
 
     return {
-        "village_id": village["id"],
-        "village_name": village["name"],
+        "village_name": village.name,
+        "population": village.population,
+        "wsi": round(wsi, 2),
+        "status": wsi_status_label(wsi),
+        "r_dev": village.rainfall_dev_pct,
+        "g_drop": g_drop,
+        "tankers": 0,  # Will be computed from tanker allocator in future phases
+    }
+
+
+def _tiered_response(village, lang: str, template: str, entry: dict) -> dict:
+    if entry["state"] == READY:
+        return _insight_response(village, lang, "llm", entry["insight"], READY)
+    return _insight_response(village, lang, "template", template, entry["state"])
+
+
+def _insight_response(
+    village, lang: str, tier: str, insight: str, llm_status: str | None, retry_after: float | None = None
+) -> dict:
+    response = {
+        "village_id": village.id,
+        "village_name": village.name,
         "language": lang,
         "insight": insight,
+        "tier": tier,                   # "template" or "llm"
+        "llm_status": llm_status,       # pending | ready | unavailable | rate_limited (None: not requested)
     }
+    if llm_status == PENDING:
+        response["retry_after"] = INSIGHT_POLL_SECONDS
+    elif retry_after is not None:
+        response["retry_after"] = retry_after
+    return response
 
 
 @router.get("/{village_id}/forecast")
-async def get_village_forecast(village_id: str):
+async def get_village_forecast(village_id: str, request: Request, response: Response):
     """
     Fetch 5-day weather forecast for a specific village.
+
+    The forecast is served from the weather cache, so the ETag (village row +
+    cached forecast) only changes when the cache entry is refreshed.
     """
     from app.services.weather_service import fetch_forecast
     
-    village = get_village_by_id(village_id)
+    village = village_repository.get(village_id)
     if not village:
         raise HTTPException(status_code=404, detail="Village not found")
 
-    lat = village.get("lat", 0.0)
-    lon = village.get("lng", 0.0)
+    lat = village.lat or 0.0
+    lon = village.lng or 0.0
     
     forecast = fetch_forecast(village_id=village_id, lat=lat, lon=lon)
+
+    etag = compute_etag(village.to_dict(), forecast)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    apply_cache_headers(response, etag)
     return {
         "village_id": village_id,
-        "village_name": village["name"],
+        "village_name": village.name,
         "forecast": forecast
     }
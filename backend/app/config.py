@@ -18,6 +18,45 @@ class Settings:
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
     OPENWEATHER_API_KEY: str = os.getenv("OPENWEATHER_API_KEY", "")
 
+    # Storage backend: "supabase" (remote only), "local" (embedded SQLite only,
+    # seeded from dummy_data CSVs) or "local_first" (reads from SQLite, kept in
+    # sync with Supabase; writes go to both)
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "supabase")
+    LOCAL_DB_PATH: str = os.getenv("LOCAL_DB_PATH", "local_store.db")
+
+    # Logging: level name and output format ("json" lines or "text")
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json").lower()
+
+    # Requests slower than this get a stack profile captured (0 = off)
+    SLOW_REQUEST_THRESHOLD_MS: float = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "2000"))
+
+    # Memory-mapped status snapshot shared by all uvicorn workers, e.g.
+    # /dev/shm/drought-status.snap. Empty = every worker computes its own.
+    SHARED_SNAPSHOT_PATH: str = os.getenv("SHARED_SNAPSHOT_PATH", "")
+
+    # Optional alert sinks (the in-memory queue behind /api/alerts is always on)
+    ALERT_WEBHOOK_URL: str = os.getenv("ALERT_WEBHOOK_URL", "")
+    ALERT_LOG_PATH: str = os.getenv("ALERT_LOG_PATH", "")
+
+    # Gridded rainfall rasters (see rainfall_grid). With both datasets set,
+    # the seasonal rainfall deviation is sampled from the rasters instead of
+    # the villages.rainfall_dev_pct column.
+    RAINFALL_GRID_DIR: str = os.getenv("RAINFALL_GRID_DIR", "rainfall_grids")
+    RAINFALL_GRID_DATASET: str = os.getenv("RAINFALL_GRID_DATASET", "")
+    RAINFALL_NORMAL_DATASET: str = os.getenv("RAINFALL_NORMAL_DATASET", "")
+
+    # Road network for depot → village travel times (see road_network): an
+    # OpenStreetMap XML extract (.osm, .osm.gz or .osm.bz2). Empty disables
+    # it and allocation falls back to straight-line distances.
+    ROAD_GRAPH_PATH: str = os.getenv("ROAD_GRAPH_PATH", "")
+
+    # API keys: "client:role:key" entries, comma-separated (role: user | admin).
+    # Keys can also be stored hashed in the api_keys table. With API_AUTH on,
+    # requests without a valid key are rejected with 401.
+    API_KEYS: str = os.getenv("API_KEYS", "")
+    API_AUTH: bool = os.getenv("API_AUTH", "false").lower() in ("1", "true", "yes")
+
     def validate(self) -> None:
         """Raise an error if required settings are missing."""
         missing = []
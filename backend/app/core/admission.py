@@ -0,0 +1,200 @@
+"""
+Admission control middleware — authentication, rate limits, load shedding.
+
+Runs before routing, so a rejected request costs a header lookup and a few
+float operations, never a database query, weather fetch or LLM call:
+
+1. API key (X-API-Key header, "Authorization: Bearer <key>", or
+   ?api_key= for EventSource clients that cannot set headers). An invalid
+   key is always 401; a missing key is 401 only when settings.API_AUTH is
+   on, otherwise the caller is identified by client IP.
+2. Token buckets per caller (all routes) and per caller + route group.
+   LLM routes (/api/chat, /api/villages/{id}/insight?tier=llm) get a much
+   smaller bucket. The other insight tiers are ordinary routes: tier=auto
+   charges the LLM bucket itself (charge_llm) only when it starts a new
+   background generation, and tier=template never reaches the AI engine.
+   A token is taken from both only when both have one; either exhausted →
+   429 with Retry-After.
+3. Global admission: at most ADMISSION_MAX_IN_FLIGHT requests in progress
+   (ADMISSION_MAX_LLM_IN_FLIGHT for LLM routes). Beyond that → 503 with
+   Retry-After, so overload sheds requests instead of queueing them.
+
+Health probes, API docs and CORS preflights bypass all checks; the live
+event stream is authenticated and rate limited but, being long-lived, not
+counted as in flight.
+
+Implemented as a plain ASGI middleware (no BaseHTTPMiddleware) so
+streaming responses pass through untouched.
+"""
+
+import asyncio
+import json
+import math
+import re
+from urllib.parse import parse_qs
+
+from app.config import settings
+from app.core.constants import (
+    ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_MAX_LLM_IN_FLIGHT,
+    ADMISSION_RETRY_AFTER_SECONDS,
+    RATE_LIMIT_KEY_BURST,
+    RATE_LIMIT_KEY_PER_MINUTE,
+    RATE_LIMIT_LLM_BURST,
+    RATE_LIMIT_LLM_PER_MINUTE,
+    RATE_LIMIT_MAX_BUCKETS,
+    RATE_LIMIT_ROUTE_BURST,
+    RATE_LIMIT_ROUTE_PER_MINUTE,
+)
+from app.core.security import cached_api_client, lookup_api_key
+from app.utils.logger import get_logger
+from app.utils.rate_limit import BucketTable
+
+logger = get_logger(__name__)
+
+EXEMPT_PATHS = ("/health", "/ready", "/docs", "/redoc", "/openapi.json")
+STREAM_PREFIXES = ("/api/live",)
+LLM_ROUTE = re.compile(r"^/api/chat(/.*)?$")
+INSIGHT_ROUTE = re.compile(r"^/api/villages/[^/]+/insight$")
+
+LLM_GROUP = "llm"
+
+
+def route_group(path: str, query: bytes = b"") -> str:
+    """Rate-limit group of a request: "llm" or its path's first two segments (e.g. /api/tankers)."""
+    if LLM_ROUTE.match(path) or (INSIGHT_ROUTE.match(path) and _query_param(query, "tier") == "llm"):
+        return LLM_GROUP
+    return "/".join(path.split("/", 3)[:3])
+
+
+class AdmissionStats:
+    """Process-wide admission counters (event-loop only)."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.llm_in_flight = 0
+        self.rejected = {"401": 0, "429": 0, "503": 0}
+
+    def snapshot(self) -> dict:
+        """Counters for health reporting."""
+        return {
+            "in_flight": self.in_flight,
+            "llm_in_flight": self.llm_in_flight,
+            "rejected": dict(self.rejected),
+        }
+
+
+admission_stats = AdmissionStats()
+
+# Shared with charge_llm so routes can bill LLM work they decide to start
+llm_buckets = BucketTable(RATE_LIMIT_LLM_PER_MINUTE, RATE_LIMIT_LLM_BURST, RATE_LIMIT_MAX_BUCKETS)
+
+
+def charge_llm(scope) -> float:
+    """
+    Take an LLM-bucket token for the caller of a request that the
+    middleware classified as a non-LLM route (event loop only).
+
+    Returns:
+        0.0 if allowed (or the request bypassed admission), else the seconds
+        until a token is available.
+    """
+    caller = scope.get("state", {}).get("rate_limit_caller")
+    if caller is None:
+        return 0.0
+    return llm_buckets.take((caller, LLM_GROUP))
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware applying authentication, rate limits and admission control."""
+
+    def __init__(self, app):
+        self.app = app
+        self.key_buckets = BucketTable(RATE_LIMIT_KEY_PER_MINUTE, RATE_LIMIT_KEY_BURST, RATE_LIMIT_MAX_BUCKETS)
+        self.route_buckets = BucketTable(RATE_LIMIT_ROUTE_PER_MINUTE, RATE_LIMIT_ROUTE_BURST, RATE_LIMIT_MAX_BUCKETS)
+        self.llm_buckets = llm_buckets
+        self.stats = admission_stats
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or path in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        # 1. Authentication
+        api_key = _extract_api_key(scope)
+        client = None
+        if api_key:
+            found, client = cached_api_client(api_key)
+            if not found:
+                client = await asyncio.to_thread(lookup_api_key, api_key)
+            if client is None:
+                await self._reject(send, 401, "Invalid API key")
+                return
+        elif settings.API_AUTH:
+            await self._reject(send, 401, "API key required (X-API-Key header)")
+            return
+        caller = f"key:{client.name}" if client else f"ip:{(scope.get('client') or ('unknown',))[0]}"
+        state = scope.setdefault("state", {})
+        state["api_client"] = client
+        state["rate_limit_caller"] = caller
+
+        # 2. Rate limits
+        group = route_group(path, scope.get("query_string", b""))
+        buckets = self.llm_buckets if group == LLM_GROUP else self.route_buckets
+        wait = max(self.key_buckets.peek(caller), buckets.peek((caller, group)))
+        if wait > 0:
+            await self._reject(send, 429, f"Rate limit exceeded for {group}", retry_after=wait)
+            return
+        self.key_buckets.take(caller)
+        buckets.take((caller, group))
+
+        # 3. Admission
+        if path.startswith(STREAM_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        stats = self.stats
+        llm = group == LLM_GROUP
+        if stats.in_flight >= ADMISSION_MAX_IN_FLIGHT or (llm and stats.llm_in_flight >= ADMISSION_MAX_LLM_IN_FLIGHT):
+            await self._reject(send, 503, "Server busy, retry shortly", retry_after=ADMISSION_RETRY_AFTER_SECONDS)
+            return
+
+        stats.in_flight += 1
+        stats.llm_in_flight += llm
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            stats.in_flight -= 1
+            stats.llm_in_flight -= llm
+
+    async def _reject(self, send, status: int, detail: str, retry_after: float | None = None) -> None:
+        self.stats.rejected[str(status)] += 1
+        body = json.dumps({"detail": detail}).encode("utf-8")
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+        ]
+        if retry_after is not None:
+            headers.append((b"retry-after", str(max(1, math.ceil(retry_after))).encode("ascii")))
+        if status == 401:
+            headers.append((b"www-authenticate", b"ApiKey"))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def _extract_api_key(scope) -> str | None:
+    for name, value in scope.get("headers", ()):
+        if name == b"x-api-key":
+            return value.decode("latin-1").strip() or None
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token.strip():
+                return token.strip()
+    return _query_param(scope.get("query_string", b""), "api_key") or None
+
+
+def _query_param(query: bytes, name: str) -> str | None:
+    if f"{name}=".encode("ascii") not in query:
+        return None
+    values = parse_qs(query.decode("latin-1")).get(name)
+    return values[0] if values else None
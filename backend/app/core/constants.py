@@ -19,6 +19,124 @@ WSI_MIN = 0                     # Minimum WSI value
 DEFAULT_TANKER_CAPACITY_LITERS = 10_000   # Standard tanker capacity
 MIN_WATER_REQUIREMENT_LPCD = 40           # Liters per capita per day (LPCD)
 
+# ---------------------------------------------------------------------------
+# Tanker Fleet State
+# ---------------------------------------------------------------------------
+FLEET_RESERVATION_LEASE_SECONDS = 1_800   # A Reserved tanker is released if not dispatched within this
+FLEET_REFRESH_SECONDS = 30                # Max age of the in-memory fleet index before reloading
+FLEET_RESERVE_MAX_ROUNDS = 3              # Re-plan rounds when reservations lose a concurrent race
+REPAIR_PREEMPT_MARGIN = 1.5               # Priority ratio an unserved village needs to take a held reservation
+
+# ---------------------------------------------------------------------------
+# Multi-Depot Fleet Optimizer
+# ---------------------------------------------------------------------------
+FAIRNESS_WINDOW_DAYS = 7                  # Rolling window of the service log used for fairness
+FAIRNESS_WEIGHT = 1.0                     # Extra weight for a village served 0% of its deficit in the window
+MIN_SERVICE_BONUS = 1_000.0               # Objective bonus for a village's first trip (minimum-service guarantee)
+TRAVEL_COST_PER_KM = 0.05                 # Objective cost per km of depot → village travel
+MAX_DEPOT_RADIUS_KM = 100.0               # Villages farther than this from a depot are not served from it
+
+# ---------------------------------------------------------------------------
+# Tanker Telemetry (GPS)
+# ---------------------------------------------------------------------------
+TELEMETRY_RING_SIZE = 256                 # Recent fixes kept in memory per tanker (~8 min at one ping / 2 s)
+TELEMETRY_INITIAL_TANKERS = 256           # Ring rows preallocated (grows by doubling)
+TELEMETRY_MAX_BATCH = 10_000              # Pings accepted per request
+TELEMETRY_MAX_CLOCK_SKEW_SECONDS = 60     # Pings stamped further in the future are rejected
+TELEMETRY_MAX_PING_AGE_SECONDS = 3_600    # Pings older than this are rejected
+TELEMETRY_PERSIST_SECONDS = 30            # How often new fixes are written to the database
+TELEMETRY_TRACK_INTERVAL_SECONDS = 60     # Persisted track resolution (one point per tanker per interval)
+TELEMETRY_SPEED_WINDOW_SECONDS = 120      # Recent fixes averaged for the ETA speed
+TELEMETRY_MIN_MOVING_KMH = 3.0            # Below this a tanker is reported as stopped
+TELEMETRY_DEFAULT_SPEED_KMH = 30.0        # ETA speed when the tanker is stopped or has no speed yet
+TELEMETRY_ROAD_FACTOR = 1.3               # Road distance ≈ straight-line distance × this
+TELEMETRY_ARRIVAL_RADIUS_KM = 0.3         # Within this of the village counts as arrived
+TELEMETRY_STALE_SECONDS = 300             # Latest fix older than this is flagged stale
+
+# ---------------------------------------------------------------------------
+# Road Network Travel Times
+# ---------------------------------------------------------------------------
+ROAD_SNAP_CELL_DEG = 0.02                 # Grid cell size of the nearest-road-node index (~2 km)
+ROAD_MAX_SNAP_KM = 5.0                    # Villages / depots farther than this from a road get no road time
+ROAD_ACCESS_SPEED_KMH = 15.0              # Speed over the off-road stretch to the nearest road node
+ROAD_TREE_CACHE_SIZE = 64                 # Depot shortest-path trees kept in memory
+
+# ---------------------------------------------------------------------------
+# Job Runner (process pool for CPU-heavy planning)
+# ---------------------------------------------------------------------------
+JOB_POOL_WORKERS = 0                      # Worker processes (0 → one per CPU core)
+JOB_DEFAULT_TIMEOUT_SECONDS = 120         # A job running longer is stopped and its worker replaced
+JOB_HISTORY_SIZE = 200                    # Finished jobs kept for /api/jobs/{id}
+
+# ---------------------------------------------------------------------------
+# What-If Scenario Evaluation
+# ---------------------------------------------------------------------------
+SCENARIO_MAX_BATCH = 500                  # Max scenarios per request
+SCENARIO_PARALLEL_MIN_BATCH = 8           # Smaller sweeps run inline (pool start-up isn't worth it)
+
+# ---------------------------------------------------------------------------
+# Monte Carlo Uncertainty Simulation
+# ---------------------------------------------------------------------------
+MC_DEFAULT_SAMPLES = 1_000                # Samples per village
+MC_MAX_SAMPLES = 20_000
+MC_GW_SIGMA_M = 0.5                       # Std-dev of groundwater sensor readings (meters)
+MC_RAIN_SIGMA_PCT = 10.0                  # Std-dev of rainfall deviation forecasts (percentage points)
+MC_CHUNK_ELEMENTS = 2_000_000             # Max villages × samples held in memory per chunk (~16 MB/array)
+
+# ---------------------------------------------------------------------------
+# Bulk Groundwater Ingestion
+# ---------------------------------------------------------------------------
+INGEST_CHUNK_ROWS = 5_000                 # Rows parsed and validated per chunk
+INGEST_BATCH_SIZE = 1_000                 # Rows per upsert call
+INGEST_CONCURRENCY = 4                    # Concurrent upsert calls
+INGEST_MAX_RETRIES = 3                    # Retries per failed batch
+INGEST_BACKOFF_BASE_SECONDS = 0.5         # Exponential backoff base (with jitter)
+INGEST_MAX_ERRORS_REPORTED = 50           # Rejected-row messages returned to the caller
+
+# ---------------------------------------------------------------------------
+# Gridded Rainfall
+# ---------------------------------------------------------------------------
+RAINFALL_SEASON_START_MONTH = 6           # Seasonal deviation accumulates from this date (monsoon onset)
+RAINFALL_SEASON_START_DAY = 1
+RAINFALL_UPLOAD_CHUNK_BYTES = 1 << 20     # Upload bytes buffered between disk writes
+
+# ---------------------------------------------------------------------------
+# Local Store / Sync
+# ---------------------------------------------------------------------------
+STORE_SYNC_INTERVAL_SECONDS = 300         # Supabase → local store pull interval (local_first mode)
+VILLAGE_REPO_TTL_SECONDS = 60             # Max age of the in-memory village snapshot before reloading
+
+# ---------------------------------------------------------------------------
+# Startup Warm-Up / Readiness
+# ---------------------------------------------------------------------------
+WARMUP_WEATHER_VILLAGES = 200             # Highest-priority villages whose weather is prefetched at startup
+WARMUP_CONCURRENCY = 16                   # Concurrent weather fetches during warm-up
+WARMUP_WEATHER_TIMEOUT_SECONDS = 20       # Readiness is not held back longer than this by weather
+WARMUP_RETRY_SECONDS = 5                  # Retry interval while the store is unreachable
+
+# ---------------------------------------------------------------------------
+# Shared Status Snapshot (multi-worker deployments)
+# ---------------------------------------------------------------------------
+SHARED_SNAPSHOT_REFRESH_SECONDS = 30      # Producer re-publish interval (and producer election retry)
+SHARED_SNAPSHOT_MAX_AGE_SECONDS = 120     # Older snapshots are ignored (producer presumed dead)
+
+# ---------------------------------------------------------------------------
+# Stress-Band Alerts
+# ---------------------------------------------------------------------------
+ALERT_EVAL_INTERVAL_SECONDS = 60          # Fallback evaluation when no status refresh arrived for this long
+ALERT_HYSTERESIS_WSI = 5.0                # WSI points below a threshold needed before a band is left
+ALERT_DEDUP_SECONDS = 3_600               # Re-entering the last alerted band within this window is not re-alerted
+ALERT_QUEUE_SIZE = 1_000                  # Recent events kept for GET /api/alerts
+ALERT_WEBHOOK_TIMEOUT_SECONDS = 5.0       # Per-batch webhook POST timeout
+
+# ---------------------------------------------------------------------------
+# Map Tiles (clustered GeoJSON)
+# ---------------------------------------------------------------------------
+TILE_INDEX_ZOOM = 20                      # Zoom of the Morton spatial index (also the max tile zoom)
+TILE_CLUSTER_MAX_ZOOM = 11                # Villages are clustered up to this zoom, individual markers above
+TILE_CLUSTER_GRID = 8                     # Cluster cells per tile side (power of two; 8 → 32 px cells)
+TILE_CACHE_SIZE = 2_048                   # Encoded tiles kept in the LRU
+
 # ---------------------------------------------------------------------------
 # Ollama / LLM Configuration
 # ---------------------------------------------------------------------------
@@ -33,6 +151,66 @@ OPENWEATHER_BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
 OPENWEATHER_FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"
 WEATHER_CACHE_TTL_SECONDS = 900  # 15 minutes
 
+# ---------------------------------------------------------------------------
+# Upstream Circuit Breakers (OpenWeather, Ollama)
+# ---------------------------------------------------------------------------
+BREAKER_FAILURE_THRESHOLD = 5          # Consecutive failures before the circuit opens
+BREAKER_OPEN_SECONDS = 30              # Fail-fast period before the first half-open probe
+BREAKER_MAX_OPEN_SECONDS = 300         # Cap on the cooldown (doubles after each failed probe)
+BREAKER_LATENCY_WINDOW = 200           # Successful-call latencies kept per upstream
+BREAKER_MIN_SAMPLES = 20               # Samples needed before the timeout adapts
+BREAKER_TIMEOUT_PERCENTILE = 99        # Latency percentile the adaptive timeout is based on
+BREAKER_TIMEOUT_MULTIPLIER = 2.0       # Headroom over that percentile
+
+WEATHER_TIMEOUT_SECONDS = 5.0          # Max (and initial) OpenWeather request timeout
+WEATHER_MIN_TIMEOUT_SECONDS = 0.5      # Floor for the adaptive OpenWeather timeout
+OLLAMA_TIMEOUT_SECONDS = 120.0         # Max (and initial) Ollama request timeout
+OLLAMA_MIN_TIMEOUT_SECONDS = 10.0      # Floor for the adaptive Ollama timeout
+OLLAMA_RESPONSE_CACHE_SIZE = 256       # Last good answers kept (by prompt) to serve while Ollama is down
+INSIGHT_UPGRADE_CACHE_SIZE = 1_024     # LLM advisories (pending or finished) tracked for the tiered insight
+INSIGHT_UPGRADE_RETRY_SECONDS = 60     # A failed LLM advisory is not re-requested before this
+INSIGHT_POLL_SECONDS = 3               # Poll interval suggested to clients while an advisory is pending
+
+# ---------------------------------------------------------------------------
+# Live Updates (Server-Sent Events)
+# ---------------------------------------------------------------------------
+LIVE_REFRESH_INTERVAL_SECONDS = 30     # How often the hub recomputes while clients are connected
+LIVE_KEEPALIVE_SECONDS = 15            # Comment ping to keep idle proxies from closing the stream
+LIVE_SUBSCRIBER_QUEUE_SIZE = 64        # Pending events per client before it is dropped as too slow
+
+# ---------------------------------------------------------------------------
+# Authentication, Rate Limits and Admission Control
+# ---------------------------------------------------------------------------
+API_KEY_CACHE_TTL_SECONDS = 300        # Store key lookups (hits and misses) cached this long
+RATE_LIMIT_KEY_PER_MINUTE = 600        # Per caller, across all routes
+RATE_LIMIT_KEY_BURST = 120
+RATE_LIMIT_ROUTE_PER_MINUTE = 240      # Per caller and route group (e.g. /api/tankers)
+RATE_LIMIT_ROUTE_BURST = 60
+RATE_LIMIT_LLM_PER_MINUTE = 6          # Per caller on LLM work (chat, AI insight generation)
+RATE_LIMIT_LLM_BURST = 3
+RATE_LIMIT_MAX_BUCKETS = 50_000        # Idle buckets evicted beyond this (LRU)
+ADMISSION_MAX_IN_FLIGHT = 256          # Requests in progress before new ones get 503
+ADMISSION_MAX_LLM_IN_FLIGHT = 8        # LLM requests in progress before new ones get 503
+ADMISSION_RETRY_AFTER_SECONDS = 2      # Retry-After sent with 503
+
+# ---------------------------------------------------------------------------
+# Logging
+# ---------------------------------------------------------------------------
+LOG_QUEUE_SIZE = 10_000                # Records buffered for the writer thread before new ones are dropped
+LOG_SAMPLE_PER_SECOND = 5              # Lines per second let through per sampled hot-path call site
+LOG_SAMPLE_BURST = 20
+
+# ---------------------------------------------------------------------------
+# Profiling (admin) and Slow-Request Capture
+# ---------------------------------------------------------------------------
+PROFILE_DEFAULT_SECONDS = 10           # On-demand profile duration when not given
+PROFILE_MAX_SECONDS = 60
+PROFILE_INTERVAL_MS = 5                # Stack sampling interval (on-demand and slow requests)
+PROFILE_MAX_STACK_DEPTH = 128          # Deeper frames are cut off (outermost kept)
+SLOW_REQUEST_CHECK_SECONDS = 0.05      # Watchdog check interval while no request is slow
+SLOW_REQUEST_HISTORY = 50              # Captured slow-request profiles kept
+SLOW_REQUEST_MAX_SAMPLES = 2_000       # Samples kept per slow request (10 s at 5 ms)
+
 # ---------------------------------------------------------------------------
 # API Configuration
 # ---------------------------------------------------------------------------
@@ -40,3 +218,5 @@ API_PREFIX = "/api"
 ALLOWED_ORIGINS = [
     "http://localhost:5173",
 ]
+# Clients may store responses but must revalidate (If-None-Match) before reuse
+HTTP_CACHE_CONTROL = "private, no-cache"
@@ -0,0 +1,70 @@
+"""
+Request context middleware — request IDs for log correlation.
+
+Each HTTP request gets an ID: the caller's X-Request-ID header when it is
+a sane token (so IDs can be traced across services), otherwise a new
+random one. The ID is stored in logger.request_id_var for the duration of
+the request — every log line written while serving it, including from
+asyncio.to_thread workers, carries it — and returned in the X-Request-ID
+response header.
+
+The middleware also reports each request to the slow-request monitor
+(see services.profiling), which captures a stack profile of requests
+slower than settings.SLOW_REQUEST_THRESHOLD_MS. Long-lived streams and
+the profiling endpoint itself are not monitored.
+
+Implemented as a plain ASGI middleware (no BaseHTTPMiddleware) so
+streaming responses pass through untouched.
+"""
+
+import re
+import uuid
+
+from app.core.admission import STREAM_PREFIXES
+from app.services.profiling import profiling
+from app.utils.logger import request_id_var
+
+REQUEST_ID_HEADER = b"x-request-id"
+VALID_REQUEST_ID = re.compile(rb"^[A-Za-z0-9._\-]{1,64}$")
+UNMONITORED_PREFIXES = (*STREAM_PREFIXES, "/api/admin/profile")
+
+
+class RequestContextMiddleware:
+    """ASGI middleware assigning a request ID to each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == REQUEST_ID_HEADER and VALID_REQUEST_ID.match(value):
+                request_id = value.decode("ascii")
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex[:16]
+        scope.setdefault("state", {})["request_id"] = request_id
+        header = (REQUEST_ID_HEADER, request_id.encode("ascii"))
+        status = None
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", ()), header]
+            await send(message)
+
+        path = scope.get("path", "")
+        monitor = None
+        if not path.startswith(UNMONITORED_PREFIXES):
+            monitor = profiling.slow_requests.begin(request_id, scope["method"], path)
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
+            profiling.slow_requests.end(monitor, status)
@@ -1,11 +1,102 @@
 """
 Security utilities for the Drought Warning & Smart Tanker Management System.
 
-Placeholder for API key validation, authentication, and authorization logic.
+API keys identify a client and its role ("user" or "admin"). Keys come
+from two places:
+
+    settings.API_KEYS        — static "client:role:key" entries (env)
+    the api_keys table       — SHA-256 key hashes, looked up on demand
+
+Only hashes are compared or cached. Store lookups are cached for
+API_KEY_CACHE_TTL_SECONDS, including misses, so a client retrying with a
+bad key does not turn into a database query per request.
+
+Enforcement (401 without a valid key) is switched on by settings.API_AUTH;
+the admission-control middleware resolves the key and exposes the caller
+as request.state.api_client.
 """
 
-# TODO: Implement API key validation middleware if needed
-# TODO: Implement role-based access control for admin endpoints
+import hashlib
+import threading
+import time
+from typing import NamedTuple
+
+from fastapi import HTTPException, Request
+
+from app.config import settings
+from app.core.constants import API_KEY_CACHE_TTL_SECONDS
+from app.database.queries import get_api_client
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ROLES = ("user", "admin")
+
+
+class ApiClient(NamedTuple):
+    name: str
+    role: str
+
+
+def hash_api_key(api_key: str) -> str:
+    """SHA-256 hex digest of a key (the form stored in api_keys.key_hash)."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def _parse_static_keys(spec: str) -> dict[str, ApiClient]:
+    keys = {}
+    for entry in filter(None, (e.strip() for e in spec.split(","))):
+        parts = entry.split(":", 2)
+        if len(parts) != 3 or parts[1] not in ROLES or not parts[2]:
+            logger.error("Ignoring malformed API_KEYS entry for client '%s'", parts[0])
+            continue
+        keys[hash_api_key(parts[2])] = ApiClient(parts[0], parts[1])
+    return keys
+
+
+_static_keys = _parse_static_keys(settings.API_KEYS)
+
+# key_hash → (client or None, expires_at)
+_cache: dict[str, tuple[ApiClient | None, float]] = {}
+_cache_lock = threading.Lock()
+
+
+def cached_api_client(api_key: str) -> tuple[bool, ApiClient | None]:
+    """
+    Non-blocking lookup.
+
+    Returns:
+        (found, client): found is False when the store has to be asked
+        (see lookup_api_key); client is None for an invalid key.
+    """
+    key_hash = hash_api_key(api_key)
+    client = _static_keys.get(key_hash)
+    if client is not None:
+        return True, client
+    entry = _cache.get(key_hash)
+    if entry is not None and entry[1] > time.monotonic():
+        return True, entry[0]
+    return False, None
+
+
+def lookup_api_key(api_key: str) -> ApiClient | None:
+    """Resolve a key to its client, querying the store on a cache miss (blocking)."""
+    found, client = cached_api_client(api_key)
+    if found:
+        return client
+
+    key_hash = hash_api_key(api_key)
+    try:
+        row = get_api_client(key_hash)
+    except Exception as exc:
+        # Not cached: the next request retries the store
+        logger.error("API key lookup failed: %s", exc)
+        return None
+
+    client = ApiClient(row["client"], row["role"]) if row else None
+    with _cache_lock:
+        _cache[key_hash] = (client, time.monotonic() + API_KEY_CACHE_TTL_SECONDS)
+    return client
 
 
 def validate_api_key(api_key: str) -> bool:
@@ -18,5 +109,14 @@ def validate_api_key(api_key: str) -> bool:
     Returns:
         True if the key is valid, False otherwise.
     """
-    # TODO: Implement actual API key validation logic
-    raise NotImplementedError("API key validation not yet implemented")
+    return lookup_api_key(api_key) is not None
+
+
+def require_admin(request: Request) -> ApiClient:
+    """FastAPI dependency: the caller must present an admin API key."""
+    client = getattr(request.state, "api_client", None)
+    if client is None:
+        raise HTTPException(status_code=401, detail="API key required")
+    if client.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin API key required")
+    return client
@@ -0,0 +1,285 @@
+"""
+Embedded local storage backend (SQLite).
+
+Keeps the villages, groundwater, tankers and depots tables (plus the
+service log used for allocation fairness and the downsampled tanker GPS
+tracks) in a single SQLite file
+with primary-key and status indexes, so reads are local-latency and the
+dashboard keeps serving when Supabase is unreachable. Tables can be bulk
+loaded from the dummy_data CSVs or replaced wholesale by the sync job.
+
+SQLite ships with Python, so this backend adds no dependencies.
+"""
+
+import csv
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Default CSVs used to seed an empty store in "local" mode
+DUMMY_DATA_DIR = Path(__file__).resolve().parents[2] / "database" / "dummy_data"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS villages (
+    village_id   TEXT PRIMARY KEY,
+    village_name TEXT NOT NULL,
+    population   INTEGER NOT NULL,
+    lat          REAL,
+    lng          REAL,
+    taluka       TEXT,
+    district     TEXT
+);
+CREATE TABLE IF NOT EXISTS groundwater (
+    village_id       TEXT PRIMARY KEY REFERENCES villages(village_id),
+    gw_min_required  REAL,
+    gw_max_capacity  REAL,
+    gw_current_level REAL,
+    rainfall_dev_pct REAL
+);
+CREATE TABLE IF NOT EXISTS tankers (
+    tanker_id           TEXT PRIMARY KEY,
+    capacity_liters     REAL,
+    status              TEXT,
+    version             INTEGER NOT NULL DEFAULT 0,
+    assigned_village_id TEXT,
+    lease_expires_at    REAL,
+    depot_id            TEXT,
+    current_location    TEXT,
+    location_updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tankers_status ON tankers(status);
+CREATE TABLE IF NOT EXISTS depots (
+    depot_id            TEXT PRIMARY KEY,
+    depot_name          TEXT,
+    lat                 REAL,
+    lng                 REAL,
+    daily_supply_liters REAL
+);
+CREATE TABLE IF NOT EXISTS service_log (
+    entry_id         TEXT PRIMARY KEY,
+    service_date     TEXT NOT NULL,
+    village_id       TEXT NOT NULL,
+    delivered_liters REAL,
+    deficit_liters   REAL
+);
+CREATE INDEX IF NOT EXISTS idx_service_log_date ON service_log(service_date);
+CREATE TABLE IF NOT EXISTS tanker_positions (
+    entry_id    TEXT PRIMARY KEY,
+    tanker_id   TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    lat         REAL,
+    lng         REAL,
+    speed_kmh   REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tanker_positions_tanker ON tanker_positions(tanker_id);
+CREATE TABLE IF NOT EXISTS api_keys (
+    key_hash    TEXT PRIMARY KEY,
+    client_name TEXT NOT NULL,
+    role        TEXT NOT NULL DEFAULT 'user',
+    active      INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    table_name TEXT PRIMARY KEY,
+    synced_at  REAL,
+    row_count  INTEGER
+);
+"""
+
+# Columns added after the first release: (table, column, DDL) applied to
+# stores created by an older version
+MIGRATIONS = (
+    ("tankers", "version", "INTEGER NOT NULL DEFAULT 0"),
+    ("tankers", "assigned_village_id", "TEXT"),
+    ("tankers", "lease_expires_at", "REAL"),
+    ("tankers", "depot_id", "TEXT"),
+    ("tankers", "current_location", "TEXT"),
+    ("tankers", "location_updated_at", "REAL"),
+)
+
+# Primary key per table (used for upserts)
+TABLE_KEYS = {
+    "villages": "village_id",
+    "groundwater": "village_id",
+    "tankers": "tanker_id",
+    "depots": "depot_id",
+    "service_log": "entry_id",
+    "tanker_positions": "entry_id",
+    "api_keys": "key_hash",
+}
+
+
+class LocalStore:
+    """
+    Table access backed by an embedded SQLite database.
+
+    One connection is shared across threads behind a lock; SQLite reads on
+    these table sizes take microseconds, so contention is negligible.
+    """
+
+    name = "local"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+            self._columns = {
+                table: [row["name"] for row in self._conn.execute(f"PRAGMA table_info({table})")]
+                for table in TABLE_KEYS
+            }
+        logger.info("Local store opened at %s", path)
+
+    # -----------------------------------------------------------------------
+    # Table API (same shape as SupabaseStore)
+    # -----------------------------------------------------------------------
+
+    def select_all(self, table: str, columns: str = "*") -> list[dict]:
+        """Return every row of a table."""
+        self._check_table(table)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {columns} FROM {table}").fetchall()
+        return [dict(row) for row in rows]
+
+    def select_where(self, table: str, column: str, value) -> list[dict]:
+        """Return rows where column == value (served from an index where one exists)."""
+        self._check_column(table, column)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM {table} WHERE {column} = ?", (value,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def upsert(self, table: str, rows: list[dict], key: str) -> None:
+        """Insert or update rows, matching on the key column."""
+        if not rows:
+            return
+        columns = self._known_columns(table, rows[0])
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != key)
+        sql = (
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT({key}) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING")
+        )
+        with self._lock, self._conn:
+            self._conn.executemany(sql, [tuple(row.get(c) for c in columns) for row in rows])
+
+    def update_where(self, table: str, changes: dict, match: dict) -> int:
+        """
+        Update rows matching every column == value in match.
+
+        Returns:
+            Number of rows updated (0 means the match — e.g. an expected
+            version — no longer holds).
+        """
+        for column in (*changes, *match):
+            self._check_column(table, column)
+        assignments = ", ".join(f"{c} = ?" for c in changes)
+        conditions = " AND ".join(f"{c} = ?" for c in match)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE {table} SET {assignments} WHERE {conditions}",
+                (*changes.values(), *match.values()),
+            )
+        return cursor.rowcount
+
+    def update_if_newer(self, table: str, rows: list[dict], key: str, column: str) -> int:
+        """
+        Update each row (matched on key) unless the stored column value is
+        already at least the row's, so concurrent writers cannot move it back.
+
+        Returns:
+            Number of rows updated.
+        """
+        if not rows:
+            return 0
+        self._check_column(table, key)
+        self._check_column(table, column)
+        columns = [c for c in self._known_columns(table, rows[0]) if c != key]
+        assignments = ", ".join(f"{c} = ?" for c in columns)
+        sql = f"UPDATE {table} SET {assignments} WHERE {key} = ? AND ({column} IS NULL OR {column} < ?)"
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                sql, [(*(row.get(c) for c in columns), row[key], row[column]) for row in rows]
+            )
+        return cursor.rowcount
+
+    # -----------------------------------------------------------------------
+    # Bulk load / sync
+    # -----------------------------------------------------------------------
+
+    def replace_table(self, table: str, rows: list[dict]) -> None:
+        """Atomically replace a table's contents (used by the sync job)."""
+        self._check_table(table)
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {table}")
+            if rows:
+                columns = self._known_columns(table, rows[0])
+                self._conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})",
+                    [tuple(row.get(c) for c in columns) for row in rows],
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (table_name, synced_at, row_count) VALUES (?, ?, ?)",
+                (table, time.time(), len(rows)),
+            )
+
+    def load_csv_dir(self, directory: Path = DUMMY_DATA_DIR) -> None:
+        """Bulk load villages, groundwater, tankers and depots from <table>.csv files."""
+        # Order matters: villages first (referenced by groundwater)
+        for table in ("villages", "groundwater", "tankers", "depots"):
+            csv_path = Path(directory) / f"{table}.csv"
+            if not csv_path.exists():
+                logger.warning("Local store seed file missing: %s", csv_path)
+                continue
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+            self.replace_table(table, rows)
+            logger.info("Local store loaded %d rows into '%s' from %s", len(rows), table, csv_path)
+
+    def is_empty(self) -> bool:
+        """True if no village rows have been loaded yet."""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM villages LIMIT 1").fetchone() is None
+
+    def sync_state(self) -> dict:
+        """Return {table: {"synced_at": ts, "row_count": n}} for each synced table."""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM sync_state").fetchall()
+        return {r["table_name"]: {"synced_at": r["synced_at"], "row_count": r["row_count"]} for r in rows}
+
+    # -----------------------------------------------------------------------
+    # Internal Helpers
+    # -----------------------------------------------------------------------
+
+    def _migrate(self) -> None:
+        """Add columns introduced after a store file was created."""
+        for table, column, ddl in MIGRATIONS:
+            existing = {row["name"] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+                logger.info("Local store migrated: added %s.%s", table, column)
+
+    def _check_table(self, table: str) -> None:
+        if table not in self._columns:
+            raise ValueError(f"Unknown table '{table}'")
+
+    def _check_column(self, table: str, column: str) -> None:
+        self._check_table(table)
+        if column not in self._columns[table]:
+            raise ValueError(f"Unknown column '{table}.{column}'")
+
+    def _known_columns(self, table: str, row: dict) -> list[str]:
+        """Columns of the row that exist in the local schema (extra remote columns are dropped)."""
+        self._check_table(table)
+        return [c for c in row if c in self._columns[table]]
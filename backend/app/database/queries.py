@@ -2,15 +2,64 @@
 Database query functions — Phase 4.
 
 Pure data-access layer — no business logic.
-All functions return raw data from Supabase.
+All functions return raw data from the configured store (Supabase or the
+embedded local store — see app.database.store).
 
 Schema:
-  - villages: village_id, village_name, population, lat, lng
+  - villages: village_id, village_name, population, lat, lng, taluka, district
   - groundwater: village_id (FK), gw_min_required, gw_max_capacity, gw_current_level, rainfall_dev_pct
-  - tankers: tanker_id, capacity_liters, status
+  - tankers: tanker_id, capacity_liters, status, version, assigned_village_id, lease_expires_at, depot_id
+  - depots: depot_id, depot_name, lat, lng, daily_supply_liters
+  - service_log: entry_id, service_date, village_id, delivered_liters, deficit_liters
+  - tanker_positions: entry_id, tanker_id, recorded_at, lat, lng, speed_kmh
+  - api_keys: key_hash, client_name, role, active
+
+The fleet state columns on tankers (used for optimistic concurrency and
+reservation leases) need this migration on an existing Supabase project:
+
+    ALTER TABLE tankers
+        ADD COLUMN version integer NOT NULL DEFAULT 0,
+        ADD COLUMN assigned_village_id text,
+        ADD COLUMN lease_expires_at double precision;
+
+Multi-depot allocation adds the depot link and two tables:
+
+    ALTER TABLE tankers ADD COLUMN depot_id text;
+    CREATE TABLE depots (
+        depot_id text PRIMARY KEY, depot_name text,
+        lat double precision, lng double precision,
+        daily_supply_liters double precision
+    );
+    CREATE TABLE service_log (
+        entry_id text PRIMARY KEY, service_date date NOT NULL,
+        village_id text NOT NULL,
+        delivered_liters double precision, deficit_liters double precision
+    );
+
+GPS telemetry keeps each tanker's latest fix on the tankers row and a
+downsampled track:
+
+    ALTER TABLE tankers
+        ADD COLUMN current_location text,
+        ADD COLUMN location_updated_at double precision;
+    CREATE TABLE tanker_positions (
+        entry_id text PRIMARY KEY, tanker_id text NOT NULL,
+        recorded_at double precision NOT NULL,
+        lat double precision, lng double precision, speed_kmh double precision
+    );
+    CREATE INDEX ON tanker_positions (tanker_id);
+
+API-key authentication reads hashed keys (never the keys themselves):
+
+    CREATE TABLE api_keys (
+        key_hash text PRIMARY KEY, client_name text NOT NULL,
+        role text NOT NULL DEFAULT 'user', active boolean NOT NULL DEFAULT true
+    );
 """
 
-from app.database.supabase_client import supabase
+from datetime import date
+
+from app.database.store import get_store
 
 
 def get_all_villages_with_groundwater() -> list[dict]:
@@ -20,16 +69,17 @@ def get_all_villages_with_groundwater() -> list[dict]:
     Returns:
         A list of village dictionaries containing groundwater metrics.
     """
+    store = get_store()
+
     # Fetch villages
-    villages_res = supabase().table("villages").select("*").execute()
-    villages = {v["village_id"]: v for v in villages_res.data}
+    villages = {v["village_id"]: v for v in store.select_all("villages")}
 
     # Fetch groundwater
-    gw_res = supabase().table("groundwater").select("*").execute()
+    groundwater = store.select_all("groundwater")
 
     # Join in Python (Supabase-py doesn't support direct joins easily)
     results = []
-    for gw in gw_res.data:
+    for gw in groundwater:
         vid = gw["village_id"]
         if vid in villages:
             v = villages[vid]
@@ -39,6 +89,8 @@ def get_all_villages_with_groundwater() -> list[dict]:
                 "population": v["population"],
                 "lat": v.get("lat"),
                 "lng": v.get("lng"),
+                "taluka": v.get("taluka") or None,
+                "district": v.get("district") or None,
                 "gw_current_level": gw["gw_current_level"],
                 "gw_min_required": gw["gw_min_required"],
                 "gw_max_capacity": gw.get("gw_max_capacity"),
@@ -48,69 +100,185 @@ def get_all_villages_with_groundwater() -> list[dict]:
     return results
 
 
-def get_available_tankers() -> list[dict]:
+def get_village_ids() -> set[str]:
     """
-    Fetch all tankers that are currently available for dispatch.
+    Fetch the set of all known village IDs.
 
     Returns:
-        A list of tanker dictionaries with capacity and location info.
+        A set of village_id strings.
     """
-    response = (
-        supabase().table("tankers")
-        .select("*")
-        .eq("status", "Available")
-        .execute()
-    )
+    return {v["village_id"] for v in get_store().select_all("villages", "village_id")}
+
+
+def upsert_groundwater_rows(rows: list[dict]) -> None:
+    """
+    Upsert a batch of groundwater rows keyed on village_id.
+
+    Args:
+        rows: Groundwater dicts; every row in the batch must carry the same
+            set of columns.
+    """
+    get_store().upsert("groundwater", rows, key="village_id")
+
 
-    # Normalize field names for the tanker_allocator
+def get_all_tankers() -> list[dict]:
+    """
+    Fetch every tanker with its fleet state.
+
+    Returns:
+        A list of tanker dicts including version and lease fields.
+    """
     return [
         {
             "id": t["tanker_id"],
             "capacity_liters": t["capacity_liters"],
             "status": t["status"],
+            "version": t.get("version") or 0,
+            "assigned_village_id": t.get("assigned_village_id"),
+            "lease_expires_at": t.get("lease_expires_at"),
+            "depot_id": t.get("depot_id"),
         }
-        for t in response.data
+        for t in get_store().select_all("tankers")
     ]
 
 
-def get_village_by_id(village_id: str) -> dict | None:
+def update_tanker_if_version(tanker_id: str, expected_version: int, changes: dict) -> bool:
     """
-    Fetch a single village with its groundwater data by village_id.
+    Apply changes to a tanker only if its version is still expected_version.
+
+    The version is incremented as part of the same conditional update, so
+    of two concurrent writers holding the same version exactly one wins.
 
     Args:
-        village_id: The unique identifier of the village (e.g. "V001").
+        tanker_id: The tanker to update.
+        expected_version: Version the caller last read.
+        changes: Column values to set (status, assigned_village_id, ...).
 
     Returns:
-        A merged village dict, or None if not found.
-    """
-    v_res = (
-        supabase().table("villages")
-        .select("*")
-        .eq("village_id", village_id)
-        .single()
-        .execute()
+        True if the update was applied, False if the tanker changed meanwhile.
+    """
+    updated = get_store().update_where(
+        "tankers",
+        {**changes, "version": expected_version + 1},
+        {"tanker_id": tanker_id, "version": expected_version},
     )
-    v = v_res.data
-    if not v:
-        return None
-
-    gw_res = (
-        supabase().table("groundwater")
-        .select("*")
-        .eq("village_id", village_id)
-        .single()
-        .execute()
+    return updated > 0
+
+
+def get_depots() -> list[dict]:
+    """
+    Fetch all water-source depots.
+
+    Returns:
+        A list of depot dicts with location and daily supply.
+    """
+    return [
+        {
+            "id": d["depot_id"],
+            "name": d.get("depot_name"),
+            "lat": d.get("lat"),
+            "lng": d.get("lng"),
+            "daily_supply_liters": d.get("daily_supply_liters"),
+        }
+        for d in get_store().select_all("depots")
+    ]
+
+
+def get_service_history(days: list[date]) -> dict[str, dict]:
+    """
+    Sum delivered and deficit liters per village from the service log.
+
+    Args:
+        days: Service dates to include (one indexed lookup per day).
+
+    Returns:
+        {village_id: {"delivered_liters": float, "deficit_liters": float}}
+    """
+    store = get_store()
+    rows = [row for day in days for row in store.select_where("service_log", "service_date", day.isoformat())]
+
+    totals: dict[str, dict] = {}
+    for row in rows:
+        entry = totals.setdefault(row["village_id"], {"delivered_liters": 0.0, "deficit_liters": 0.0})
+        entry["delivered_liters"] += float(row.get("delivered_liters") or 0)
+        entry["deficit_liters"] += float(row.get("deficit_liters") or 0)
+    return totals
+
+
+def record_village_service(service_date: date, service: dict[str, tuple[float, float]]) -> None:
+    """
+    Add planned deliveries to the service log for one day.
+
+    Deliveries accumulate over repeated calls on the same day; the day's
+    deficit is the largest one seen.
+
+    Args:
+        service_date: The service day.
+        service: {village_id: (delivered_liters, deficit_liters)}.
+    """
+    if not service:
+        return
+    store = get_store()
+    day = service_date.isoformat()
+    existing = {row["village_id"]: row for row in store.select_where("service_log", "service_date", day)}
+
+    rows = []
+    for vid, (delivered, deficit) in service.items():
+        prev = existing.get(vid, {})
+        rows.append({
+            "entry_id": f"{day}:{vid}",
+            "service_date": day,
+            "village_id": vid,
+            "delivered_liters": float(prev.get("delivered_liters") or 0) + delivered,
+            "deficit_liters": max(float(prev.get("deficit_liters") or 0), deficit),
+        })
+    store.upsert("service_log", rows, key="entry_id")
+
+
+def record_tanker_positions(rows: list[dict]) -> None:
+    """
+    Write downsampled GPS fixes to the tanker track table.
+
+    Args:
+        rows: tanker_positions rows; entry_id is "<tanker_id>:<interval>",
+            so a later fix in the same interval replaces the earlier one.
+    """
+    get_store().upsert("tanker_positions", rows, key="entry_id")
+
+
+def update_tanker_locations(locations: dict[str, tuple[float, float, float]]) -> None:
+    """
+    Set each tanker's current_location ("lat,lng") and location_updated_at.
+
+    Only the location columns are written, so the fleet-state version and
+    lease columns are left untouched. A row whose stored
+    location_updated_at is already newer is skipped, so a worker holding
+    older fixes can never move a tanker's location backwards.
+
+    Args:
+        locations: {tanker_id: (lat, lng, recorded_at)} for known tankers.
+    """
+    if not locations:
+        return
+    get_store().update_if_newer(
+        "tankers",
+        [
+            {"tanker_id": tid, "current_location": f"{lat:.6f},{lng:.6f}", "location_updated_at": ts}
+            for tid, (lat, lng, ts) in locations.items()
+        ],
+        key="tanker_id",
+        column="location_updated_at",
     )
-    gw = gw_res.data
-
-    return {
-        "id": v["village_id"],
-        "name": v["village_name"],
-        "population": v["population"],
-        "lat": v.get("lat"),
-        "lng": v.get("lng"),
-        "gw_current_level": gw["gw_current_level"] if gw else 0,
-        "gw_min_required": gw["gw_min_required"] if gw else 0,
-        "gw_max_capacity": gw.get("gw_max_capacity", 0) if gw else 0,
-        "rainfall_dev_pct": gw["rainfall_dev_pct"] if gw else 0,
-    }
+
+
+def get_api_client(key_hash: str) -> dict | None:
+    """
+    Look up an active API key by its SHA-256 hash.
+
+    Returns:
+        {"client": name, "role": role}, or None if unknown or revoked.
+    """
+    for row in get_store().select_where("api_keys", "key_hash", key_hash):
+        if row.get("active", True) in (True, 1, "1", "true"):
+            return {"client": row["client_name"], "role": row.get("role") or "user"}
+    return None
@@ -0,0 +1,223 @@
+"""
+Village repository — in-memory columnar snapshot.
+
+Routes and services read villages from here instead of re-querying the
+store and rebuilding a list of dicts on every request. The joined
+village + groundwater data is held as one NumPy array per numeric field,
+plus a list of IDs / names and an ID → row-index map. For 100k villages
+that is a few MB instead of hundreds of MB of per-row dicts, and the
+arrays feed the vectorized WSI functions directly.
+
+The snapshot is reloaded when a write path publishes a data change, or
+after VILLAGE_REPO_TTL_SECONDS to pick up edits made directly in the
+database.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+
+import numpy as np
+
+from app.core.constants import VILLAGE_REPO_TTL_SECONDS
+from app.database.queries import get_all_villages_with_groundwater
+from app.services.data_events import on_village_data_changed
+from app.utils.http_cache import compute_etag
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Numeric columns, in the order they appear in a village dict
+FLOAT_FIELDS = (
+    "lat",
+    "lng",
+    "gw_current_level",
+    "gw_min_required",
+    "gw_max_capacity",
+    "rainfall_dev_pct",
+)
+
+
+def _nullable(value: float) -> float | None:
+    """Convert a NaN column value (missing in the source row) back to None."""
+    return None if math.isnan(value) else value
+
+
+class VillageTable:
+    """
+    Immutable columnar snapshot of all villages joined with groundwater.
+
+    Attributes:
+        ids, names, talukas, districts: Python lists, one entry per row
+            (talukas / districts hold None where unknown).
+        index: village_id → row index.
+        population: int64 array.
+        lat, lng, gw_current_level, gw_min_required, gw_max_capacity,
+        rainfall_dev_pct: float64 arrays (NaN where the source was NULL).
+        version: Digest of the source rows; changes whenever the data does.
+    """
+
+    __slots__ = ("ids", "names", "talukas", "districts", "index", "population", "version", *FLOAT_FIELDS)
+
+    def __init__(self, rows: list[dict]):
+        n = len(rows)
+        self.ids = [r["id"] for r in rows]
+        self.names = [r["name"] for r in rows]
+        self.talukas = [r.get("taluka") for r in rows]
+        self.districts = [r.get("district") for r in rows]
+        self.index = {vid: i for i, vid in enumerate(self.ids)}
+        self.population = np.fromiter((r["population"] for r in rows), dtype=np.int64, count=n)
+        for field in FLOAT_FIELDS:
+            column = np.fromiter(
+                (np.nan if r.get(field) is None else r[field] for r in rows),
+                dtype=np.float64,
+                count=n,
+            )
+            setattr(self, field, column)
+        self.version = compute_etag(rows)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self):
+        return (VillageRow(self, i) for i in range(len(self.ids)))
+
+    def row(self, i: int) -> "VillageRow":
+        """Return a lightweight view of row i."""
+        return VillageRow(self, i)
+
+    def get(self, village_id: str) -> "VillageRow | None":
+        """Return the row view for a village ID, or None."""
+        i = self.index.get(village_id)
+        return None if i is None else VillageRow(self, i)
+
+    def row_dict(self, i: int) -> dict:
+        """Materialise row i as a village dict (same shape as the query layer)."""
+        return {
+            "id": self.ids[i],
+            "name": self.names[i],
+            "taluka": self.talukas[i],
+            "district": self.districts[i],
+            "population": int(self.population[i]),
+            "lat": _nullable(float(self.lat[i])),
+            "lng": _nullable(float(self.lng[i])),
+            "gw_current_level": float(self.gw_current_level[i]),
+            "gw_min_required": float(self.gw_min_required[i]),
+            "gw_max_capacity": _nullable(float(self.gw_max_capacity[i])),
+            "rainfall_dev_pct": float(self.rainfall_dev_pct[i]),
+        }
+
+    def coordinates(self, i: int) -> tuple[float, float]:
+        """Return (lat, lng) for row i, with 0.0 for missing values."""
+        return (
+            float(np.nan_to_num(self.lat[i])),
+            float(np.nan_to_num(self.lng[i])),
+        )
+
+
+class VillageRow:
+    """Read-only view of one row of a VillageTable (no per-row dict)."""
+
+    __slots__ = ("_table", "_i")
+
+    def __init__(self, table: VillageTable, i: int):
+        self._table = table
+        self._i = i
+
+    @property
+    def id(self) -> str:
+        return self._table.ids[self._i]
+
+    @property
+    def name(self) -> str:
+        return self._table.names[self._i]
+
+    @property
+    def taluka(self) -> str | None:
+        return self._table.talukas[self._i]
+
+    @property
+    def district(self) -> str | None:
+        return self._table.districts[self._i]
+
+    @property
+    def population(self) -> int:
+        return int(self._table.population[self._i])
+
+    @property
+    def lat(self) -> float | None:
+        return _nullable(float(self._table.lat[self._i]))
+
+    @property
+    def lng(self) -> float | None:
+        return _nullable(float(self._table.lng[self._i]))
+
+    @property
+    def gw_current_level(self) -> float:
+        return float(self._table.gw_current_level[self._i])
+
+    @property
+    def gw_min_required(self) -> float:
+        return float(self._table.gw_min_required[self._i])
+
+    @property
+    def gw_max_capacity(self) -> float | None:
+        return _nullable(float(self._table.gw_max_capacity[self._i]))
+
+    @property
+    def rainfall_dev_pct(self) -> float:
+        return float(self._table.rainfall_dev_pct[self._i])
+
+    def to_dict(self) -> dict:
+        return self._table.row_dict(self._i)
+
+
+class VillageRepository:
+    """Holds the current VillageTable and reloads it when stale."""
+
+    def __init__(self, ttl: float = VILLAGE_REPO_TTL_SECONDS):
+        self.ttl = ttl
+        self._table: VillageTable | None = None
+        self._loaded_at = 0.0
+        self._stale = True
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> VillageTable:
+        """
+        Return the current table, reloading from the store if it was
+        invalidated or is older than the TTL.
+
+        Concurrent callers during a reload wait for the single load rather
+        than each querying the store.
+        """
+        table = self._table
+        if table is not None and not self._stale and time.monotonic() - self._loaded_at < self.ttl:
+            return table
+
+        with self._lock:
+            if self._table is None or self._stale or time.monotonic() - self._loaded_at >= self.ttl:
+                started = time.perf_counter()
+                self._stale = False
+                self._table = VillageTable(get_all_villages_with_groundwater())
+                self._loaded_at = time.monotonic()
+                logger.info(
+                    "Village repository loaded %d villages in %.1f ms",
+                    len(self._table), (time.perf_counter() - started) * 1000,
+                )
+            return self._table
+
+    def get(self, village_id: str) -> VillageRow | None:
+        """Return a single village row view, or None if unknown."""
+        return self.snapshot().get(village_id)
+
+    def invalidate(self) -> None:
+        """Force a reload on next access."""
+        self._stale = True
+
+
+village_repository = VillageRepository()
+
+# Any write to village data makes the snapshot stale
+on_village_data_changed(lambda _village_ids: village_repository.invalidate())
@@ -0,0 +1,96 @@
+"""
+Storage backend selection.
+
+Query functions talk to a "store" exposing a small table API
+(select_all / select_where / upsert / update_where / update_if_newer). Which store is used is chosen by
+settings.STORAGE_BACKEND:
+
+    supabase     — remote Supabase only (default, original behaviour)
+    local        — embedded SQLite only, seeded from dummy_data CSVs when empty
+    local_first  — reads from SQLite; writes go to Supabase and are mirrored
+                   locally; a background job keeps SQLite in sync
+"""
+
+from __future__ import annotations
+
+from app.config import settings
+from app.database.local_store import LocalStore
+from app.database.supabase_store import SupabaseStore
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+STORAGE_BACKENDS = ("supabase", "local", "local_first")
+
+_store = None
+_local_store: LocalStore | None = None
+
+
+class LocalFirstStore:
+    """Reads from the local store; writes go remote first, then locally."""
+
+    name = "local_first"
+
+    def __init__(self, local: LocalStore, remote: SupabaseStore):
+        self.local = local
+        self.remote = remote
+
+    def select_all(self, table: str, columns: str = "*") -> list[dict]:
+        return self.local.select_all(table, columns)
+
+    def select_where(self, table: str, column: str, value) -> list[dict]:
+        return self.local.select_where(table, column, value)
+
+    def upsert(self, table: str, rows: list[dict], key: str) -> None:
+        self.remote.upsert(table, rows, key)
+        self.local.upsert(table, rows, key)
+
+    def update_where(self, table: str, changes: dict, match: dict) -> int:
+        # Supabase is the source of truth for conditional writes; the local
+        # copy is mirrored on the key alone (its version may lag until sync)
+        updated = self.remote.update_where(table, changes, match)
+        if updated:
+            self.local.update_where(table, changes, {k: v for k, v in match.items() if k != "version"})
+        return updated
+
+    def update_if_newer(self, table: str, rows: list[dict], key: str, column: str) -> int:
+        updated = self.remote.update_if_newer(table, rows, key, column)
+        self.local.update_if_newer(table, rows, key, column)
+        return updated
+
+
+def get_local_store() -> LocalStore:
+    """Return the embedded local store, opening it on first call."""
+    global _local_store
+    if _local_store is None:
+        _local_store = LocalStore(settings.LOCAL_DB_PATH)
+    return _local_store
+
+
+def get_store():
+    """
+    Return the configured store, creating it on first call.
+
+    Raises:
+        ValueError: If STORAGE_BACKEND is not a known backend.
+    """
+    global _store
+    if _store is None:
+        backend = settings.STORAGE_BACKEND
+        if backend not in STORAGE_BACKENDS:
+            raise ValueError(
+                f"Unknown STORAGE_BACKEND '{backend}'. Use one of: {', '.join(STORAGE_BACKENDS)}"
+            )
+
+        if backend == "supabase":
+            _store = SupabaseStore()
+        elif backend == "local":
+            local = get_local_store()
+            if local.is_empty():
+                local.load_csv_dir()
+            _store = local
+        else:
+            _store = LocalFirstStore(get_local_store(), SupabaseStore())
+
+        logger.info("Storage backend: %s", backend)
+    return _store
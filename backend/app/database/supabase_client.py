@@ -3,13 +3,20 @@ Supabase client initialization.
 
 Provides a lazily-initialized singleton Supabase client.
 The client is only created on the first DB call, so the server
-starts cleanly even before real credentials are configured.
+starts cleanly even before real credentials are configured. The supabase
+package itself is imported at that point too: it is the heaviest import
+in the application, and local-store deployments never need it.
 """
 
 from __future__ import annotations
-from supabase import create_client, Client
+
+from typing import TYPE_CHECKING
+
 from app.config import settings
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 _client: Client | None = None
 
 
@@ -26,6 +33,8 @@ def get_supabase_client() -> Client:
     global _client
     if _client is None:
         settings.validate()
+        from supabase import create_client
+
         _client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
     return _client
 
@@ -0,0 +1,58 @@
+"""
+Supabase storage backend.
+
+Thin table-level adapter over the Supabase client so query functions can
+run unchanged against either Supabase or the embedded local store.
+"""
+
+from app.database.supabase_client import supabase
+
+
+class SupabaseStore:
+    """Table access backed by the remote Supabase (PostgREST) API."""
+
+    name = "supabase"
+
+    def select_all(self, table: str, columns: str = "*") -> list[dict]:
+        """Return every row of a table."""
+        return supabase().table(table).select(columns).execute().data
+
+    def select_where(self, table: str, column: str, value) -> list[dict]:
+        """Return rows where column == value."""
+        return supabase().table(table).select("*").eq(column, value).execute().data
+
+    def upsert(self, table: str, rows: list[dict], key: str) -> None:
+        """Insert or update rows, matching on the key column."""
+        supabase().table(table).upsert(rows, on_conflict=key).execute()
+
+    def update_where(self, table: str, changes: dict, match: dict) -> int:
+        """
+        Update rows matching every column == value in match.
+
+        Returns:
+            Number of rows updated (0 means the match — e.g. an expected
+            version — no longer holds).
+        """
+        query = supabase().table(table).update(changes)
+        for column, value in match.items():
+            query = query.eq(column, value)
+        return len(query.execute().data)
+
+    def update_if_newer(self, table: str, rows: list[dict], key: str, column: str) -> int:
+        """
+        Update each row (matched on key) unless the stored column value is
+        already at least the row's, so concurrent writers cannot move it back.
+
+        Returns:
+            Number of rows updated.
+        """
+        updated = 0
+        for row in rows:
+            changes = {c: v for c, v in row.items() if c != key}
+            query = (
+                supabase().table(table).update(changes)
+                .eq(key, row[key])
+                .or_(f"{column}.is.null,{column}.lt.{row[column]}")
+            )
+            updated += len(query.execute().data)
+        return updated
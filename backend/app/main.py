@@ -2,27 +2,96 @@
 FastAPI application entry point.
 
 Initializes the application, enables CORS, and includes all API routers.
+Background services (the job runner's worker processes, the cache warm-up,
+the shared status snapshot producer, the live update hub, the alert
+engine, the local store sync job, the telemetry persistence loop) are started and stopped by the
+application lifespan.
+
+Routers are imported eagerly, but heavy client libraries (supabase,
+requests) are imported on first use, so a worker starts serving quickly;
+/ready turns 200 once the warm-up has loaded its caches.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes_villages import router as villages_router
 from app.api.routes_tankers import router as tankers_router
 from app.api.routes_chat import router as chat_router
+from app.api.routes_live import router as live_router
+from app.api.routes_scenarios import router as scenarios_router
+from app.api.routes_ingest import router as ingest_router
+from app.api.routes_jobs import router as jobs_router
+from app.api.routes_alerts import router as alerts_router
+from app.api.routes_rollups import router as rollups_router
+from app.api.routes_map import router as map_router
+from app.api.routes_profiling import router as profiling_router
+from app.api.routes_telemetry import router as telemetry_router
+from app.core.admission import AdmissionControlMiddleware, admission_stats
 from app.core.constants import ALLOWED_ORIGINS
-from app.utils.logger import get_logger
+from app.core.request_context import RequestContextMiddleware
+from app.services.alert_engine import alert_engine
+from app.services.insight_tiers import insight_upgrades
+from app.services.job_runner import job_runner
+from app.services.live_updates import live_hub
+from app.services.profiling import profiling
+from app.services.shared_snapshot import shared_status
+from app.services.store_sync import store_sync_job
+from app.services.telemetry import telemetry
+from app.services.warmup import warm_up
+from app.utils.circuit_breaker import breaker_states
+from app.utils.logger import get_logger, logging_stats
+from app.utils.single_flight import flight_stats
 
 logger = get_logger(__name__)
 
+
+# ---------------------------------------------------------------------------
+# Lifespan — start/stop background services
+# ---------------------------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_runner.start()
+    await store_sync_job.start()
+    await warm_up.start()
+    await shared_status.start()
+    await live_hub.start()
+    await alert_engine.start()
+    await telemetry.start()
+    await profiling.start()
+    yield
+    await profiling.stop()
+    await telemetry.stop()
+    await alert_engine.stop()
+    await live_hub.stop()
+    await shared_status.stop()
+    await warm_up.stop()
+    await store_sync_job.stop()
+    await job_runner.stop()
+
+
 app = FastAPI(
     title="Drought Warning & Smart Tanker Management System",
     description="Integrated system for drought monitoring, water stress calculation, and tanker dispatch.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # ---------------------------------------------------------------------------
-# CORS Middleware
+# Admission Control (API keys, rate limits, load shedding)
+# ---------------------------------------------------------------------------
+app.add_middleware(AdmissionControlMiddleware)
+
+# ---------------------------------------------------------------------------
+# Request IDs (wraps admission control so rejections are logged with an ID)
+# ---------------------------------------------------------------------------
+app.add_middleware(RequestContextMiddleware)
+
+# ---------------------------------------------------------------------------
+# CORS Middleware (added last so it wraps admission-control rejections too)
 # ---------------------------------------------------------------------------
 app.add_middleware(
     CORSMiddleware,
@@ -30,6 +99,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After", "X-Request-ID"],
 )
 
 # ---------------------------------------------------------------------------
@@ -38,6 +108,15 @@ app.add_middleware(
 app.include_router(villages_router)
 app.include_router(tankers_router)
 app.include_router(chat_router)
+app.include_router(live_router)
+app.include_router(scenarios_router)
+app.include_router(ingest_router)
+app.include_router(jobs_router)
+app.include_router(alerts_router)
+app.include_router(rollups_router)
+app.include_router(map_router)
+app.include_router(profiling_router)
+app.include_router(telemetry_router)
 
 
 # ---------------------------------------------------------------------------
@@ -45,5 +124,23 @@ app.include_router(chat_router)
 # ---------------------------------------------------------------------------
 @app.get("/health", tags=["Health"])
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "ok", "service": "drought-warning-api"}
+    """Health check endpoint (includes upstream breaker states, coalescing, admission, insight, telemetry and logging counters)."""
+    return {
+        "status": "ok",
+        "service": "drought-warning-api",
+        "upstreams": breaker_states(),
+        "coalescing": flight_stats(),
+        "admission": admission_stats.snapshot(),
+        "insights": insight_upgrades.stats(),
+        "telemetry": telemetry.stats(),
+        "logging": logging_stats(),
+    }
+
+
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+    """Readiness probe: 503 until the startup warm-up has loaded the caches."""
+    status = warm_up.status()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content=status)
+    return status
@@ -0,0 +1,33 @@
+"""
+Pydantic schemas for bulk ingestion reports.
+"""
+
+from pydantic import BaseModel
+
+
+class IngestReport(BaseModel):
+    """Summary of one bulk groundwater upload."""
+    rows_received: int
+    rows_rejected: int
+    duplicates: int                # Readings superseded by a later reading for the same village
+    villages_upserted: int
+    batches: int
+    failed_batches: int            # Batches that still failed after all retries
+    elapsed_sec: float
+    errors: list[str]              # First rejected-row messages (capped)
+
+
+class RainfallGridReport(BaseModel):
+    """Metadata of one ingested rainfall grid."""
+    name: str
+    kind: str                      # "daily" or "normal" (day-of-year climatology)
+    ny: int
+    nx: int
+    lat0: float                    # Centre of the south-west cell
+    lon0: float
+    dlat: float
+    dlon: float
+    start_date: str | None         # First layer (daily grids)
+    days: int                      # Layers stored
+    source_format: str
+    active: bool                   # Used for the seasonal deviation in the status view
@@ -0,0 +1,47 @@
+"""
+Pydantic schemas for what-if scenario evaluation.
+"""
+
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from app.core.constants import SCENARIO_MAX_BATCH, WSI_CRITICAL_THRESHOLD
+
+
+class ScenarioParams(BaseModel):
+    """A single set of perturbations applied on top of the live data."""
+    name: Optional[str] = None
+    rainfall_dev_delta: float = 0.0     # Percentage points added to every rainfall_dev_pct (e.g. -20)
+    gw_level_delta: float = 0.0         # Meters added to every gw_current_level (negative = further drop)
+    tanker_delta: int = 0               # Standard tankers added to (or removed from) the available fleet
+    wsi_threshold: float = WSI_CRITICAL_THRESHOLD
+
+
+class ScenarioRequest(BaseModel):
+    """Request body for a batch of scenarios."""
+    scenarios: list[ScenarioParams] = Field(min_length=1, max_length=SCENARIO_MAX_BATCH)
+
+
+class ScenarioMetrics(BaseModel):
+    """Coverage metrics for one evaluated scenario."""
+    name: Optional[str] = None
+    params: ScenarioParams
+    villages_evaluated: int
+    critical_villages: int           # Villages with WSI above the scenario threshold
+    mean_wsi: float
+    population_weighted_wsi: float
+    total_deficit_liters: float      # Daily deficit across villages above threshold
+    villages_served: int
+    villages_unserved: int           # Villages above threshold with a deficit but no tanker
+    population_served: int
+    total_allocated_liters: float
+    coverage_pct: float              # Allocated liters / deficit liters × 100
+    tankers_available: int
+    tankers_used: int
+    delta_vs_baseline: dict[str, float] = {}
+
+
+class ScenarioResponse(BaseModel):
+    """Response schema for a scenario sweep."""
+    baseline: ScenarioMetrics
+    scenarios: list[ScenarioMetrics]
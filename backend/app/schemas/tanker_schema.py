@@ -27,6 +27,19 @@ class TankerAllocation(BaseModel):
 
 class TankerAllocationResponse(BaseModel):
     """Response schema for the complete allocation plan."""
-    total_villages_in_need: int
+    total_villages_in_need: int             # Villages above the stress threshold
+    villages_served: Optional[int] = None   # Villages that received at least one tanker
     total_tankers_assigned: int
     allocations: list[TankerAllocation]
+
+
+class TankerStatusUpdate(BaseModel):
+    """Request body for moving a tanker to a new fleet state."""
+    status: str                             # Target state, e.g. "Reserved", "Dispatched"
+    village_id: Optional[str] = None        # Required when reserving
+
+
+class AllocationRepairRequest(BaseModel):
+    """Request body describing a mid-day disruption to repair around."""
+    removed_tankers: list[str] = []     # Tankers withdrawn from service (breakdowns)
+    village_ids: list[str] = []         # Villages whose data changed
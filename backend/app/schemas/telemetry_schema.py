@@ -0,0 +1,25 @@
+"""
+Pydantic schemas for tanker GPS telemetry.
+"""
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class GpsPing(BaseModel):
+    """One GPS fix from a tanker tracker (documents the ping shape)."""
+    tanker_id: str
+    lat: float
+    lng: float
+    ts: Optional[float] = None            # Unix seconds (default: time received)
+    speed_kmh: Optional[float] = None     # Reported ground speed, if the tracker has it
+
+
+class TelemetryIngestReport(BaseModel):
+    """Summary of one ping batch."""
+    received: int
+    accepted: int
+    stale: int                     # Not newer than the tanker's latest fix (retries, reordering)
+    rejected: int                  # Malformed, unknown tanker, or out of range
+    errors: list[str]              # First rejected-ping messages (capped)
@@ -8,15 +8,52 @@ STRICT RULES:
 - The AI does NOT perform calculations.
 - The AI only explains pre-computed data.
 - All numeric values are injected into the prompt, never generated by the model.
+
+Calls go through circuit breakers with latency-adaptive timeouts, one for
+insights and one for chat. While Ollama is failing, requests fail fast: the
+last successful answer to the same prompt is returned if there is one,
+otherwise an error message.
 """
 
+import hashlib
 import os
-import requests
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.constants import (
+    OLLAMA_MIN_TIMEOUT_SECONDS,
+    OLLAMA_RESPONSE_CACHE_SIZE,
+    OLLAMA_TIMEOUT_SECONDS,
+)
+from app.utils.circuit_breaker import CircuitBreaker
 from app.utils.text_parser import sanitize_ai_response
+from app.utils.lazy_import import lazy_import
 from app.utils.logger import get_logger
 
+requests = lazy_import("requests")
+
 logger = get_logger(__name__)
 
+# Insight generation and chat have very different latencies, so each keeps
+# its own breaker (and latency window)
+ollama_insight_breaker = CircuitBreaker(
+    "ollama-insight",
+    max_timeout=OLLAMA_TIMEOUT_SECONDS,
+    min_timeout=OLLAMA_MIN_TIMEOUT_SECONDS,
+)
+ollama_chat_breaker = CircuitBreaker(
+    "ollama-chat",
+    max_timeout=OLLAMA_TIMEOUT_SECONDS,
+    min_timeout=OLLAMA_MIN_TIMEOUT_SECONDS,
+)
+
+# Last successful (sanitized) answer per prompt, served while Ollama is down
+_response_cache: OrderedDict[str, str] = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+CIRCUIT_OPEN_MESSAGE = "Error: AI engine is temporarily unavailable (too many recent failures). Please retry shortly."
+
 # ---------------------------------------------------------------------------
 # Ollama Configuration
 # ---------------------------------------------------------------------------
@@ -82,39 +119,56 @@ Output Language: {target_language}
     if OLLAMA_API_KEY:
         headers["Authorization"] = f"Bearer {OLLAMA_API_KEY}"
 
-    logger.info(f"Requesting AI insight for village: {village_name} (lang={target_language}, model={MODEL_NAME})")
+    logger.info("Requesting AI insight for village: %s (lang=%s, model=%s)", village_name, target_language, MODEL_NAME)
+
+    if not ollama_insight_breaker.allow():
+        logger.warning("Ollama circuit open — failing fast for %s", village_name)
+        return _cached_response(prompt) or CIRCUIT_OPEN_MESSAGE
 
+    timeout = ollama_insight_breaker.timeout()
+    started = time.perf_counter()
     try:
-        response = requests.post(OLLAMA_URL, json=payload, headers=headers, timeout=120)
+        response = requests.post(OLLAMA_URL, json=payload, headers=headers, timeout=timeout)
         response.raise_for_status()
 
         response_data = response.json()
+        ollama_insight_breaker.record_success(time.perf_counter() - started)
         raw_output = response_data.get("response", "")
 
         if not raw_output.strip():
-            logger.warning(f"Ollama returned empty response for {village_name}")
+            logger.warning("Ollama returned empty response for %s", village_name)
             return "Error: Ollama returned an empty response. The model may still be loading."
 
         # Sanitize the output before returning
         clean_output = sanitize_ai_response(raw_output)
+        _cache_response(prompt, clean_output)
 
-        logger.info(f"AI insight generated for {village_name}: {len(clean_output)} chars")
+        logger.info("AI insight generated for %s: %d chars", village_name, len(clean_output))
         return clean_output
 
     except requests.exceptions.Timeout:
-        logger.error(f"Ollama timed out for {village_name} (120s)")
-        return "Error: AI model timed out. The 671B model may need more time. Please retry."
+        ollama_insight_breaker.record_failure()
+        logger.error("Ollama timed out for %s (%.0fs)", village_name, timeout)
+        return _cached_response(prompt) or "Error: AI model timed out. The 671B model may need more time. Please retry."
     except requests.exceptions.ConnectionError:
+        ollama_insight_breaker.record_failure()
         logger.error("Cannot connect to Ollama. Is it running?")
-        return "Error: Cannot connect to Ollama at " + OLLAMA_URL + ". Ensure Ollama is running."
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Ollama Request Error: {e}")
-        return f"Error: {str(e)}"
+        return _cached_response(prompt) or "Error: Cannot connect to Ollama at " + OLLAMA_URL + ". Ensure Ollama is running."
+    except (requests.exceptions.RequestException, ValueError) as e:
+        ollama_insight_breaker.record_failure()
+        logger.error("Ollama Request Error: %s", e)
+        return _cached_response(prompt) or f"Error: {str(e)}"
 
 def query_ollama(prompt: str, timeout_sec: int = 120) -> str:
     """
     Generic wrapper to query the local Ollama instance.
+
+    timeout_sec caps the breaker's adaptive timeout.
     """
+    if not ollama_chat_breaker.allow():
+        return _cached_response(prompt) or CIRCUIT_OPEN_MESSAGE
+
+    started = time.perf_counter()
     try:
         response = requests.post(
             OLLAMA_URL,
@@ -124,13 +178,39 @@ def query_ollama(prompt: str, timeout_sec: int = 120) -> str:
                 "stream": False
             },
             headers={"Authorization": f"Bearer {OLLAMA_API_KEY}"} if OLLAMA_API_KEY else {},
-            timeout=timeout_sec
+            timeout=min(timeout_sec, ollama_chat_breaker.timeout())
         )
         response.raise_for_status()
         
         raw_text = response.json().get("response", "")
-        return sanitize_ai_response(raw_text)
+        ollama_chat_breaker.record_success(time.perf_counter() - started)
+        clean_output = sanitize_ai_response(raw_text)
+        _cache_response(prompt, clean_output)
+        return clean_output
         
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Ollama API Error: {e}")
-        return f"Error: Failed to connect to AI Insight Engine ({e})"
+    except (requests.exceptions.RequestException, ValueError) as e:
+        ollama_chat_breaker.record_failure()
+        logger.error("Ollama API Error: %s", e)
+        return _cached_response(prompt) or f"Error: Failed to connect to AI Insight Engine ({e})"
+
+
+# ---------------------------------------------------------------------------
+# Internal Helpers
+# ---------------------------------------------------------------------------
+
+def _prompt_key(prompt: str) -> str:
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _cache_response(prompt: str, output: str) -> None:
+    key = _prompt_key(prompt)
+    with _response_cache_lock:
+        _response_cache[key] = output
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > OLLAMA_RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+
+def _cached_response(prompt: str) -> str | None:
+    with _response_cache_lock:
+        return _response_cache.get(_prompt_key(prompt))
@@ -0,0 +1,392 @@
+"""
+Alert Engine — stress-band transitions with hysteresis and de-duplication.
+
+CRITICAL: This module contains ONLY deterministic calculations.
+No AI/LLM calls are permitted here.
+
+Every evaluation takes the weather-adjusted WSI of all villages and
+compares each village's band (Safe / Moderate Stress / Severe Stress, per
+WSI_MODERATE_THRESHOLD and WSI_CRITICAL_THRESHOLD) with the band held in
+the engine's state table:
+
+- Escalation is immediate once WSI crosses a threshold.
+- De-escalation needs WSI to fall ALERT_HYSTERESIS_WSI points below the
+  threshold, so a village hovering around 70 does not flap.
+- Re-entering a band the village was already alerted for within
+  ALERT_DEDUP_SECONDS updates the state but sends no second alert.
+
+The state table is columnar (one NumPy array per field, aligned with the
+village snapshot's row order), so an evaluation is a handful of vectorized
+comparisons; only villages that actually changed band are turned into
+event dicts. Villages seen for the first time are recorded at their
+current band without alerting, so a restart does not re-announce every
+stressed village.
+
+The engine evaluates every status refresh (via on_status_computed), so
+the status is computed once for the view and the alerts alike. Only when
+no refresh arrived for ALERT_EVAL_INTERVAL_SECONDS, or right after village
+data changes, does its own loop recompute the status.
+
+In multi-worker deployments (SHARED_SNAPSHOT_PATH set) only the shared
+snapshot producer evaluates, on each snapshot it publishes, so every
+transition is alerted once. After each evaluation it writes the recent
+events and the state table next to the snapshot (SHARED_SNAPSHOT_PATH +
+".alerts.json"); the other workers serve GET /api/alerts and /state from
+that file.
+
+Events go to the queue sink at once and to the other registered sinks
+(see alert_sinks) from a single background thread, in order.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.config import settings
+from app.core.constants import (
+    ALERT_DEDUP_SECONDS,
+    ALERT_EVAL_INTERVAL_SECONDS,
+    ALERT_HYSTERESIS_WSI,
+    SHARED_SNAPSHOT_MAX_AGE_SECONDS,
+    WSI_CRITICAL_THRESHOLD,
+    WSI_MODERATE_THRESHOLD,
+)
+from app.database.repository import VillageTable
+from app.services.alert_sinks import AlertSink, LogFileSink, QueueSink, WebhookSink
+from app.services.data_events import on_village_data_changed
+from app.services.shared_snapshot import shared_status
+from app.services.village_status import compute_status_columns, fetch_status_inputs, on_status_computed
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SAFE, MODERATE, SEVERE = 0, 1, 2
+BAND_LABELS = ("Safe", "Moderate Stress", "Severe Stress")
+
+
+class AlertsUnavailableError(RuntimeError):
+    """This worker has no alert state: the producer has not published any (recently)."""
+
+
+def band_of(wsi: np.ndarray) -> np.ndarray:
+    """Stress band per WSI value (same cut-offs as wsi_status_label)."""
+    wsi = np.asarray(wsi, dtype=np.float64)
+    return (
+        (wsi > WSI_MODERATE_THRESHOLD).astype(np.int8)
+        + (wsi > WSI_CRITICAL_THRESHOLD).astype(np.int8)
+    )
+
+
+def next_bands(current: np.ndarray, wsi: np.ndarray, hysteresis: float = ALERT_HYSTERESIS_WSI) -> np.ndarray:
+    """
+    Apply hysteresis: rise to the raw band at once, fall only as far as
+    wsi + hysteresis allows.
+    """
+    raw = band_of(wsi)
+    sticky = np.minimum(current, band_of(wsi + hysteresis))
+    return np.where(raw >= current, raw, np.maximum(raw, sticky)).astype(np.int8)
+
+
+class AlertEngine:
+    """Per-village band state, transition detection and sink dispatch."""
+
+    def __init__(self, interval: float = ALERT_EVAL_INTERVAL_SECONDS, dedup_seconds: float = ALERT_DEDUP_SECONDS):
+        self.interval = interval
+        self.dedup_seconds = dedup_seconds
+        self.sinks: list[AlertSink] = []
+        self.queue = QueueSink()
+        self.add_sink(self.queue)
+
+        # State table, aligned with self._ids
+        self._ids: list[str] = []
+        self._index: dict[str, int] = {}
+        self._version: str | None = None
+        self._band = np.empty(0, dtype=np.int8)
+        self._wsi = np.empty(0, dtype=np.float64)
+        self._changed_at = np.empty(0, dtype=np.float64)
+        self._alert_at = np.empty((0, len(BAND_LABELS)), dtype=np.float64)  # last alert time per band
+        self._lock = threading.Lock()
+        self.last_evaluated_at: float | None = None
+
+        self._sink_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-sinks")
+        self._shared_file_id: tuple | None = None
+        self._shared: dict | None = None
+
+        self._task: asyncio.Task | None = None
+        self._wake: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def add_sink(self, sink: AlertSink) -> None:
+        self.sinks.append(sink)
+
+    # -----------------------------------------------------------------------
+    # Evaluation
+    # -----------------------------------------------------------------------
+
+    def evaluate(self, table: VillageTable, wsi: np.ndarray, now: float | None = None) -> list[dict]:
+        """
+        Update the state table from one refresh and dispatch any alerts.
+
+        Args:
+            table: The village snapshot the WSI column belongs to.
+            wsi: Weather-adjusted WSI per table row.
+
+        Returns:
+            The alert events sent.
+        """
+        now = time.time() if now is None else now
+        wsi = np.asarray(wsi, dtype=np.float64)
+
+        with self._lock:
+            first_seen = self._align(table)
+            current = np.where(first_seen, band_of(wsi), self._band)
+            new = next_bands(current, wsi)
+
+            changed = new != current
+            last_alert = self._alert_at[np.arange(len(new)), new]
+            duplicate = now - last_alert < self.dedup_seconds
+            alert = changed & ~duplicate
+
+            self._changed_at[changed | first_seen] = now
+            self._alert_at[alert, new[alert]] = now
+            self._band = new
+            self._wsi = wsi.copy()
+            self.last_evaluated_at = now
+
+            events = [
+                {
+                    "village_id": table.ids[i],
+                    "village_name": table.names[i],
+                    "band": BAND_LABELS[new[i]],
+                    "previous_band": BAND_LABELS[current[i]],
+                    "direction": "escalated" if new[i] > current[i] else "recovered",
+                    "wsi": round(float(wsi[i]), 2),
+                    "at": now,
+                }
+                for i in np.flatnonzero(alert)
+            ]
+            suppressed = int(np.count_nonzero(changed & duplicate))
+
+        if suppressed:
+            logger.info("Alert engine suppressed %d duplicate transitions", suppressed)
+        if events:
+            self._dispatch(events)
+        return events
+
+    def on_status(self, table: VillageTable, wsi: np.ndarray) -> None:
+        """Status listener: evaluate the refresh (alert owner only) and publish the result."""
+        if not self.owns_alerts or not len(table):
+            return
+        self.evaluate(table, wsi)
+        if shared_status.enabled:
+            try:
+                self._publish_shared()
+            except OSError as exc:
+                logger.error("Alert state not shared: %s", exc)
+
+    def evaluate_current(self) -> list[dict]:
+        """
+        Recompute the status now (blocking); the refresh is evaluated by
+        on_status like any other.
+
+        Returns:
+            The alert events raised since the call started, oldest first.
+        """
+        table, weather = fetch_status_inputs()
+        if not len(table):
+            return []
+        since = self.queue.last_seq
+        compute_status_columns(table, weather)
+        return list(reversed(self.queue.recent(since=since)))
+
+    def recent(self, since: int = 0, limit: int | None = None) -> list[dict]:
+        """
+        Recent alert events, newest first (see QueueSink.recent).
+
+        Raises:
+            AlertsUnavailableError: Not the owner and no shared alert state.
+        """
+        if self.owns_alerts:
+            return self.queue.recent(since=since, limit=limit)
+        events = [e for e in self._read_shared()["events"] if e["seq"] > since]
+        return events[:limit] if limit is not None else events
+
+    def state(self) -> dict:
+        """
+        Band counts plus every village currently outside the Safe band.
+
+        Raises:
+            AlertsUnavailableError: Not the owner and no shared alert state.
+        """
+        if not self.owns_alerts:
+            return self._read_shared()["state"]
+        return self._local_state()
+
+    def _local_state(self) -> dict:
+        with self._lock:
+            counts = np.bincount(self._band, minlength=len(BAND_LABELS)) if len(self._band) else [0] * 3
+            stressed = np.flatnonzero(self._band > SAFE)
+            return {
+                "evaluated_at": self.last_evaluated_at,
+                "counts": {label: int(counts[b]) for b, label in enumerate(BAND_LABELS)},
+                "villages": [
+                    {
+                        "village_id": self._ids[i],
+                        "band": BAND_LABELS[self._band[i]],
+                        "wsi": round(float(self._wsi[i]), 2),
+                        "since": float(self._changed_at[i]),
+                    }
+                    for i in stressed[np.argsort(-self._wsi[stressed], kind="stable")]
+                ],
+            }
+
+    # -----------------------------------------------------------------------
+    # Lifecycle
+    # -----------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Start the fallback evaluation loop."""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            logger.info("Alert engine started (every %ss, sinks: %s)", self.interval, [s.name for s in self.sinks])
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self._sink_thread.shutdown)
+        self._sink_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-sinks")
+
+    @property
+    def owns_alerts(self) -> bool:
+        """Multi-worker: only the shared snapshot producer evaluates and alerts."""
+        return not shared_status.enabled or shared_status.is_producer
+
+    def request_evaluation(self) -> None:
+        """Recompute and evaluate now instead of waiting for a refresh (thread-safe)."""
+        if self._loop is not None and self._wake is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self) -> None:
+        woken = True
+        while True:
+            # The shared snapshot producer evaluates every snapshot it
+            # publishes; without sharing, recompute when no refresh came in
+            due = self.last_evaluated_at is None or time.time() - self.last_evaluated_at >= self.interval
+            if not shared_status.enabled and (woken or due):
+                try:
+                    await asyncio.to_thread(self.evaluate_current)
+                except Exception as exc:
+                    logger.error("Alert evaluation failed: %s", exc)
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+                woken = True
+            except asyncio.TimeoutError:
+                woken = False
+
+    # -----------------------------------------------------------------------
+    # Internal Helpers
+    # -----------------------------------------------------------------------
+
+    def _align(self, table: VillageTable) -> np.ndarray:
+        """
+        Re-index the state table to the snapshot's row order (caller holds
+        the lock). Returns a mask of villages not seen before.
+        """
+        if table.version == self._version and len(table) == len(self._band):
+            return np.zeros(len(table), dtype=bool)
+
+        rows = np.array([self._index.get(vid, -1) for vid in table.ids], dtype=np.int64)
+        known = rows >= 0
+        take = np.where(known, rows, 0)
+
+        def carry(column: np.ndarray, fill) -> np.ndarray:
+            if not len(column):
+                return np.full(len(rows), fill, dtype=column.dtype)
+            return np.where(known, column[take], fill).astype(column.dtype)
+
+        self._band = carry(self._band, SAFE)
+        self._wsi = carry(self._wsi, 0.0)
+        self._changed_at = carry(self._changed_at, 0.0)
+        if len(self._alert_at):
+            alert_at = np.where(known[:, None], self._alert_at[take], -np.inf)
+        else:
+            alert_at = np.full((len(rows), len(BAND_LABELS)), -np.inf)
+        self._alert_at = alert_at
+
+        self._ids = list(table.ids)
+        self._index = dict(table.index)
+        self._version = table.version
+        return ~known
+
+    def _dispatch(self, events: list[dict]) -> None:
+        logger.info("Alert engine: %d band transitions", len(events))
+        self.queue.send(events)
+        others = [sink for sink in self.sinks if sink is not self.queue]
+        if others:
+            self._sink_thread.submit(_send_all, others, events)
+
+    @property
+    def _shared_path(self) -> str:
+        return f"{shared_status.path}.alerts.json"
+
+    def _publish_shared(self) -> None:
+        """Write recent events and the state table for the other workers (atomic rename)."""
+        payload = {"published_at": time.time(), "state": self._local_state(), "events": self.queue.recent()}
+        tmp_path = f"{self._shared_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, self._shared_path)
+
+    def _read_shared(self) -> dict:
+        try:
+            stat = os.stat(self._shared_path)
+            file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if file_id != self._shared_file_id:
+                with open(self._shared_path, encoding="utf-8") as f:
+                    self._shared = json.load(f)
+                self._shared_file_id = file_id
+        except (OSError, ValueError) as exc:
+            raise AlertsUnavailableError(f"No shared alert state yet ({exc.__class__.__name__})")
+        if time.time() - self._shared["published_at"] > SHARED_SNAPSHOT_MAX_AGE_SECONDS:
+            raise AlertsUnavailableError("Shared alert state is stale (no producer)")
+        return self._shared
+
+
+def _send_all(sinks: list[AlertSink], events: list[dict]) -> None:
+    for sink in sinks:
+        try:
+            sink.send(events)
+        except Exception as exc:
+            logger.error("Alert sink '%s' failed: %s", sink.name, exc)
+
+
+def build_alert_engine() -> AlertEngine:
+    """Alert engine with the sinks enabled in settings (the queue sink is always on)."""
+    engine = AlertEngine()
+    if settings.ALERT_WEBHOOK_URL:
+        engine.add_sink(WebhookSink(settings.ALERT_WEBHOOK_URL))
+    if settings.ALERT_LOG_PATH:
+        engine.add_sink(LogFileSink(settings.ALERT_LOG_PATH))
+    return engine
+
+
+# Process-wide engine (started/stopped by the application lifespan)
+alert_engine = build_alert_engine()
+
+# Evaluate every status refresh, and recompute as soon as village data changes
+on_status_computed(alert_engine.on_status)
+on_village_data_changed(lambda _village_ids: alert_engine.request_evaluation())
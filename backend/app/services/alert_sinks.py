@@ -0,0 +1,87 @@
+"""
+Alert sinks — destinations for stress-band alert events.
+
+A sink is any object with a ``name`` and a ``send(events)`` method taking
+a batch of event dicts (see alert_engine). Sinks are called from the
+alert engine's sink thread (the queue sink excepted, which is cheap), so
+a slow sink delays later alerts but never a status refresh or a request. A failing sink is logged by the engine
+and does not stop the others.
+
+Built-in sinks:
+    QueueSink     — bounded in-memory queue, read by GET /api/alerts
+    LogFileSink   — appends one JSON line per event
+    WebhookSink   — POSTs each batch as JSON to a URL
+"""
+
+import json
+import threading
+from collections import deque
+from typing import Protocol
+
+from app.core.constants import ALERT_QUEUE_SIZE, ALERT_WEBHOOK_TIMEOUT_SECONDS
+from app.utils.lazy_import import lazy_import
+
+requests = lazy_import("requests")
+
+
+class AlertSink(Protocol):
+    name: str
+
+    def send(self, events: list[dict]) -> None:
+        ...
+
+
+class QueueSink:
+    """Keeps the most recent events in memory, each tagged with a sequence number."""
+
+    name = "queue"
+
+    def __init__(self, maxlen: int = ALERT_QUEUE_SIZE):
+        self._events: deque[dict] = deque(maxlen=maxlen)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def send(self, events: list[dict]) -> None:
+        with self._lock:
+            for event in events:
+                self._seq += 1
+                self._events.append({"seq": self._seq, **event})
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def recent(self, since: int = 0, limit: int | None = None) -> list[dict]:
+        """Events with seq > since, newest first."""
+        with self._lock:
+            events = [e for e in reversed(self._events) if e["seq"] > since]
+        return events[:limit] if limit is not None else events
+
+
+class LogFileSink:
+    """Appends events to a JSON-lines file."""
+
+    name = "log_file"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, events: list[dict]) -> None:
+        lines = "".join(json.dumps(event, default=str) + "\n" for event in events)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class WebhookSink:
+    """POSTs each batch as {"events": [...]} to a webhook URL."""
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = ALERT_WEBHOOK_TIMEOUT_SECONDS):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, events: list[dict]) -> None:
+        response = requests.post(self.url, json={"events": events}, timeout=self.timeout)
+        response.raise_for_status()
@@ -0,0 +1,51 @@
+"""
+Data change notifications.
+
+Write paths (bulk ingestion, sync jobs) publish the IDs of villages whose
+underlying rows changed; in-process caches and background services
+register listeners to invalidate or refresh themselves.
+
+Listeners are called synchronously on the writer's thread, so they must be
+cheap and thread-safe (e.g. drop a cache entry, wake a background task).
+"""
+
+from typing import Callable, Iterable
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+VillageDataListener = Callable[[set[str]], None]
+
+_listeners: list[VillageDataListener] = []
+
+
+def on_village_data_changed(listener: VillageDataListener) -> VillageDataListener:
+    """
+    Register a listener for village data changes. Usable as a decorator.
+
+    Args:
+        listener: Called with the set of changed village IDs.
+
+    Returns:
+        The listener, unchanged.
+    """
+    _listeners.append(listener)
+    return listener
+
+
+def publish_village_data_changed(village_ids: Iterable[str]) -> None:
+    """
+    Notify all listeners that the given villages' data changed.
+
+    A failing listener is logged and does not prevent the others from running.
+    """
+    changed = set(village_ids)
+    if not changed:
+        return
+
+    for listener in list(_listeners):
+        try:
+            listener(changed)
+        except Exception as exc:
+            logger.error("Village data listener %r failed: %s", listener, exc)
@@ -0,0 +1,342 @@
+"""
+Multi-Depot Fleet Optimizer.
+
+CRITICAL: This module contains ONLY deterministic mathematical calculations.
+No AI/LLM calls are permitted here.
+
+allocate_tankers serves one homogeneous pool in priority order, and
+priority scales with population — so a small village with a very high WSI
+can lose to larger ones day after day. This optimizer instead solves the
+day's plan as a min-cost flow:
+
+    source ─▶ (depot, capacity class) ─▶ village ─▶ sink
+
+- Each (depot, capacity class) group supplies one trip per available
+  tanker, capped by the depot's daily_supply_liters.
+- A trip's value is the water it delivers weighted by the village's WSI
+  (not population) and a fairness multiplier that grows the less of its
+  deficit the village received over the last FAIRNESS_WINDOW_DAYS; travel
+  distance from the depot is a cost, and depots farther than
+  MAX_DEPOT_RADIUS_KM cannot serve a village. Distances are road km when
+  a travel-time matrix is given (see road_network), straight-line km
+  otherwise.
+- A village's first trip earns MIN_SERVICE_BONUS, so the plan serves as
+  many needy villages as possible before any village gets a second tanker
+  (minimum-service guarantee). Later trips are capped at what the deficit
+  can absorb.
+
+Because there are few groups but many villages, each shortest-path step
+of the successive-shortest-path solver is a handful of vectorized
+(groups × villages) relaxations, which keeps district-sized inputs well
+under a second without an LP solver dependency.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.core.constants import (
+    FAIRNESS_WEIGHT,
+    FAIRNESS_WINDOW_DAYS,
+    MAX_DEPOT_RADIUS_KM,
+    MIN_SERVICE_BONUS,
+    TRAVEL_COST_PER_KM,
+)
+from app.database.queries import get_depots, get_service_history
+from app.services.road_network import TravelTimeMatrix
+from app.services.tanker_allocator import calculate_deficit_batch
+from app.utils.geo import haversine_km
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Finite stand-in for "unreachable" (keeps the arithmetic free of inf - inf)
+_UNREACHABLE = 1e15
+
+
+def load_optimizer_inputs(today: date | None = None) -> tuple[list[dict], dict[str, dict]]:
+    """
+    Fetch the depots and the rolling service history used by the optimizer.
+
+    Returns:
+        (depots, {village_id: {"delivered_liters", "deficit_liters"}})
+    """
+    today = today or date.today()
+    days = [today - timedelta(days=n) for n in range(1, FAIRNESS_WINDOW_DAYS + 1)]
+    return get_depots(), get_service_history(days)
+
+
+def fairness_weights(village_ids: list[str], history: dict[str, dict]) -> np.ndarray:
+    """
+    Fairness multiplier per village: 1 + FAIRNESS_WEIGHT × unserved share.
+
+    Villages with no logged deficit in the window get no boost.
+    """
+    weights = np.ones(len(village_ids))
+    for i, vid in enumerate(village_ids):
+        entry = history.get(vid)
+        if entry and entry["deficit_liters"] > 0:
+            served = min(entry["delivered_liters"] / entry["deficit_liters"], 1.0)
+            weights[i] += FAIRNESS_WEIGHT * (1.0 - served)
+    return weights
+
+
+def optimize_allocation(
+    villages: list[dict],
+    tankers: list[dict],
+    depots: list[dict],
+    history: dict[str, dict],
+    travel: TravelTimeMatrix | None = None,
+) -> list[dict]:
+    """
+    Assign available tankers to needy villages across depots.
+
+    Args:
+        villages: Needy village dicts (see select_needy_villages).
+        tankers: Available tanker dicts with id, capacity_liters, depot_id.
+        depots: Depot dicts (see get_depots). Tankers whose depot is unknown
+            form a location-less pool with unlimited supply.
+        history: Rolling service totals (see load_optimizer_inputs).
+        travel: Depot → village road travel times; pairs without a road
+            time use the straight-line distance.
+
+    Returns:
+        Allocation dicts (village_id, village_name, tanker_id,
+        allocated_liters, deficit_liters, priority_score, depot_id,
+        distance_km, travel_min — None without a road time). A village
+        may receive several tankers.
+    """
+    villages = sorted(villages, key=lambda v: v.get("priority_score", 0), reverse=True)
+    deficit = calculate_deficit_batch(
+        [v["population"] for v in villages],
+        [v["gw_current_level"] for v in villages],
+        [v["gw_min_required"] for v in villages],
+    )
+    keep = np.flatnonzero(deficit > 0)
+    villages = [villages[i] for i in keep]
+    deficit = deficit[keep]
+    if not villages or not tankers:
+        return []
+
+    groups, supply = _build_groups(tankers, {d["id"]: d for d in depots})
+    distance, seconds = _distance_matrix(groups, villages, travel)
+
+    capacity = np.array([g["capacity_liters"] for g in groups], dtype=np.float64)
+    urgency = (
+        np.array([v.get("wsi", 0.0) for v in villages]) / 100.0
+        * fairness_weights([v["id"] for v in villages], history)
+    )
+    delivered = np.minimum(capacity[:, None], deficit[None, :])
+    cost = TRAVEL_COST_PER_KM * distance - urgency[None, :] * delivered / 1_000.0
+    cost[distance > MAX_DEPOT_RADIUS_KM] = _UNREACHABLE
+
+    max_trips = np.ceil(deficit / capacity.max()).astype(np.int64)
+    flow = _min_cost_flow(cost, supply, max_trips)
+
+    return _materialize(flow, groups, villages, deficit, distance, seconds)
+
+
+def build_optimized_plan(
+    villages: list[dict],
+    tankers: list[dict],
+    depots: list[dict] | None = None,
+    history: dict[str, dict] | None = None,
+    travel: TravelTimeMatrix | None = None,
+) -> dict:
+    """
+    Run the optimizer and summarise the plan.
+
+    Args:
+        villages: Needy village dicts (see select_needy_villages).
+        tankers: Available tanker dicts.
+        depots, history: Optimizer inputs; loaded when omitted.
+        travel: Depot → village road travel times, if a road graph is loaded.
+
+    Returns:
+        The plan: total_villages_in_need, villages_served,
+        total_tankers_assigned and the allocations.
+    """
+    if depots is None or history is None:
+        depots, history = load_optimizer_inputs()
+
+    allocations = optimize_allocation(villages, tankers, depots, history, travel)
+    served = {a["village_id"] for a in allocations}
+
+    return {
+        "total_villages_in_need": len(villages),
+        "villages_served": len(served),
+        "total_tankers_assigned": len(allocations),
+        "allocations": allocations,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Internal Helpers
+# ---------------------------------------------------------------------------
+
+def _build_groups(tankers: list[dict], depots: dict[str, dict]) -> tuple[list[dict], np.ndarray]:
+    """
+    Group tankers by (depot, capacity class) and cap trips by depot supply.
+
+    Within a depot, smaller classes are filled first so a limited supply
+    reaches as many villages as possible.
+    """
+    by_key: dict[tuple, list[dict]] = {}
+    for t in sorted(tankers, key=lambda t: t["id"]):
+        depot_id = t.get("depot_id") if t.get("depot_id") in depots else None
+        by_key.setdefault((depot_id, float(t["capacity_liters"])), []).append(t)
+
+    groups, supply = [], []
+    remaining = {d_id: d.get("daily_supply_liters") for d_id, d in depots.items()}
+    for (depot_id, cap), members in sorted(by_key.items(), key=lambda kv: (str(kv[0][0]), kv[0][1])):
+        trips = len(members)
+        budget = remaining.get(depot_id)
+        if depot_id is not None and budget is not None:
+            trips = min(trips, int(budget // cap)) if cap > 0 else 0
+            remaining[depot_id] = budget - trips * cap
+        groups.append({
+            "depot": depots.get(depot_id),
+            "depot_id": depot_id,
+            "capacity_liters": cap,
+            "tankers": members,
+        })
+        supply.append(trips)
+    return groups, np.array(supply, dtype=np.int64)
+
+
+def _distance_matrix(
+    groups: list[dict],
+    villages: list[dict],
+    travel: TravelTimeMatrix | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Depot → village distances: road km where the travel matrix has them,
+    great-circle km otherwise (0 where a location is unknown).
+
+    Returns:
+        (distance_km, travel_seconds — NaN without a road time)
+    """
+    lat = np.array([v.get("lat") if v.get("lat") is not None else np.nan for v in villages], dtype=np.float64)
+    lng = np.array([v.get("lng") if v.get("lng") is not None else np.nan for v in villages], dtype=np.float64)
+
+    distance = np.zeros((len(groups), len(villages)))
+    for g, group in enumerate(groups):
+        depot = group["depot"]
+        if depot and depot.get("lat") is not None and depot.get("lng") is not None:
+            distance[g] = haversine_km(depot["lat"], depot["lng"], lat, lng)
+    distance = np.nan_to_num(distance, nan=0.0)
+
+    seconds = np.full(distance.shape, np.nan)
+    if travel is not None:
+        seconds, road_km = travel.submatrix([g["depot_id"] for g in groups], [v["id"] for v in villages])
+        distance = np.where(np.isnan(road_km), distance, road_km)
+    return distance, seconds
+
+
+def _min_cost_flow(cost: np.ndarray, supply: np.ndarray, max_trips: np.ndarray) -> np.ndarray:
+    """
+    Successive shortest paths on source → groups → villages → sink.
+
+    Village → sink arcs have convex marginal cost: -MIN_SERVICE_BONUS for
+    the first trip, 0 up to max_trips, unusable beyond. Augmentation stops
+    once no path has negative cost, giving the minimum-cost flow of any
+    size. Shortest paths use Bellman-Ford over the bipartite residual
+    graph, vectorized per relaxation round.
+
+    Returns:
+        Integer trips per (group, village).
+    """
+    n_groups, n_villages = cost.shape
+    supply = supply.copy()
+    flow = np.zeros((n_groups, n_villages), dtype=np.int64)
+    used = np.zeros(n_villages, dtype=np.int64)
+    cols = np.arange(n_villages)
+    rows = np.arange(n_groups)
+
+    while supply.any():
+        dist_g = np.where(supply > 0, 0.0, _UNREACHABLE)
+        pred_g = np.full(n_groups, -1)  # -1: reached from the source; else via village reverse arc
+        dist_v = np.full(n_villages, _UNREACHABLE)
+        pred_v = np.full(n_villages, -1)
+
+        # Predecessors only change on strict improvement, so they always
+        # form a tree (ties cannot create zero-cost cycles on the walk back)
+        for _ in range(n_groups + 1):
+            reach = dist_g[:, None] + cost
+            best = reach.argmin(axis=0)
+            cand_v = reach[best, cols]
+            improved_v = cand_v < dist_v - 1e-9
+            dist_v = np.where(improved_v, cand_v, dist_v)
+            pred_v = np.where(improved_v, best, pred_v)
+
+            back = np.where(flow > 0, dist_v[None, :] - cost, _UNREACHABLE)
+            src = back.argmin(axis=1)
+            cand_g = back[rows, src]
+            improved_g = cand_g < dist_g - 1e-9
+            if not improved_g.any():
+                break
+            dist_g = np.where(improved_g, cand_g, dist_g)
+            pred_g = np.where(improved_g, src, pred_g)
+
+        sink = np.where(used == 0, -MIN_SERVICE_BONUS, np.where(used < max_trips, 0.0, _UNREACHABLE))
+        total = dist_v + sink
+        v = int(total.argmin())
+        if total[v] >= -1e-9 or dist_v[v] >= _UNREACHABLE / 2:
+            break
+
+        # Walk the path back to the source, rerouting along reverse arcs
+        used[v] += 1
+        g = int(pred_v[v])
+        flow[g, v] += 1
+        while pred_g[g] >= 0:
+            prev_v = int(pred_g[g])
+            flow[g, prev_v] -= 1
+            g = int(pred_v[prev_v])
+            flow[g, prev_v] += 1
+        supply[g] -= 1
+
+    return flow
+
+
+def _materialize(
+    flow: np.ndarray,
+    groups: list[dict],
+    villages: list[dict],
+    deficit: np.ndarray,
+    distance: np.ndarray,
+    seconds: np.ndarray,
+) -> list[dict]:
+    """Turn group → village trip counts into per-tanker allocations."""
+    pools = [list(g["tankers"]) for g in groups]
+    trips: dict[int, list[tuple[dict, int]]] = {}
+    for g, v in zip(*np.nonzero(flow)):
+        for _ in range(int(flow[g, v])):
+            trips.setdefault(int(v), []).append((pools[g].pop(0), int(g)))
+
+    allocations = []
+    for v in sorted(trips):
+        village = villages[v]
+        remaining = float(deficit[v])
+        # Largest tankers first so the last trip carries the remainder
+        for tanker, g in sorted(trips[v], key=lambda tg: (-tg[0]["capacity_liters"], tg[0]["id"])):
+            allocated = min(remaining, float(tanker["capacity_liters"]))
+            remaining -= allocated
+            allocations.append({
+                "village_id": village["id"],
+                "village_name": village["name"],
+                "tanker_id": tanker["id"],
+                "allocated_liters": allocated,
+                "deficit_liters": float(deficit[v]),
+                "priority_score": village.get("priority_score", 0),
+                "depot_id": groups[g]["depot_id"],
+                "distance_km": round(float(distance[g, v]), 2),
+                "travel_min": None if np.isnan(seconds[g, v]) else round(float(seconds[g, v]) / 60.0, 1),
+            })
+
+    served = {a["village_id"] for a in allocations}
+    logger.info(
+        "Fleet optimizer: %d tankers → %d of %d needy villages",
+        len(allocations), len(served), len(villages),
+    )
+    return allocations
+
@@ -0,0 +1,416 @@
+"""
+Tanker Fleet State — lifecycle tracking and reservations.
+
+Tankers move through an explicit state machine:
+
+    Available ──reserve──▶ Reserved ──dispatch──▶ Dispatched ──▶ Returning ──▶ Available
+        ▲                     │ (lease expires / release)                        │
+        └─────────────────────┘                          Maintenance ◀───────────┘
+
+Every write is an optimistic compare-and-set on the tanker's version
+column, so two planners racing for the same tanker cannot both win: the
+loser sees a conflict and re-plans with what is left. A Reserved tanker
+carries a lease; if it is not dispatched before the lease expires it is
+treated as Available again.
+
+An in-memory index of the fleet (refreshed every FLEET_REFRESH_SECONDS,
+after any lost race, and kept current by our own writes) answers "which
+tankers are available and how much capacity is free" without scanning
+the tankers table on every request.
+"""
+
+import threading
+import time
+from datetime import date
+
+from app.core.constants import (
+    FLEET_REFRESH_SECONDS,
+    FLEET_RESERVATION_LEASE_SECONDS,
+    FLEET_RESERVE_MAX_ROUNDS,
+)
+from app.database.queries import get_all_tankers, record_village_service, update_tanker_if_version
+from app.database.repository import VillageTable
+from app.services.fleet_optimizer import load_optimizer_inputs, optimize_allocation
+from app.services.road_network import TravelTimeMatrix, road_network
+from app.services.tanker_allocator import (
+    allocate_tankers,
+    calculate_deficit,
+    enrich_villages,
+    repair_allocation,
+    select_needy_villages,
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+AVAILABLE = "Available"
+RESERVED = "Reserved"
+DISPATCHED = "Dispatched"
+RETURNING = "Returning"
+MAINTENANCE = "Maintenance"
+
+FLEET_STATES = (AVAILABLE, RESERVED, DISPATCHED, RETURNING, MAINTENANCE)
+
+# Allocation planners: "priority" is the original greedy allocate_tankers,
+# "optimized" the multi-depot fairness-aware fleet optimizer
+PLANNING_MODES = ("priority", "optimized")
+
+# Allowed transitions: current state → reachable states
+TRANSITIONS = {
+    AVAILABLE: {RESERVED, MAINTENANCE},
+    RESERVED: {DISPATCHED, AVAILABLE, RESERVED, MAINTENANCE},  # Reserved → Reserved: reassigned by repair
+    DISPATCHED: {RETURNING, MAINTENANCE},                      # Maintenance: breakdown en route
+    RETURNING: {AVAILABLE, MAINTENANCE},
+    MAINTENANCE: {AVAILABLE},
+}
+
+
+class InvalidTransitionError(ValueError):
+    """Raised when a tanker cannot move from its current state to the requested one."""
+
+
+class FleetConflictError(RuntimeError):
+    """Raised when a tanker was modified concurrently (optimistic lock lost)."""
+
+
+def _effective_status(tanker: dict, now: float) -> str:
+    """A Reserved tanker whose lease has run out counts as Available."""
+    if tanker["status"] == RESERVED and (tanker.get("lease_expires_at") or 0) <= now:
+        return AVAILABLE
+    return tanker["status"]
+
+
+class FleetState:
+    """In-memory fleet index backed by optimistic writes to the tankers table."""
+
+    def __init__(self, refresh_interval: float = FLEET_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self.version = 0  # Bumped on every observed change (used in ETags)
+
+        self._tankers: dict[str, dict] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.RLock()
+
+    # -----------------------------------------------------------------------
+    # Index
+    # -----------------------------------------------------------------------
+
+    def refresh(self) -> None:
+        """Reload the fleet from the database."""
+        tankers = {t["id"]: t for t in get_all_tankers()}
+        with self._lock:
+            if tankers != self._tankers:
+                self.version += 1
+            self._tankers = tankers
+            self._loaded_at = time.monotonic()
+
+    def _ensure_fresh(self) -> None:
+        if not self._tankers or time.monotonic() - self._loaded_at >= self.refresh_interval:
+            self.refresh()
+
+    def get(self, tanker_id: str) -> dict | None:
+        """Return a tanker with its effective status, or None if unknown."""
+        self._ensure_fresh()
+        with self._lock:
+            tanker = self._tankers.get(tanker_id)
+            if tanker is None:
+                return None
+            return {**tanker, "status": _effective_status(tanker, time.time())}
+
+    def all_tankers(self) -> list[dict]:
+        """Return every tanker with its effective status, ordered by ID."""
+        self._ensure_fresh()
+        now = time.time()
+        with self._lock:
+            return [
+                {**t, "status": _effective_status(t, now)}
+                for _, t in sorted(self._tankers.items())
+            ]
+
+    def available_tankers(self) -> list[dict]:
+        """Return tankers free for allocation (ordered by ID), in allocator shape."""
+        return [
+            {
+                "id": t["id"],
+                "capacity_liters": t["capacity_liters"],
+                "status": AVAILABLE,
+                "depot_id": t.get("depot_id"),
+            }
+            for t in self.all_tankers()
+            if t["status"] == AVAILABLE
+        ]
+
+    def summary(self) -> dict:
+        """Counts per state plus free capacity."""
+        tankers = self.all_tankers()
+        counts = {state: 0 for state in FLEET_STATES}
+        for t in tankers:
+            counts[t["status"]] = counts.get(t["status"], 0) + 1
+        return {
+            "total": len(tankers),
+            "by_status": counts,
+            "available_capacity_liters": sum(
+                t["capacity_liters"] for t in tankers if t["status"] == AVAILABLE
+            ),
+        }
+
+    # -----------------------------------------------------------------------
+    # Transitions
+    # -----------------------------------------------------------------------
+
+    def transition(
+        self,
+        tanker_id: str,
+        to_state: str,
+        village_id: str | None = None,
+        lease_seconds: float = FLEET_RESERVATION_LEASE_SECONDS,
+    ) -> dict:
+        """
+        Move a tanker to a new state with an optimistic compare-and-set.
+
+        Args:
+            tanker_id: The tanker to move.
+            to_state: Target state (one of FLEET_STATES).
+            village_id: Village the tanker is reserved for (Reserved only).
+            lease_seconds: Reservation lease length (Reserved only).
+
+        Returns:
+            The updated tanker.
+
+        Raises:
+            KeyError: Unknown tanker.
+            InvalidTransitionError: The state machine does not allow the move.
+            FleetConflictError: The tanker changed concurrently.
+        """
+        current = self.get(tanker_id)
+        if current is None:
+            raise KeyError(tanker_id)
+
+        if to_state not in TRANSITIONS.get(current["status"], set()):
+            raise InvalidTransitionError(
+                f"Tanker {tanker_id} cannot move from {current['status']} to {to_state}"
+            )
+        if to_state == RESERVED and not village_id:
+            raise InvalidTransitionError("A reservation needs a village_id")
+
+        changes = {"status": to_state}
+        if to_state == RESERVED:
+            changes["assigned_village_id"] = village_id
+            changes["lease_expires_at"] = time.time() + lease_seconds
+        elif to_state == DISPATCHED:
+            changes["lease_expires_at"] = None
+        elif to_state in (AVAILABLE, MAINTENANCE):
+            changes["assigned_village_id"] = None
+            changes["lease_expires_at"] = None
+
+        if not update_tanker_if_version(tanker_id, current["version"], changes):
+            # Someone else got there first — resync so the next plan sees it
+            self.refresh()
+            raise FleetConflictError(f"Tanker {tanker_id} was modified concurrently")
+
+        with self._lock:
+            updated = {**self._tankers[tanker_id], **changes, "version": current["version"] + 1}
+            self._tankers[tanker_id] = updated
+            self.version += 1
+
+        logger.info("Tanker %s: %s → %s", tanker_id, current["status"], to_state)
+        return updated
+
+    def reserve_allocation(self, villages: VillageTable, mode: str = "priority") -> dict:
+        """
+        Plan an allocation and reserve every assigned tanker.
+
+        Villages that already hold a Reserved or Dispatched tanker are left
+        out. Tankers lost to a concurrent planner are skipped and the
+        affected villages re-planned against what is still available, for
+        up to FLEET_RESERVE_MAX_ROUNDS rounds. The day's deliveries and
+        deficits are added to the service log that drives fairness.
+
+        Args:
+            villages: Columnar village snapshot from the repository.
+            mode: One of PLANNING_MODES.
+
+        Returns:
+            The reserved allocation plan (total_villages_in_need counts every
+            village above the threshold, as in the preview; already_covered
+            those that held a tanker before this call) plus the IDs of
+            tankers lost to concurrent reservations.
+        """
+        plan_round = _planner(mode, road_network.matrix(villages))
+        covered = {
+            t["assigned_village_id"]
+            for t in self.all_tankers()
+            if t["status"] in (RESERVED, DISPATCHED)
+        }
+        all_needy = select_needy_villages(villages)
+        needy = [v for v in all_needy if v["id"] not in covered]
+        reserved: list[dict] = []
+        conflicts: list[str] = []
+
+        for _ in range(FLEET_RESERVE_MAX_ROUNDS):
+            served = {a["village_id"] for a in reserved}
+            remaining = [v for v in needy if v["id"] not in served]
+            plan = plan_round(remaining, self.available_tankers())
+            if not plan:
+                break
+
+            lost = False
+            for allocation in plan:
+                try:
+                    tanker = self.transition(
+                        allocation["tanker_id"], RESERVED, village_id=allocation["village_id"]
+                    )
+                except (FleetConflictError, InvalidTransitionError):
+                    conflicts.append(allocation["tanker_id"])
+                    lost = True
+                    continue
+                reserved.append({**allocation, "lease_expires_at": tanker["lease_expires_at"]})
+
+            if not lost:
+                break
+
+        _record_service(needy, reserved)
+
+        return {
+            "mode": mode,
+            "total_villages_in_need": len(all_needy),
+            "already_covered": len(all_needy) - len(needy),
+            "villages_served": len({a["village_id"] for a in reserved}),
+            "total_tankers_assigned": len(reserved),
+            "allocations": reserved,
+            "conflicts": conflicts,
+        }
+
+    def repair_reservations(
+        self,
+        villages: VillageTable,
+        changed_village_ids=(),
+        removed_tanker_ids=(),
+    ) -> dict:
+        """
+        Incrementally repair the active plan after a disruption.
+
+        Removed tankers (breakdowns) are moved to Maintenance, then
+        repair_allocation reworks only the affected villages, taking free
+        tankers from the nearest depot by road when a road graph is loaded;
+        dispatched tankers are never moved. Only tankers whose assignment actually
+        changes are written.
+
+        Args:
+            villages: Columnar village snapshot from the repository.
+            changed_village_ids: Villages whose data changed.
+            removed_tanker_ids: Tankers withdrawn from service.
+
+        Returns:
+            The repair result (changes, kept, allocations) plus conflicts
+            and the planning time in milliseconds.
+        """
+        removed = []
+        for tanker_id in removed_tanker_ids:
+            tanker = self.get(tanker_id)
+            if tanker is None:
+                raise KeyError(tanker_id)
+            removed.append(tanker)
+
+        conflicts: list[str] = []
+        withdrawn: list[dict] = []
+        for tanker in removed:
+            tanker_id = tanker["id"]
+            if tanker["status"] == MAINTENANCE:
+                continue
+            try:
+                self.transition(tanker_id, MAINTENANCE)
+            except (FleetConflictError, InvalidTransitionError):
+                conflicts.append(tanker_id)
+                continue
+            if tanker["status"] in (RESERVED, DISPATCHED) and tanker["assigned_village_id"]:
+                withdrawn.append(tanker)
+
+        travel = road_network.matrix(villages)
+        started = time.perf_counter()
+        active = [
+            t for t in self.all_tankers()
+            if t["status"] in (RESERVED, DISPATCHED) and t["assigned_village_id"]
+        ] + withdrawn
+        planned = {v["id"]: v for v in enrich_villages(villages, {t["assigned_village_id"] for t in active})}
+
+        previous = []
+        for t in active:
+            village = planned.get(t["assigned_village_id"])
+            if village is None:
+                continue
+            deficit = calculate_deficit(village["population"], village["gw_current_level"], village["gw_min_required"])
+            previous.append({
+                "village_id": village["id"],
+                "village_name": village["name"],
+                "tanker_id": t["id"],
+                "capacity_liters": t["capacity_liters"],
+                "depot_id": t.get("depot_id"),
+                "allocated_liters": min(deficit, t["capacity_liters"]),
+                "deficit_liters": deficit,
+                "priority_score": village["priority_score"],
+            })
+
+        result = repair_allocation(
+            previous=previous,
+            changed_villages=enrich_villages(villages, changed_village_ids),
+            free_tankers=self.available_tankers(),
+            removed_tanker_ids=[t["id"] for t in withdrawn],
+            locked_tanker_ids={t["id"] for t in active if t["status"] == DISPATCHED},
+            travel=travel,
+        )
+        planning_ms = (time.perf_counter() - started) * 1000.0
+
+        # Final destination per tanker (a released tanker may be reassigned)
+        targets: dict[str, str | None] = {}
+        for change in result["changes"]:
+            if change["reason"] != "tanker_removed":
+                targets[change["tanker_id"]] = change["to_village_id"]
+
+        for tanker_id, village_id in targets.items():
+            try:
+                if village_id is None:
+                    self.transition(tanker_id, AVAILABLE)
+                else:
+                    self.transition(tanker_id, RESERVED, village_id=village_id)
+            except (FleetConflictError, InvalidTransitionError):
+                conflicts.append(tanker_id)
+
+        logger.info(
+            "Allocation repair: %d changes, %d kept, %d conflicts (planned in %.1fms)",
+            len(result["changes"]), result["kept"], len(conflicts), planning_ms,
+        )
+        return {**result, "conflicts": conflicts, "planning_ms": round(planning_ms, 3)}
+
+
+def _planner(mode: str, travel: TravelTimeMatrix | None = None):
+    """Return plan(villages, tankers) -> allocations for a planning mode."""
+    if mode == "optimized":
+        depots, history = load_optimizer_inputs()
+        return lambda villages, tankers: optimize_allocation(villages, tankers, depots, history, travel)
+    if mode == "priority":
+        return lambda villages, tankers: allocate_tankers(villages=villages, tankers=tankers, travel=travel)
+    raise ValueError(f"Unknown planning mode '{mode}'. Use one of: {', '.join(PLANNING_MODES)}")
+
+
+def _record_service(needy: list[dict], reserved: list[dict]) -> None:
+    """Log today's reserved liters against every needy village's deficit."""
+    delivered: dict[str, float] = {}
+    for a in reserved:
+        delivered[a["village_id"]] = delivered.get(a["village_id"], 0.0) + a["allocated_liters"]
+
+    service = {}
+    for v in needy:
+        deficit = calculate_deficit(v["population"], v["gw_current_level"], v["gw_min_required"])
+        if deficit > 0:
+            service[v["id"]] = (delivered.get(v["id"], 0.0), deficit)
+
+    try:
+        record_village_service(date.today(), service)
+    except Exception as exc:
+        # Fairness history is best-effort — a failed write must not undo reservations
+        logger.error("Failed to record village service log: %s", exc)
+
+
+# Process-wide fleet index
+fleet_state = FleetState()
@@ -0,0 +1,253 @@
+"""
+Groundwater Ingestion Service — bulk sensor uploads.
+
+Accepts large CSV or NDJSON batches of groundwater readings from telemetry
+loggers. Rows are parsed and validated chunk by chunk as they stream in,
+deduplicated per village (latest recorded_at wins, otherwise the last row
+seen), and finally upserted in bounded-size batches across a small thread
+pool with exponential-backoff retries. Affected villages are announced via
+data_events so in-process caches and the live hub refresh.
+
+STRICT RULES:
+- This module does NOT compute WSI or any other derived metric.
+- Database access goes through app.database.queries only.
+"""
+
+import csv
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Container
+
+from app.core.constants import (
+    INGEST_BACKOFF_BASE_SECONDS,
+    INGEST_BATCH_SIZE,
+    INGEST_CONCURRENCY,
+    INGEST_MAX_ERRORS_REPORTED,
+    INGEST_MAX_RETRIES,
+)
+from app.database.queries import upsert_groundwater_rows
+from app.services.data_events import publish_village_data_changed
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+
+REQUIRED_FIELDS = ("village_id", "gw_current_level")
+OPTIONAL_FIELDS = ("gw_min_required", "gw_max_capacity", "rainfall_dev_pct")
+
+# Plausibility bounds — values outside are rejected as sensor faults
+LEVEL_RANGE = (0.0, 1_000.0)            # meters
+RAINFALL_DEV_RANGE = (-100.0, 1_000.0)  # percent
+
+
+class GroundwaterIngestJob:
+    """
+    One bulk upload.
+
+    Feed raw lines with add_lines() as they arrive, then call commit() to
+    write the deduplicated rows and get the ingestion report.
+    """
+
+    def __init__(self, fmt: str, known_village_ids: Container[str]):
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported format '{fmt}'. Use one of: {', '.join(SUPPORTED_FORMATS)}")
+
+        self.fmt = fmt
+        self.known_village_ids = known_village_ids
+
+        self._header: list[str] | None = None
+        self._latest: dict[str, tuple[datetime | None, dict]] = {}
+        self._started = time.perf_counter()
+
+        self.rows_received = 0
+        self.rows_rejected = 0
+        self.duplicates = 0
+        self.errors: list[str] = []
+
+    # -----------------------------------------------------------------------
+    # Parsing & validation
+    # -----------------------------------------------------------------------
+
+    def add_lines(self, lines: list[str]) -> None:
+        """Parse, validate and deduplicate one chunk of raw lines."""
+        for raw in self._parse(lines):
+            self.rows_received += 1
+            try:
+                recorded_at, row = _validate_row(raw, self.known_village_ids)
+            except ValueError as exc:
+                self._reject(f"row {self.rows_received}: {exc}")
+                continue
+            self._keep_latest(recorded_at, row)
+
+    def _parse(self, lines: list[str]):
+        if self.fmt == "ndjson":
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    self.rows_received += 1
+                    self._reject(f"row {self.rows_received}: invalid JSON ({exc.msg})")
+                    continue
+                if not isinstance(record, dict):
+                    self.rows_received += 1
+                    self._reject(f"row {self.rows_received}: expected a JSON object")
+                    continue
+                yield record
+            return
+
+        for values in csv.reader(line for line in lines if line.strip()):
+            if self._header is None:
+                self._header = [h.strip() for h in values]
+                continue
+            yield dict(zip(self._header, values))
+
+    def _keep_latest(self, recorded_at: datetime | None, row: dict) -> None:
+        vid = row["village_id"]
+        existing = self._latest.get(vid)
+        if existing is not None:
+            self.duplicates += 1
+            existing_at = existing[0]
+            if recorded_at is not None and existing_at is not None and recorded_at < existing_at:
+                return
+        self._latest[vid] = (recorded_at, row)
+
+    def _reject(self, message: str) -> None:
+        self.rows_rejected += 1
+        if len(self.errors) < INGEST_MAX_ERRORS_REPORTED:
+            self.errors.append(message)
+
+    # -----------------------------------------------------------------------
+    # Write
+    # -----------------------------------------------------------------------
+
+    def commit(self) -> dict:
+        """
+        Upsert all deduplicated rows in bounded batches (blocking).
+
+        Returns:
+            The ingestion report.
+        """
+        batches = _build_batches([row for _, row in self._latest.values()])
+
+        failed_batches = 0
+        written_ids: set[str] = set()
+        if batches:
+            with ThreadPoolExecutor(max_workers=INGEST_CONCURRENCY) as pool:
+                for batch, ok in zip(batches, pool.map(_upsert_with_retry, batches)):
+                    if ok:
+                        written_ids.update(row["village_id"] for row in batch)
+                    else:
+                        failed_batches += 1
+
+        publish_village_data_changed(written_ids)
+
+        elapsed = time.perf_counter() - self._started
+        logger.info(
+            "Groundwater ingest: %d rows received, %d rejected, %d duplicates, "
+            "%d villages upserted in %d batches (%d failed) — %.2fs",
+            self.rows_received, self.rows_rejected, self.duplicates,
+            len(written_ids), len(batches), failed_batches, elapsed,
+        )
+
+        return {
+            "rows_received": self.rows_received,
+            "rows_rejected": self.rows_rejected,
+            "duplicates": self.duplicates,
+            "villages_upserted": len(written_ids),
+            "batches": len(batches),
+            "failed_batches": failed_batches,
+            "elapsed_sec": round(elapsed, 3),
+            "errors": self.errors,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Internal Helpers
+# ---------------------------------------------------------------------------
+
+def _parse_float(raw: dict, field: str, bounds: tuple[float, float]) -> float:
+    try:
+        value = float(raw[field])
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} is not a number ({raw[field]!r})")
+    if not bounds[0] <= value <= bounds[1]:
+        raise ValueError(f"{field}={value} outside plausible range {bounds}")
+    return value
+
+
+def _validate_row(raw: dict, known_village_ids: Container[str]) -> tuple[datetime | None, dict]:
+    """
+    Validate one raw reading and normalise it to a groundwater row.
+
+    Returns:
+        (recorded_at or None, row)
+
+    Raises:
+        ValueError: If the reading is malformed or implausible.
+    """
+    for field in REQUIRED_FIELDS:
+        if raw.get(field) in (None, ""):
+            raise ValueError(f"missing {field}")
+
+    vid = str(raw["village_id"]).strip()
+    if vid not in known_village_ids:
+        raise ValueError(f"unknown village_id {vid!r}")
+
+    row = {"village_id": vid, "gw_current_level": _parse_float(raw, "gw_current_level", LEVEL_RANGE)}
+    for field in OPTIONAL_FIELDS:
+        if raw.get(field) not in (None, ""):
+            bounds = RAINFALL_DEV_RANGE if field == "rainfall_dev_pct" else LEVEL_RANGE
+            row[field] = _parse_float(raw, field, bounds)
+
+    recorded_at = None
+    if raw.get("recorded_at") not in (None, ""):
+        try:
+            recorded_at = datetime.fromisoformat(str(raw["recorded_at"]).replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"recorded_at is not ISO-8601 ({raw['recorded_at']!r})")
+        if recorded_at.tzinfo is None:
+            raise ValueError("recorded_at must include a timezone offset")
+
+    return recorded_at, row
+
+
+def _build_batches(rows: list[dict]) -> list[list[dict]]:
+    """
+    Split rows into upsert batches of at most INGEST_BATCH_SIZE.
+
+    Rows are grouped by column set first, since an upsert applies the same
+    columns to every row in the call.
+    """
+    groups: dict[tuple, list[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    batches = []
+    for group in groups.values():
+        for start in range(0, len(group), INGEST_BATCH_SIZE):
+            batches.append(group[start:start + INGEST_BATCH_SIZE])
+    return batches
+
+
+def _upsert_with_retry(batch: list[dict]) -> bool:
+    """Upsert one batch, retrying with exponential backoff and jitter."""
+    for attempt in range(INGEST_MAX_RETRIES + 1):
+        try:
+            upsert_groundwater_rows(batch)
+            return True
+        except Exception as exc:
+            if attempt == INGEST_MAX_RETRIES:
+                logger.error("Groundwater upsert of %d rows failed after %d attempts: %s",
+                             len(batch), attempt + 1, exc)
+                return False
+            delay = INGEST_BACKOFF_BASE_SECONDS * (2 ** attempt) * (0.5 + random.random())
+            logger.warning("Groundwater upsert failed (attempt %d), retrying in %.2fs: %s",
+                           attempt + 1, delay, exc)
+            time.sleep(delay)
+    return False
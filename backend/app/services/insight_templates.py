@@ -0,0 +1,154 @@
+"""
+Insight Templates — deterministic advisory text.
+
+Renders the same three-point structure the AI engine is asked for
+(Primary Cause / Impact / Directive) from the pre-computed village
+metrics, in English, Marathi or Hindi. Rendering is a few string
+formats, so a template advisory is always available instantly — whether
+or not Ollama is up — and is replaced by the LLM text once that is ready.
+
+STRICT RULES:
+- No calculations beyond choosing a sentence from the computed metrics.
+- No AI/LLM calls.
+"""
+
+from app.core.constants import WSI_CRITICAL_THRESHOLD, WSI_MODERATE_THRESHOLD
+
+RAIN_DEFICIT_PCT = -10.0        # Rainfall deviation at or below this is reported as a cause
+GW_DROP_M = 0.5                 # Groundwater drop at or above this is reported as a cause
+
+TEMPLATES = {
+    "english": {
+        "headings": ("Primary Cause", "Impact", "Directive"),
+        "status": {"critical": "Critical", "moderate": "Moderate", "safe": "Safe"},
+        "cause": {
+            "both": "WSI is {wsi}/100 ({status}) because rainfall is {rain}% below normal and groundwater is {gw} m below capacity.",
+            "rain": "WSI is {wsi}/100 ({status}) because rainfall is {rain}% below normal.",
+            "groundwater": "WSI is {wsi}/100 ({status}) because groundwater is {gw} m below capacity.",
+            "none": "WSI is {wsi}/100 ({status}); rainfall and groundwater are within the normal range.",
+        },
+        "impact": {
+            "critical": "{population} residents face an acute drinking-water shortage.",
+            "moderate": "{population} residents are at risk of a water shortage if the deficit persists.",
+            "safe": "There is no immediate risk to the {population} residents.",
+        },
+        "directive": {
+            "critical_tankers": "Dispatch the {tankers} allocated tanker(s) immediately and monitor daily supply.",
+            "critical": "Allocate emergency tankers immediately and monitor daily supply.",
+            "moderate": "Keep tankers on standby and restrict non-essential groundwater extraction.",
+            "safe": "Continue routine monitoring of groundwater and rainfall.",
+        },
+    },
+    "marathi": {
+        "headings": ("मुख्य कारण", "परिणाम", "निर्देश"),
+        "status": {"critical": "गंभीर", "moderate": "मध्यम", "safe": "सुरक्षित"},
+        "cause": {
+            "both": "पाऊस सामान्यपेक्षा {rain}% कमी झाला आहे आणि भूजल पातळी क्षमतेपेक्षा {gw} मी. खाली गेली आहे, त्यामुळे WSI {wsi}/100 ({status}) आहे.",
+            "rain": "पाऊस सामान्यपेक्षा {rain}% कमी झाला आहे, त्यामुळे WSI {wsi}/100 ({status}) आहे.",
+            "groundwater": "भूजल पातळी क्षमतेपेक्षा {gw} मी. खाली गेली आहे, त्यामुळे WSI {wsi}/100 ({status}) आहे.",
+            "none": "पाऊस आणि भूजल पातळी सामान्य मर्यादेत आहेत; WSI {wsi}/100 ({status}) आहे.",
+        },
+        "impact": {
+            "critical": "{population} रहिवाशांना पिण्याच्या पाण्याची तीव्र टंचाई भासत आहे.",
+            "moderate": "तूट कायम राहिल्यास {population} रहिवाशांना पाणीटंचाईचा धोका आहे.",
+            "safe": "{population} रहिवाशांना सध्या कोणताही तात्काळ धोका नाही.",
+        },
+        "directive": {
+            "critical_tankers": "वाटप केलेले {tankers} टँकर तात्काळ रवाना करा आणि दैनंदिन पाणीपुरवठ्यावर लक्ष ठेवा.",
+            "critical": "तात्काळ आपत्कालीन टँकर वाटप करा आणि दैनंदिन पाणीपुरवठ्यावर लक्ष ठेवा.",
+            "moderate": "टँकर सज्ज ठेवा आणि अनावश्यक भूजल उपसा मर्यादित करा.",
+            "safe": "भूजल आणि पावसाचे नियमित निरीक्षण सुरू ठेवा.",
+        },
+    },
+    "hindi": {
+        "headings": ("मुख्य कारण", "प्रभाव", "निर्देश"),
+        "status": {"critical": "गंभीर", "moderate": "मध्यम", "safe": "सुरक्षित"},
+        "cause": {
+            "both": "वर्षा सामान्य से {rain}% कम हुई है और भूजल स्तर क्षमता से {gw} मी. नीचे है, इसलिए WSI {wsi}/100 ({status}) है।",
+            "rain": "वर्षा सामान्य से {rain}% कम हुई है, इसलिए WSI {wsi}/100 ({status}) है।",
+            "groundwater": "भूजल स्तर क्षमता से {gw} मी. नीचे है, इसलिए WSI {wsi}/100 ({status}) है।",
+            "none": "वर्षा और भूजल स्तर सामान्य सीमा में हैं; WSI {wsi}/100 ({status}) है।",
+        },
+        "impact": {
+            "critical": "{population} निवासियों को पेयजल की गंभीर कमी का सामना करना पड़ रहा है।",
+            "moderate": "कमी बनी रहने पर {population} निवासियों को जल संकट का खतरा है।",
+            "safe": "{population} निवासियों के लिए फिलहाल कोई तात्कालिक खतरा नहीं है।",
+        },
+        "directive": {
+            "critical_tankers": "आवंटित {tankers} टैंकर तुरंत रवाना करें और दैनिक जलापूर्ति की निगरानी करें।",
+            "critical": "तुरंत आपातकालीन टैंकर आवंटित करें और दैनिक जलापूर्ति की निगरानी करें।",
+            "moderate": "टैंकर तैयार रखें और गैर-ज़रूरी भूजल दोहन सीमित करें।",
+            "safe": "भूजल और वर्षा की नियमित निगरानी जारी रखें।",
+        },
+    },
+}
+
+LANGUAGE_ALIASES = {"en": "english", "mr": "marathi", "hi": "hindi", "मराठी": "marathi", "हिन्दी": "hindi"}
+
+
+def template_language(target_language: str) -> str:
+    """Template language for a requested language (English when there is no template for it)."""
+    lang = target_language.strip().lower()
+    lang = LANGUAGE_ALIASES.get(lang, lang)
+    return lang if lang in TEMPLATES else "english"
+
+
+def render_insight_template(
+    village_name: str,
+    population: int,
+    wsi: float,
+    status: str,
+    r_dev: float,
+    g_drop: float,
+    tankers: int,
+    target_language: str = "English",
+) -> str:
+    """
+    Render the 3-point advisory from pre-computed metrics.
+
+    Takes the same arguments as ai_insight_engine.generate_drought_insight
+    (status is re-derived from wsi so it can be localized).
+
+    Returns:
+        Advisory text with exactly 3 numbered points.
+    """
+    t = TEMPLATES[template_language(target_language)]
+
+    if wsi > WSI_CRITICAL_THRESHOLD:
+        band = "critical"
+    elif wsi > WSI_MODERATE_THRESHOLD:
+        band = "moderate"
+    else:
+        band = "safe"
+
+    # A safe WSI is not attributed to a cause, whatever the raw readings
+    rain_short = band != "safe" and r_dev <= RAIN_DEFICIT_PCT
+    gw_short = band != "safe" and g_drop >= GW_DROP_M
+    if rain_short and gw_short:
+        cause = "both"
+    elif rain_short:
+        cause = "rain"
+    elif gw_short:
+        cause = "groundwater"
+    else:
+        cause = "none"
+
+    directive = "critical_tankers" if band == "critical" and tankers > 0 else band
+    values = {
+        "wsi": f"{wsi:.1f}",
+        "status": t["status"][band],
+        "rain": f"{abs(r_dev):.0f}",
+        "gw": f"{g_drop:.1f}",
+        "population": f"{population:,}",
+        "tankers": tankers,
+    }
+
+    sentences = (
+        t["cause"][cause].format(**values),
+        t["impact"][band].format(**values),
+        t["directive"][directive].format(**values),
+    )
+    return "\n".join(
+        f"{n}. {heading}: {sentence}"
+        for n, (heading, sentence) in enumerate(zip(t["headings"], sentences), start=1)
+    )
@@ -0,0 +1,111 @@
+"""
+Tiered Village Insights.
+
+A village advisory is served in two tiers so the dashboard never waits on
+the LLM:
+
+1. template — rendered instantly from the computed metrics
+   (insight_templates), returned with the first response;
+2. llm      — generated by the AI engine in the background; once ready it
+   is returned by the insight endpoints instead of the template and
+   pushed to live-stream clients as an "insight" event.
+
+InsightUpgrades tracks one background generation per insight key (village
+data + language), so repeated requests and polls never start a second LLM
+call. A failed generation is remembered for INSIGHT_UPGRADE_RETRY_SECONDS,
+during which the template remains the answer.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from app.core.constants import INSIGHT_UPGRADE_CACHE_SIZE, INSIGHT_UPGRADE_RETRY_SECONDS
+from app.services.live_updates import live_hub
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PENDING = "pending"
+READY = "ready"
+UNAVAILABLE = "unavailable"
+RATE_LIMITED = "rate_limited"   # Not started: the caller's LLM bucket is empty (response only, never tracked)
+
+
+class InsightUpgrades:
+    """Background LLM generations by insight key, with bounded history (event loop only)."""
+
+    def __init__(self, maxsize: int = INSIGHT_UPGRADE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+
+    def get(self, key: str) -> dict | None:
+        """The generation tracked for key, if any."""
+        return self._entries.get(key)
+
+    def would_start(self, key: str) -> bool:
+        """True if ensure(key, ...) would start a new generation now."""
+        entry = self._entries.get(key)
+        return entry is None or (
+            entry["state"] == UNAVAILABLE and time.monotonic() - entry["finished_at"] >= INSIGHT_UPGRADE_RETRY_SECONDS
+        )
+
+    def ensure(self, key: str, generate: Callable[[], Awaitable[str]], **context) -> dict:
+        """
+        Return the generation for key, starting it in the background if needed.
+
+        Args:
+            key: Insight key (see single_flight.flight_key).
+            generate: Coroutine factory producing the LLM text; a result
+                starting with "Error:" counts as a failure.
+            context: Extra fields kept on the entry and pushed with the
+                "insight" event (e.g. village_id, language).
+
+        Returns:
+            The entry dict: {"state", "insight", "error", ...context}.
+        """
+        if not self.would_start(key):
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        entry = {"state": PENDING, "insight": None, "error": None, "finished_at": None, **context}
+        self._entries[key] = entry
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+        task = asyncio.create_task(self._generate(entry, generate))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return entry
+
+    def stats(self) -> dict:
+        states = [entry["state"] for entry in self._entries.values()]
+        return {
+            "tracked": len(states),
+            PENDING: states.count(PENDING),
+            READY: states.count(READY),
+            UNAVAILABLE: states.count(UNAVAILABLE),
+        }
+
+    async def _generate(self, entry: dict, generate: Callable[[], Awaitable[str]]) -> None:
+        try:
+            text = await generate()
+        except Exception as exc:
+            text = f"Error: {exc}"
+
+        entry["finished_at"] = time.monotonic()
+        if text.startswith("Error:"):
+            entry["state"] = UNAVAILABLE
+            entry["error"] = text
+        else:
+            entry["state"] = READY
+            entry["insight"] = text
+
+        payload = {k: v for k, v in entry.items() if k not in ("finished_at", "error")}
+        live_hub.broadcast("insight", {**payload, "llm_status": payload.pop("state")})
+
+
+# Process-wide instance
+insight_upgrades = InsightUpgrades()
@@ -0,0 +1,309 @@
+"""
+Job Runner — managed process pool for CPU-heavy planning work.
+
+Allocation planning, scenario sweeps and Monte Carlo simulation are pure
+numpy/Python CPU work; run on the event-loop thread (or a thread) they
+hold the GIL and slow every dashboard read. The runner executes them in
+worker processes instead.
+
+The pool is a set of lanes, each a single-process multiprocessing.Pool.
+Workers stay warm across jobs, and because every lane owns exactly one
+process, a job that times out or is cancelled mid-run is stopped by
+terminating only its lane (which is then replaced) without disturbing
+jobs on other lanes.
+
+Two ways in:
+    await job_runner.run(fn, *args)          — request-scoped, returns the result
+    job_runner.submit(kind, fn, *args)       — background job, polled via /api/jobs/{id}
+
+fn must be a module-level function and its arguments picklable. The
+runner starts with the application lifespan (and lazily on first use).
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+import uuid
+from collections import OrderedDict
+
+from app.core.constants import (
+    JOB_DEFAULT_TIMEOUT_SECONDS,
+    JOB_HISTORY_SIZE,
+    JOB_POOL_WORKERS,
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed_out"
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED, TIMED_OUT)
+
+
+class JobFailedError(RuntimeError):
+    """Raised by run() when the job raised inside the worker."""
+
+
+class JobTimeoutError(TimeoutError):
+    """Raised by run() when the job exceeded its timeout."""
+
+
+class Job:
+    """One unit of work submitted to the runner."""
+
+    def __init__(self, kind: str, timeout: float | None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.timeout = timeout
+        self.status = QUEUED
+        self.submitted_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.result = None
+        self.error: str | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self, include_result: bool = False) -> dict:
+        data = {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "timeout_sec": self.timeout,
+            "error": self.error,
+        }
+        if include_result and self.status == SUCCEEDED:
+            data["result"] = self.result
+        return data
+
+
+class _Lane:
+    """A single warm worker process."""
+
+    def __init__(self, ctx):
+        self.pool = ctx.Pool(processes=1)
+        self.alive = True
+
+    def terminate(self) -> None:
+        self.alive = False
+        self.pool.terminate()
+        self.pool.join()
+
+    def close(self) -> None:
+        self.pool.close()
+        self.pool.join()
+
+
+class JobRunner:
+    """Process-pool job executor with timeouts, cancellation and status tracking."""
+
+    def __init__(self, workers: int = JOB_POOL_WORKERS, history_size: int = JOB_HISTORY_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.history_size = history_size
+
+        self._ctx = multiprocessing.get_context(
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        self._idle: asyncio.Queue | None = None
+        self._lanes: list[_Lane] = []
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._inline: set[Job] = set()          # run() jobs: awaited by the caller, not in history
+        self._start_lock: asyncio.Lock | None = None
+
+    # -----------------------------------------------------------------------
+    # Lifecycle
+    # -----------------------------------------------------------------------
+
+    @property
+    def started(self) -> bool:
+        return self._idle is not None
+
+    async def start(self) -> None:
+        """Spawn the worker lanes (idempotent)."""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self.started:
+                return
+            lanes = await asyncio.to_thread(lambda: [_Lane(self._ctx) for _ in range(self.workers)])
+            self._lanes = lanes
+            self._idle = asyncio.Queue()
+            for lane in lanes:
+                self._idle.put_nowait(lane)
+            logger.info("Job runner started with %d worker processes", self.workers)
+
+    async def stop(self) -> None:
+        """Cancel outstanding jobs and shut the workers down."""
+        if not self.started:
+            return
+        jobs = [*self._jobs.values(), *self._inline]
+        for job in jobs:
+            if not job.done and job._task is not None:
+                job._task.cancel()
+        await asyncio.gather(
+            *(job._task for job in jobs if job._task is not None),
+            return_exceptions=True,
+        )
+        lanes, self._lanes, self._idle = self._lanes, [], None
+        await asyncio.to_thread(lambda: [lane.terminate() for lane in lanes])
+        logger.info("Job runner stopped")
+
+    # -----------------------------------------------------------------------
+    # Submission
+    # -----------------------------------------------------------------------
+
+    def submit(self, kind: str, fn, *args, timeout: float | None = JOB_DEFAULT_TIMEOUT_SECONDS, **kwargs) -> Job:
+        """
+        Queue fn(*args, **kwargs) as a background job (call from the event loop).
+
+        Returns:
+            The Job; poll get(job.id) for status and result.
+        """
+        job = self._start(kind, fn, args, kwargs, timeout)
+        self._jobs[job.id] = job
+        self._prune()
+        return job
+
+    async def run(self, fn, *args, timeout: float | None = JOB_DEFAULT_TIMEOUT_SECONDS, **kwargs):
+        """
+        Run fn(*args, **kwargs) in a worker process and return its result.
+
+        Cancelling the caller (e.g. the client disconnects) cancels the job.
+        The job is not listed in /api/jobs history; its result goes only to the caller.
+
+        Raises:
+            JobTimeoutError: The job exceeded its timeout.
+            JobFailedError: The job raised in the worker.
+        """
+        job = self._start(getattr(fn, "__name__", "job"), fn, args, kwargs, timeout)
+        self._inline.add(job)
+        try:
+            await job._task
+        finally:
+            self._inline.discard(job)
+        if job.status == SUCCEEDED:
+            return job.result
+        if job.status == TIMED_OUT:
+            raise JobTimeoutError(job.error)
+        if job.status == CANCELLED:
+            raise asyncio.CancelledError()
+        raise JobFailedError(job.error)
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def list(self) -> list[Job]:
+        """Tracked jobs, newest first."""
+        return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Returns:
+            False if the job is unknown or already finished.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.done or job._task is None:
+            return False
+        job._task.cancel()
+        return True
+
+    # -----------------------------------------------------------------------
+    # Internal Helpers
+    # -----------------------------------------------------------------------
+
+    def _start(self, kind: str, fn, args: tuple, kwargs: dict, timeout: float | None) -> Job:
+        job = Job(kind, timeout)
+        job._task = asyncio.get_running_loop().create_task(self._execute(job, fn, args, kwargs))
+        return job
+
+    async def _execute(self, job: Job, fn, args: tuple, kwargs: dict) -> None:
+        lane = None
+        try:
+            if not self.started:
+                await self.start()
+            lane = await self._idle.get()
+
+            job.status = RUNNING
+            job.started_at = time.time()
+
+            loop = asyncio.get_running_loop()
+            outcome = loop.create_future()
+
+            def _resolve(result):
+                loop.call_soon_threadsafe(lambda: outcome.done() or outcome.set_result(result))
+
+            def _reject(exc):
+                loop.call_soon_threadsafe(lambda: outcome.done() or outcome.set_exception(exc))
+
+            lane.pool.apply_async(fn, args, kwargs, callback=_resolve, error_callback=_reject)
+            job.result = await asyncio.wait_for(outcome, timeout=job.timeout)
+            job.status = SUCCEEDED
+        except asyncio.TimeoutError:
+            job.status = TIMED_OUT
+            job.error = f"Job exceeded {job.timeout}s timeout"
+            lane, abandoned = None, lane
+            await self._replace(abandoned)
+        except asyncio.CancelledError:
+            was_running = job.status == RUNNING
+            job.status = CANCELLED
+            if was_running:
+                lane, abandoned = None, lane
+                await self._replace(abandoned)
+        except Exception as exc:
+            job.status = FAILED
+            job.error = f"{type(exc).__name__}: {exc}"
+            logger.error("Job %s (%s) failed: %s", job.id, job.kind, job.error)
+        finally:
+            job.finished_at = time.time()
+            if lane is not None and lane.alive and self._idle is not None:
+                self._idle.put_nowait(lane)
+
+        if job.status in (CANCELLED, TIMED_OUT):
+            logger.warning("Job %s (%s) %s", job.id, job.kind, job.status)
+
+    async def _replace(self, lane: _Lane) -> None:
+        """
+        Kill a lane whose job was abandoned and queue a fresh one.
+
+        Shielded end to end, so a cancellation arriving mid-replacement cannot
+        drop the fresh lane or leave the terminated one in the idle queue.
+        """
+        await asyncio.shield(self._recycle(lane))
+
+    async def _recycle(self, lane: _Lane) -> None:
+        fresh = await asyncio.to_thread(_recycle_lane, lane, self._ctx)
+        if self._idle is None:
+            # Runner stopped while the replacement was starting
+            await asyncio.to_thread(fresh.terminate)
+            return
+        self._lanes = [fresh if existing is lane else existing for existing in self._lanes]
+        self._idle.put_nowait(fresh)
+
+    def _prune(self) -> None:
+        """Drop the oldest finished jobs beyond history_size."""
+        excess = len(self._jobs) - self.history_size
+        for job_id in [jid for jid, job in self._jobs.items() if job.done][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+
+def _recycle_lane(lane: _Lane, ctx) -> _Lane:
+    lane.terminate()
+    return _Lane(ctx)
+
+
+# Process-wide runner (started/stopped by the application lifespan)
+job_runner = JobRunner()
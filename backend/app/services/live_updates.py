@@ -0,0 +1,283 @@
+"""
+Live Update Hub — server push for dashboards.
+
+A single background task recomputes the village status view and the
+tanker allocation plan, diffs them against the previous snapshot, and
+fans compact delta events out to every connected client. However many
+control-room screens are open, each refresh costs one computation.
+
+Event types:
+    snapshot     — full compact state, sent to each client on connect
+    villages     — villages whose WSI / priority / stress band changed
+    weather      — villages whose live weather reading changed
+    allocations  — allocation decisions added or withdrawn since last refresh
+    insight      — an LLM village advisory finished (see insight_tiers)
+
+STRICT RULES:
+- This module does NOT compute metrics itself; it reuses village_status
+  and tanker_allocator so pushed values match the REST endpoints.
+"""
+
+import asyncio
+import json
+
+from app.core.constants import LIVE_REFRESH_INTERVAL_SECONDS, LIVE_SUBSCRIBER_QUEUE_SIZE
+from app.services.data_events import on_village_data_changed
+from app.services.fleet_state import fleet_state
+from app.services.road_network import road_network
+from app.services.tanker_allocator import build_allocation_plan
+from app.services.village_status import compute_villages_status, fetch_status_inputs
+from app.services.wsi_calculator import wsi_status_label
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _format_sse(event_id: int, event_type: str, payload: dict) -> str:
+    """Encode one Server-Sent Event frame."""
+    data = json.dumps(payload, separators=(",", ":"), default=str)
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+
+def _compute_live_state() -> tuple[dict, dict, dict]:
+    """
+    Run one full recomputation (blocking — called off the event loop).
+
+    Returns:
+        (villages, weather, allocations), each keyed by village_id.
+    """
+    table, weather_readings = fetch_status_inputs()
+    status = compute_villages_status(table, weather_readings)
+    plan = build_allocation_plan(
+        villages=table, tankers=fleet_state.available_tankers(), travel=road_network.matrix(table)
+    )
+
+    villages = {
+        v["id"]: {
+            "id": v["id"],
+            "wsi": v["wsi"],
+            "priority_score": v["priority_score"],
+            "status": wsi_status_label(v["wsi"]),
+        }
+        for v in status
+    }
+    weather = {v["id"]: v["live_weather"] for v in status}
+    allocations = {
+        a["village_id"]: {
+            "village_id": a["village_id"],
+            "tanker_id": a["tanker_id"],
+            "allocated_liters": a["allocated_liters"],
+        }
+        for a in plan["allocations"]
+    }
+    return villages, weather, allocations
+
+
+def _diff(previous: dict, current: dict) -> tuple[list, list]:
+    """Return (changed-or-added values, removed keys) between two keyed snapshots."""
+    changed = [value for key, value in current.items() if previous.get(key) != value]
+    removed = [key for key in previous if key not in current]
+    return changed, removed
+
+
+class LiveUpdateHub:
+    """
+    Fan-out hub for live dashboard updates.
+
+    Each subscriber owns a bounded queue of pre-encoded SSE frames. Events
+    are encoded once and the same string is enqueued for every client; a
+    client that falls too far behind is disconnected (it reconnects and
+    receives a fresh snapshot) rather than slowing everyone else down.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float = LIVE_REFRESH_INTERVAL_SECONDS,
+        queue_size: int = LIVE_SUBSCRIBER_QUEUE_SIZE,
+    ):
+        self.refresh_interval = refresh_interval
+        self.queue_size = queue_size
+
+        self._subscribers: set[asyncio.Queue] = set()
+        self._villages: dict = {}
+        self._weather: dict = {}
+        self._allocations: dict = {}
+        self._has_state = False
+        self._snapshot_frame: str | None = None
+        self._seq = 0
+
+        self._task: asyncio.Task | None = None
+        self._wake: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    # -----------------------------------------------------------------------
+    # Lifecycle
+    # -----------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Start the background refresh loop."""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            logger.info("Live update hub started (refresh every %ss)", self.refresh_interval)
+
+    async def stop(self) -> None:
+        """Stop the refresh loop and disconnect all subscribers."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for queue in list(self._subscribers):
+            self._close(queue)
+        logger.info("Live update hub stopped")
+
+    # -----------------------------------------------------------------------
+    # Subscriptions
+    # -----------------------------------------------------------------------
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Register a new client and return its event queue.
+
+        The queue is primed with the current snapshot when one exists;
+        otherwise the refresh loop is woken to build it. A None item
+        signals that the stream should end.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+
+        if self._has_state:
+            queue.put_nowait(self._snapshot())
+        elif self._wake is not None:
+            self._wake.set()
+
+        logger.info("Live subscriber connected (%d total)", len(self._subscribers))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Remove a client from the fan-out set."""
+        if queue in self._subscribers:
+            self._subscribers.discard(queue)
+            logger.info("Live subscriber disconnected (%d total)", len(self._subscribers))
+
+    def broadcast(self, event_type: str, payload: dict) -> None:
+        """Push a one-off event to every connected client (event loop only)."""
+        if self._subscribers:
+            self._publish(event_type, payload)
+
+    # -----------------------------------------------------------------------
+    # Refresh
+    # -----------------------------------------------------------------------
+
+    def request_refresh(self) -> None:
+        """
+        Ask the loop to refresh now instead of waiting for the interval.
+
+        Safe to call from any thread (e.g. an ingestion worker).
+        """
+        if self._loop is not None and self._wake is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def refresh(self) -> None:
+        """Recompute live state once and publish deltas to all subscribers."""
+        villages, weather, allocations = await asyncio.to_thread(_compute_live_state)
+
+        if not self._has_state:
+            self._set_state(villages, weather, allocations)
+            frame = self._snapshot()
+            for queue in list(self._subscribers):
+                self._offer(queue, frame)
+            return
+
+        changed_villages, removed_villages = _diff(self._villages, villages)
+        changed_weather = [
+            {"id": vid, "live_weather": reading}
+            for vid, reading in weather.items()
+            if self._weather.get(vid) != reading
+        ]
+        added_allocations, withdrawn_allocations = _diff(self._allocations, allocations)
+
+        self._set_state(villages, weather, allocations)
+
+        if changed_villages or removed_villages:
+            self._publish("villages", {"changed": changed_villages, "removed": removed_villages})
+        if changed_weather:
+            self._publish("weather", {"changed": changed_weather})
+        if added_allocations or withdrawn_allocations:
+            self._publish("allocations", {
+                "added": added_allocations,
+                "withdrawn": withdrawn_allocations,
+            })
+
+    async def _run(self) -> None:
+        """Background loop: refresh while anyone is listening, otherwise idle."""
+        while True:
+            if self._subscribers:
+                try:
+                    await self.refresh()
+                except Exception as exc:
+                    logger.error("Live update refresh failed: %s", exc)
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    # -----------------------------------------------------------------------
+    # Internal Helpers
+    # -----------------------------------------------------------------------
+
+    def _set_state(self, villages: dict, weather: dict, allocations: dict) -> None:
+        self._villages = villages
+        self._weather = weather
+        self._allocations = allocations
+        self._has_state = True
+        self._snapshot_frame = None
+
+    def _snapshot(self) -> str:
+        """Return the encoded snapshot frame, re-encoding only after a change."""
+        if self._snapshot_frame is None:
+            self._seq += 1
+            self._snapshot_frame = _format_sse(self._seq, "snapshot", {
+                "villages": list(self._villages.values()),
+                "weather": [{"id": vid, "live_weather": w} for vid, w in self._weather.items()],
+                "allocations": list(self._allocations.values()),
+            })
+        return self._snapshot_frame
+
+    def _publish(self, event_type: str, payload: dict) -> None:
+        self._seq += 1
+        frame = _format_sse(self._seq, event_type, payload)
+        for queue in list(self._subscribers):
+            self._offer(queue, frame)
+
+    def _offer(self, queue: asyncio.Queue, frame: str) -> None:
+        try:
+            queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            logger.warning("Dropping slow live subscriber (queue full)")
+            self._close(queue)
+
+    def _close(self, queue: asyncio.Queue) -> None:
+        """Detach a subscriber and tell its stream to end."""
+        self._subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+
+# Process-wide hub, started and stopped by the FastAPI lifespan
+live_hub = LiveUpdateHub()
+
+# Data writes (ingestion, sync) push fresh deltas immediately
+on_village_data_changed(lambda _village_ids: live_hub.request_refresh())
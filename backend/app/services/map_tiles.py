@@ -0,0 +1,232 @@
+"""
+Map Tiles — clustered GeoJSON village markers per z/x/y tile.
+
+CRITICAL: This module contains ONLY deterministic calculations.
+No AI/LLM calls are permitted here.
+
+Instead of the map plotting every village from /api/villages/status, it
+requests the standard slippy-map tiles in view. Each tile is a GeoJSON
+FeatureCollection:
+
+- below TILE_CLUSTER_MAX_ZOOM + 1, villages are clustered on a
+  TILE_CLUSTER_GRID × TILE_CLUSTER_GRID grid per tile; a cluster carries
+  its village count, population, population-weighted and maximum WSI and
+  villages per stress band (a cell holding one village stays a marker);
+- from there on, every village is its own marker.
+
+Spatial index: villages are projected to Web Mercator and sorted by the
+Morton (Z-order) key of their tile at TILE_INDEX_ZOOM. All villages of any
+tile at any lower zoom then form one contiguous run of the sorted keys,
+found with two binary searches, and cluster cells are simply longer key
+prefixes inside that run.
+
+The index is rebuilt lazily when a new WSI column arrives (via
+on_status_computed) that differs from the indexed one; encoded tiles are
+cached per (data version, z, x, y) in an LRU. A tile request recomputes
+the status columns when the village repository's data version moved past
+the indexed one. Worker processes that are not the shared status producer
+take the WSI column from each new shared snapshot generation instead.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from app.core.constants import TILE_CACHE_SIZE, TILE_CLUSTER_GRID, TILE_CLUSTER_MAX_ZOOM, TILE_INDEX_ZOOM
+from app.database.repository import VillageTable, village_repository
+from app.services.alert_engine import BAND_LABELS, band_of
+from app.services.shared_snapshot import shared_status
+from app.services.village_status import compute_status_columns, fetch_status_inputs, on_status_computed
+from app.utils.geo import lnglat_to_mercator, morton_encode
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# log2(TILE_CLUSTER_GRID): extra zoom levels a cluster cell is below its tile
+_CLUSTER_BITS = int(TILE_CLUSTER_GRID).bit_length() - 1
+
+
+class TileIndexUnavailableError(RuntimeError):
+    """No tile index could be built (the status computation failed)."""
+
+
+class TileIndex:
+    """Immutable Morton-sorted village columns for one data version."""
+
+    def __init__(self, table: VillageTable, wsi: np.ndarray, version: str):
+        self.version = version
+        located = np.flatnonzero(~np.isnan(table.lat) & ~np.isnan(table.lng))
+        mx, my = lnglat_to_mercator(table.lng[located], table.lat[located])
+        scale = float(1 << TILE_INDEX_ZOOM)
+        keys = morton_encode((mx * scale).astype(np.uint64), (my * scale).astype(np.uint64))
+
+        order = np.argsort(keys, kind="stable")
+        rows = located[order]
+        self.keys = keys[order]
+        self.rows = rows
+        self.lng = table.lng[rows]
+        self.lat = table.lat[rows]
+        self.wsi = np.asarray(wsi, dtype=np.float64)[rows]
+        self.population = table.population[rows].astype(np.float64)
+        self.band = band_of(self.wsi)
+        self.ids = table.ids
+        self.names = table.names
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def tile_slice(self, z: int, x: int, y: int) -> slice:
+        """Positions (in sorted order) of the villages inside tile z/x/y."""
+        shift = np.uint64(2 * (TILE_INDEX_ZOOM - z))
+        prefix = morton_encode(np.array([x]), np.array([y]))[0]
+        lo = np.searchsorted(self.keys, prefix << shift, side="left")
+        hi = np.searchsorted(self.keys, (prefix + np.uint64(1)) << shift, side="left")
+        return slice(int(lo), int(hi))
+
+    def features(self, z: int, x: int, y: int) -> list[dict]:
+        """GeoJSON features for one tile (clusters or markers depending on zoom)."""
+        span = self.tile_slice(z, x, y)
+        if span.start == span.stop:
+            return []
+        positions = np.arange(span.start, span.stop)
+        if z > TILE_CLUSTER_MAX_ZOOM:
+            return [self._marker(p) for p in positions]
+
+        cell_shift = np.uint64(2 * max(TILE_INDEX_ZOOM - z - _CLUSTER_BITS, 0))
+        _cells, first, member, counts = np.unique(
+            self.keys[span] >> cell_shift, return_index=True, return_inverse=True, return_counts=True
+        )
+        n_cells = len(counts)
+        population = np.bincount(member, weights=self.population[span], minlength=n_cells)
+        weighted = np.bincount(member, weights=self.population[span] * self.wsi[span], minlength=n_cells)
+        lng = np.bincount(member, weights=self.lng[span], minlength=n_cells) / counts
+        lat = np.bincount(member, weights=self.lat[span], minlength=n_cells) / counts
+        max_wsi = np.full(n_cells, -np.inf)
+        np.maximum.at(max_wsi, member, self.wsi[span])
+        bands = np.zeros((n_cells, len(BAND_LABELS)), dtype=np.int64)
+        np.add.at(bands, (member, self.band[span]), 1)
+
+        features = []
+        for c in range(n_cells):
+            if counts[c] == 1:
+                features.append(self._marker(span.start + int(first[c])))
+                continue
+            features.append(_feature(lng[c], lat[c], {
+                "cluster": True,
+                "point_count": int(counts[c]),
+                "population": int(population[c]),
+                "wsi": round(float(weighted[c] / population[c]), 2) if population[c] > 0 else 0.0,
+                "max_wsi": round(float(max_wsi[c]), 2),
+                "bands": {label: int(bands[c, b]) for b, label in enumerate(BAND_LABELS)},
+            }))
+        return features
+
+    def _marker(self, p: int) -> dict:
+        row = int(self.rows[p])
+        return _feature(self.lng[p], self.lat[p], {
+            "cluster": False,
+            "id": self.ids[row],
+            "name": self.names[row],
+            "population": int(self.population[p]),
+            "wsi": round(float(self.wsi[p]), 2),
+            "status": BAND_LABELS[self.band[p]],
+        })
+
+
+class TileService:
+    """Keeps the tile index current and caches encoded tiles (thread-safe)."""
+
+    def __init__(self, cache_size: int = TILE_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._pending: tuple[VillageTable, np.ndarray, str] | None = None
+        self._index: TileIndex | None = None
+        self._data_version: str | None = None   # village data version last seen by update()
+        self._generation: int | None = None     # shared snapshot generation last folded
+        self._cache: OrderedDict[tuple, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, table: VillageTable, wsi: np.ndarray) -> None:
+        """Status listener: note new data; the index is rebuilt on the next tile request."""
+        wsi = np.asarray(wsi, dtype=np.float64)
+        version = _data_version(table, wsi)
+        with self._lock:
+            self._data_version = table.version
+            if self._index is not None and self._index.version == version:
+                self._pending = None
+                return
+            self._pending = (table, wsi.copy(), version)
+
+    def tile(self, z: int, x: int, y: int) -> tuple[str, bytes]:
+        """
+        Return (data version, encoded GeoJSON) for tile z/x/y (blocking on
+        the first call, which computes the status columns).
+
+        Raises:
+            TileIndexUnavailableError: The status columns could not be computed.
+        """
+        index = self._current_index()
+        key = (index.version, z, x, y)
+        with self._lock:
+            body = self._cache.get(key)
+            if body is not None:
+                self._cache.move_to_end(key)
+                return index.version, body
+
+        body = json.dumps(
+            {"type": "FeatureCollection", "features": index.features(z, x, y)},
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+        with self._lock:
+            self._cache[key] = body
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return index.version, body
+
+    def _current_index(self) -> TileIndex:
+        table = village_repository.snapshot()
+        view = shared_status.read() if shared_status.enabled and not shared_status.is_producer else None
+        if view is not None:
+            if view.generation != self._generation or self._data_version != table.version:
+                self.update(table, view.column_for(table, "wsi"))
+                self._generation = view.generation
+        elif self._data_version != table.version or (self._index is None and self._pending is None):
+            try:
+                table, weather = fetch_status_inputs()
+                compute_status_columns(table, weather)  # feeds update()
+            except Exception as exc:
+                logger.error("Tile index refresh failed: %s", exc)
+
+        with self._lock:
+            if self._pending is not None:
+                table, wsi, version = self._pending
+                self._index = TileIndex(table, wsi, version)
+                self._pending = None
+                # Entries of older versions can never be hit again
+                self._cache = OrderedDict((k, v) for k, v in self._cache.items() if k[0] == version)
+                logger.info("Tile index rebuilt: %d located villages", len(self._index))
+            if self._index is None:
+                raise TileIndexUnavailableError("Village status is not available yet")
+            return self._index
+
+
+def _feature(lng: float, lat: float, properties: dict) -> dict:
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [round(float(lng), 5), round(float(lat), 5)]},
+        "properties": properties,
+    }
+
+
+def _data_version(table: VillageTable, wsi: np.ndarray) -> str:
+    digest = hashlib.blake2b(table.version.encode("ascii"), digest_size=16)
+    digest.update(wsi.tobytes())
+    return digest.hexdigest()
+
+
+# Process-wide service, fed by every status computation
+tile_service = TileService()
+on_status_computed(tile_service.update)
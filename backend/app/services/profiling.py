@@ -0,0 +1,78 @@
+"""
+Live Profiling Service.
+
+Owns the process-wide profiling state behind the admin profiling routes:
+
+- on-demand sessions: sample every thread's stack for N seconds (one
+  session at a time per worker);
+- the slow-request monitor: requests slower than
+  settings.SLOW_REQUEST_THRESHOLD_MS get a stack profile captured
+  automatically (see utils.profiler.SlowRequestMonitor).
+
+Both sample from a background thread without instrumenting the profiled
+code; when no session runs and no request is slow, the only cost is the
+monitor's start-time bookkeeping and a watchdog wake-up every
+SLOW_REQUEST_CHECK_SECONDS.
+"""
+
+import asyncio
+
+from app.config import settings
+from app.core.constants import PROFILE_INTERVAL_MS
+from app.utils.logger import get_logger
+from app.utils.profiler import Profile, SlowRequestMonitor, StackSampler
+
+logger = get_logger(__name__)
+
+
+class ProfilerBusyError(RuntimeError):
+    """An on-demand profiling session is already running."""
+
+
+class ProfilingService:
+    """On-demand sampling sessions plus slow-request capture."""
+
+    def __init__(self, slow_threshold_ms: float = settings.SLOW_REQUEST_THRESHOLD_MS):
+        self.slow_requests = SlowRequestMonitor(slow_threshold_ms, PROFILE_INTERVAL_MS / 1000.0)
+        self.session_running = False
+
+    async def start(self) -> None:
+        """Start the slow-request watchdog (no-op when the threshold is 0)."""
+        self.slow_requests.start()
+        if self.slow_requests.enabled:
+            logger.info("Slow-request capture enabled (> %.0f ms)", self.slow_requests.threshold * 1000)
+
+    async def stop(self) -> None:
+        await asyncio.to_thread(self.slow_requests.stop)
+
+    async def profile(self, seconds: float, interval_ms: float = PROFILE_INTERVAL_MS, idle: bool = False) -> Profile:
+        """
+        Sample all threads for `seconds` and return the profile.
+
+        idle=True keeps samples of threads waiting for work.
+
+        Raises:
+            ProfilerBusyError: If another session is running.
+        """
+        if self.session_running:
+            raise ProfilerBusyError("A profiling session is already running")
+        self.session_running = True
+        sampler = StackSampler(interval_ms / 1000.0, idle).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profile = await asyncio.to_thread(sampler.stop)
+            self.session_running = False
+        logger.info("Profiling session finished: %d samples in %.1fs", profile.samples, profile.duration)
+        return profile
+
+    def status(self) -> dict:
+        return {
+            "session_running": self.session_running,
+            "slow_request_threshold_ms": self.slow_requests.threshold * 1000,
+            "slow_requests_captured": len(self.slow_requests.captured),
+        }
+
+
+# Process-wide instance (started/stopped by the application lifespan)
+profiling = ProfilingService()
@@ -0,0 +1,403 @@
+"""
+Rainfall Grid Store — gridded rainfall rasters, memory-mapped.
+
+CRITICAL: This module contains ONLY deterministic calculations.
+No AI/LLM calls are permitted here.
+
+Gridded products such as IMD's daily 0.25° rainfall are ingested once
+into a flat on-disk layout and then sampled per village without ever
+loading a whole raster into RAM:
+
+    <RAINFALL_GRID_DIR>/<name>.f32    float32 layers (days, ny, nx), C order
+    <RAINFALL_GRID_DIR>/<name>.json   grid metadata (see RainfallGrid)
+
+Rows run south → north and columns west → east; values are cell-centred
+(row i is latitude lat0 + i × dlat) in mm/day, NaN where there is no data.
+A dataset is either "daily" (layer t = start_date + t days) or "normal"
+(a climatology with one layer per day of year: 366 layers with Feb 29 as
+layer 59, or 365 non-leap layers, in which case Feb 29 reuses Feb 28).
+Any other layer count is rejected at ingest.
+
+Supported inputs (optional libraries are imported only when used):
+    raw      — headerless float32 little-endian layers, e.g. IMD .grd
+               files (preset="imd_rain_025" fills in the IMD grid)
+    netcdf   — needs xarray (+ netCDF4); a (time, lat, lon) variable
+    geotiff  — needs rasterio; one band per day
+
+Each village's grid cell is precomputed once per village snapshot, so
+sampling a season is a single (days × villages) fancy-index read of the
+memory map — only the pages holding village cells are touched — and a
+vectorized sum.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.config import settings
+from app.core.constants import RAINFALL_SEASON_START_DAY, RAINFALL_SEASON_START_MONTH
+from app.database.repository import VillageTable
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SUPPORTED_GRID_FORMATS = ("raw", "netcdf", "geotiff")
+GRID_KINDS = ("daily", "normal")
+NORMAL_LAYER_COUNTS = (365, 366)   # Non-leap or leap day-of-year climatology
+
+# Known raw-binary grids: IMD 0.25° daily gridded rainfall (Pai et al. 2014)
+RAW_PRESETS = {
+    "imd_rain_025": {"ny": 129, "nx": 135, "lat0": 6.5, "lon0": 66.5, "dlat": 0.25, "dlon": 0.25, "nodata": -999.0},
+}
+
+
+class GridFormatError(ValueError):
+    """The input file does not match the declared format or grid."""
+
+
+class RainfallGrid:
+    """One ingested dataset: metadata plus a read-only memory map of its layers."""
+
+    def __init__(self, directory: str, name: str):
+        with open(os.path.join(directory, f"{name}.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.name = name
+        self.meta = meta
+        self.kind = meta["kind"]
+        self.ny, self.nx = meta["ny"], meta["nx"]
+        self.lat0, self.lon0 = meta["lat0"], meta["lon0"]
+        self.dlat, self.dlon = meta["dlat"], meta["dlon"]
+        self.start_date = date.fromisoformat(meta["start_date"]) if meta.get("start_date") else None
+        self.days = meta["days"]
+        self.data = np.memmap(
+            os.path.join(directory, f"{name}.f32"), dtype="<f4", mode="r", shape=(self.days, self.ny, self.nx)
+        )
+
+    @property
+    def end_date(self) -> date | None:
+        return self.start_date + timedelta(days=self.days - 1) if self.start_date else None
+
+    def cells(self, lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        """Flat cell index (row × nx + col) per point, -1 outside the grid or unknown."""
+        rows = np.floor((np.asarray(lat) - self.lat0) / self.dlat + 0.5)
+        cols = np.floor((np.asarray(lng) - self.lon0) / self.dlon + 0.5)
+        inside = (rows >= 0) & (rows < self.ny) & (cols >= 0) & (cols < self.nx)
+        return np.where(inside, np.nan_to_num(rows) * self.nx + np.nan_to_num(cols), -1).astype(np.int64)
+
+    def total(self, layers: np.ndarray, cells: np.ndarray) -> np.ndarray:
+        """Sum of the given layers at each cell (NaN for -1 cells or any missing day)."""
+        flat = self.data.reshape(self.days, self.ny * self.nx)
+        valid = cells >= 0
+        totals = np.full(len(cells), np.nan)
+        if len(layers) and valid.any():
+            picked = flat[np.ix_(np.asarray(layers), cells[valid])]
+            totals[valid] = picked.sum(axis=0, dtype=np.float64)
+        return totals
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, **self.meta, "end_date": self.end_date.isoformat() if self.end_date else None}
+
+
+class RainfallGridStore:
+    """Directory of ingested grids, reopened when their files change (thread-safe)."""
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory or settings.RAINFALL_GRID_DIR
+        self._grids: dict[str, tuple[float, RainfallGrid]] = {}
+        self._cells: dict[tuple, np.ndarray] = {}
+        self._deviation: tuple | None = None
+        self._lock = threading.Lock()
+
+    def names(self) -> list[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(f[:-5] for f in os.listdir(self.directory) if f.endswith(".json"))
+
+    def get(self, name: str) -> RainfallGrid | None:
+        meta_path = os.path.join(self.directory, f"{name}.json")
+        try:
+            mtime = os.stat(meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            cached = self._grids.get(name)
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, RainfallGrid(self.directory, name))
+                self._grids[name] = cached
+            return cached[1]
+
+    def version(self) -> str:
+        """
+        Fingerprint of the configured datasets and the current day (the
+        season window grows daily); part of the status ETag. Empty when
+        rasters are not configured.
+        """
+        parts = []
+        for name in (settings.RAINFALL_GRID_DATASET, settings.RAINFALL_NORMAL_DATASET):
+            if not name:
+                return ""
+            try:
+                parts.append(f"{name}:{os.stat(os.path.join(self.directory, f'{name}.json')).st_mtime_ns}")
+            except FileNotFoundError:
+                return ""
+        return ";".join(parts + [date.today().isoformat()])
+
+    def village_cells(self, grid: RainfallGrid, table: VillageTable) -> np.ndarray:
+        """Grid cell per village row (cached per grid geometry and snapshot)."""
+        key = (grid.lat0, grid.lon0, grid.dlat, grid.dlon, grid.ny, grid.nx, table.version)
+        with self._lock:
+            cells = self._cells.get(key)
+        if cells is None:
+            cells = grid.cells(table.lat, table.lng)
+            with self._lock:
+                self._cells = {key: cells}  # one snapshot / geometry at a time
+        return cells
+
+    def seasonal_deviation(self, table: VillageTable, as_of: date | None = None) -> np.ndarray | None:
+        """
+        Rainfall deviation (%) since the season start, per village row.
+
+        Uses settings.RAINFALL_GRID_DATASET (daily) against
+        settings.RAINFALL_NORMAL_DATASET (climatology). Villages outside
+        the grid, or with missing days, get NaN.
+
+        Returns:
+            None when the datasets are not configured or do not cover the
+            season so far.
+        """
+        daily = self.get(settings.RAINFALL_GRID_DATASET) if settings.RAINFALL_GRID_DATASET else None
+        normal = self.get(settings.RAINFALL_NORMAL_DATASET) if settings.RAINFALL_NORMAL_DATASET else None
+        if daily is None or normal is None or daily.start_date is None or normal.days not in NORMAL_LAYER_COUNTS:
+            return None
+
+        as_of = min(as_of or date.today(), daily.end_date)
+        season_start = date(as_of.year, RAINFALL_SEASON_START_MONTH, RAINFALL_SEASON_START_DAY)
+        if season_start > as_of:
+            season_start = date(as_of.year - 1, RAINFALL_SEASON_START_MONTH, RAINFALL_SEASON_START_DAY)
+        if season_start < daily.start_date:
+            return None
+
+        key = (table.version, daily.meta, normal.meta, as_of)
+        cached = self._deviation
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        days = [season_start + timedelta(days=n) for n in range((as_of - season_start).days + 1)]
+        daily_layers = np.array([(d - daily.start_date).days for d in days])
+        normal_layers = np.array([_normal_layer(d, normal.days) for d in days])
+
+        actual = daily.total(daily_layers, self.village_cells(daily, table))
+        expected = normal.total(normal_layers, self.village_cells(normal, table))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            deviation = np.where(expected > 0, (actual - expected) / expected * 100.0, np.nan)
+        deviation = np.clip(deviation, -100.0, 100.0)
+
+        self._deviation = (key, deviation)
+        return deviation
+
+
+def _normal_layer(d: date, layer_count: int) -> int:
+    """Layer of a normal holding day d: leap calendar (2000) for 366 layers, non-leap (2001) for 365."""
+    if layer_count == 366:
+        return date(2000, d.month, d.day).timetuple().tm_yday - 1
+    return date(2001, d.month, 28 if (d.month, d.day) == (2, 29) else d.day).timetuple().tm_yday - 1
+
+
+# ---------------------------------------------------------------------------
+# Ingestion
+# ---------------------------------------------------------------------------
+
+def ingest_rainfall_grid(
+    path: str,
+    fmt: str,
+    name: str,
+    kind: str = "daily",
+    start_date: str | None = None,
+    directory: str | None = None,
+    variable: str | None = None,
+    preset: str | None = None,
+    **raw_grid,
+) -> dict:
+    """
+    Convert a rainfall raster file into the memory-mapped store (blocking).
+
+    Layers are converted one at a time and appended to a uniquely named
+    temporary file that replaces the dataset only when complete, so readers
+    never see a partial dataset, concurrent uploads never share a file and
+    the input is never loaded whole.
+
+    Args:
+        path: Input file.
+        fmt: "raw", "netcdf" or "geotiff".
+        name: Dataset name (letters, digits, "_" and "-").
+        kind: "daily" or "normal" (day-of-year climatology, 365 or 366 layers).
+        start_date: ISO date of the first layer (daily; netcdf reads it
+            from the time axis when omitted).
+        variable: NetCDF variable (default: the first 3-D variable).
+        preset / raw_grid: Raw grid geometry — ny, nx, lat0, lon0, dlat,
+            dlon, nodata — or a RAW_PRESETS name.
+
+    Returns:
+        The dataset metadata.
+
+    Raises:
+        GridFormatError: On a malformed input or invalid arguments.
+        ImportError: When fmt needs an optional library that is missing.
+    """
+    if fmt not in SUPPORTED_GRID_FORMATS:
+        raise GridFormatError(f"Unsupported format '{fmt}'")
+    if kind not in GRID_KINDS:
+        raise GridFormatError(f"Unknown kind '{kind}'. Use one of: {', '.join(GRID_KINDS)}")
+    if not name or not all(c.isalnum() or c in "_-" for c in name):
+        raise GridFormatError("Dataset name may only contain letters, digits, '_' and '-'")
+
+    directory = directory or settings.RAINFALL_GRID_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    if fmt == "raw":
+        geometry = {**RAW_PRESETS.get(preset, {}), **{k: v for k, v in raw_grid.items() if v is not None}}
+        reader = _read_raw(path, geometry)
+    elif fmt == "netcdf":
+        reader = _read_netcdf(path, variable)
+    else:
+        reader = _read_geotiff(path)
+
+    data_fd, data_tmp = tempfile.mkstemp(prefix=f"{name}.", suffix=".f32.tmp", dir=directory)
+    days = 0
+    try:
+        with os.fdopen(data_fd, "wb") as out, reader as (geometry, layers):
+            start = start_date or geometry.pop("start_date", None)
+            geometry.pop("start_date", None)
+            if kind == "daily":
+                if not start:
+                    raise GridFormatError("start_date is required for daily grids")
+                try:
+                    start = date.fromisoformat(str(start)[:10]).isoformat()
+                except ValueError:
+                    raise GridFormatError(f"Invalid start_date '{start}' (expected YYYY-MM-DD)")
+
+            for layer in layers:
+                out.write(np.ascontiguousarray(layer, dtype="<f4").tobytes())
+                days += 1
+        if days == 0:
+            raise GridFormatError("Input contains no layers")
+        if kind == "normal" and days not in NORMAL_LAYER_COUNTS:
+            raise GridFormatError(f"A normal needs 366 (leap) or 365 (non-leap) day-of-year layers, got {days}")
+    except BaseException:
+        os.remove(data_tmp)
+        raise
+
+    meta = {
+        "kind": kind,
+        "ny": int(geometry["ny"]),
+        "nx": int(geometry["nx"]),
+        "lat0": float(geometry["lat0"]),
+        "lon0": float(geometry["lon0"]),
+        "dlat": float(geometry["dlat"]),
+        "dlon": float(geometry["dlon"]),
+        "start_date": start if kind == "daily" else None,
+        "days": days,
+        "source_format": fmt,
+    }
+    meta_fd, meta_tmp = tempfile.mkstemp(prefix=f"{name}.", suffix=".json.tmp", dir=directory)
+    with os.fdopen(meta_fd, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    # Data first: readers key on the metadata file
+    os.replace(data_tmp, os.path.join(directory, f"{name}.f32"))
+    os.replace(meta_tmp, os.path.join(directory, f"{name}.json"))
+
+    logger.info("Rainfall grid '%s' ingested: %d layers of %dx%d (%s)", name, days, meta["ny"], meta["nx"], fmt)
+    return {"name": name, **meta}
+
+
+def _clean(layer: np.ndarray, nodata: float | None) -> np.ndarray:
+    layer = np.asarray(layer, dtype=np.float32)
+    if nodata is not None:
+        layer = np.where(layer == nodata, np.nan, layer).astype(np.float32)
+    return np.where(layer < 0, np.nan, layer).astype(np.float32)
+
+
+@contextmanager
+def _read_raw(path: str, geometry: dict):
+    missing = [k for k in ("ny", "nx", "lat0", "lon0", "dlat", "dlon") if geometry.get(k) is None]
+    if missing:
+        raise GridFormatError(f"Raw grids need {', '.join(missing)} (or a preset)")
+    ny, nx = int(geometry["ny"]), int(geometry["nx"])
+    layer_bytes = ny * nx * 4
+    size = os.path.getsize(path)
+    if size == 0 or size % layer_bytes:
+        raise GridFormatError(f"File size {size} is not a multiple of one {ny}x{nx} float32 layer")
+
+    source = np.memmap(path, dtype="<f4", mode="r", shape=(size // layer_bytes, ny, nx))
+    nodata = geometry.get("nodata")
+    yield dict(geometry), (_clean(source[t], nodata) for t in range(source.shape[0]))
+
+
+@contextmanager
+def _read_netcdf(path: str, variable: str | None):
+    try:
+        import xarray as xr
+    except ImportError as exc:
+        raise ImportError("NetCDF ingestion needs the optional 'xarray' and 'netCDF4' packages") from exc
+
+    with xr.open_dataset(path) as ds:
+        name = variable or next((v for v in ds.data_vars if ds[v].ndim == 3), None)
+        if name is None or name not in ds:
+            raise GridFormatError("No (time, lat, lon) variable found")
+        da = ds[name]
+        lat_dim = next((d for d in da.dims if d.lower() in ("lat", "latitude")), None)
+        lon_dim = next((d for d in da.dims if d.lower() in ("lon", "longitude")), None)
+        time_dim = next((d for d in da.dims if d not in (lat_dim, lon_dim)), None)
+        if lat_dim is None or lon_dim is None or time_dim is None:
+            raise GridFormatError(f"Variable '{name}' is not (time, lat, lon): {da.dims}")
+        da = da.transpose(time_dim, lat_dim, lon_dim).sortby(lat_dim).sortby(lon_dim)
+
+        lat, lon = da[lat_dim].values, da[lon_dim].values
+        geometry = {
+            "ny": len(lat), "nx": len(lon),
+            "lat0": float(lat[0]), "lon0": float(lon[0]),
+            "dlat": _spacing(lat, "latitude"), "dlon": _spacing(lon, "longitude"),
+        }
+        times = da[time_dim].values
+        if np.issubdtype(times.dtype, np.datetime64):
+            geometry["start_date"] = str(np.datetime_as_string(times[0], unit="D"))
+        nodata = da.attrs.get("_FillValue", da.encoding.get("_FillValue"))
+        yield geometry, (_clean(da.isel({time_dim: t}).values, nodata) for t in range(len(times)))
+
+
+@contextmanager
+def _read_geotiff(path: str):
+    try:
+        import rasterio
+    except ImportError as exc:
+        raise ImportError("GeoTIFF ingestion needs the optional 'rasterio' package") from exc
+
+    with rasterio.open(path) as src:
+        transform = src.transform
+        if transform.b != 0 or transform.d != 0:
+            raise GridFormatError("Rotated GeoTIFF grids are not supported")
+        dlon, dlat = transform.a, -transform.e
+        geometry = {
+            "ny": src.height, "nx": src.width,
+            # Corner → centre of the south-west cell (GeoTIFF rows run north → south)
+            "lat0": transform.f - dlat * (src.height - 0.5),
+            "lon0": transform.c + dlon * 0.5,
+            "dlat": dlat, "dlon": dlon,
+        }
+        yield geometry, (_clean(src.read(band)[::-1], src.nodata) for band in range(1, src.count + 1))
+
+
+def _spacing(values: np.ndarray, axis: str) -> float:
+    steps = np.diff(values.astype(np.float64))
+    if not len(steps) or not np.allclose(steps, steps[0], rtol=1e-3):
+        raise GridFormatError(f"Irregular {axis} spacing — only regular grids are supported")
+    return float(steps[0])
+
+
+# Process-wide store
+rainfall_grids = RainfallGridStore()
@@ -0,0 +1,121 @@
+"""
+Monte Carlo Risk Simulator.
+
+CRITICAL: This module contains ONLY deterministic mathematical calculations.
+No AI/LLM calls are permitted here.
+
+compute_wsi yields a point estimate, but groundwater readings come from
+noisy sensors and rainfall deviation from forecasts. This module samples
+both inputs per village (independent normal noise), evaluates WSI and
+deficit with the vectorized batch functions over a (villages × samples)
+matrix, and reports percentiles plus the probability of crossing
+WSI_CRITICAL_THRESHOLD. Villages are processed in chunks so memory stays
+bounded regardless of district size.
+"""
+
+import math
+
+import numpy as np
+
+from app.core.constants import (
+    DEFAULT_TANKER_CAPACITY_LITERS,
+    MC_CHUNK_ELEMENTS,
+    MC_DEFAULT_SAMPLES,
+    MC_GW_SIGMA_M,
+    MC_RAIN_SIGMA_PCT,
+    WSI_CRITICAL_THRESHOLD,
+)
+from app.database.repository import VillageTable
+from app.services.tanker_allocator import calculate_deficit_batch
+from app.services.wsi_calculator import compute_wsi_batch
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PERCENTILES = (10, 50, 90)
+
+
+def simulate_village_risk(
+    villages: VillageTable,
+    samples: int = MC_DEFAULT_SAMPLES,
+    gw_sigma: float = MC_GW_SIGMA_M,
+    rain_sigma: float = MC_RAIN_SIGMA_PCT,
+    threshold: float = WSI_CRITICAL_THRESHOLD,
+    seed: int | None = None,
+) -> list[dict]:
+    """
+    Run a Monte Carlo simulation of WSI and water deficit for every village.
+
+    Args:
+        villages: Columnar village snapshot from the repository.
+        samples: Number of samples drawn per village.
+        gw_sigma: Std-dev of groundwater level noise in meters.
+        rain_sigma: Std-dev of rainfall deviation noise in percentage points.
+        threshold: WSI level whose crossing probability is reported.
+        seed: Optional RNG seed for reproducible results.
+
+    Returns:
+        One dict per village with WSI / deficit percentiles, mean WSI,
+        probability of exceeding the threshold and tankers needed,
+        sorted by probability of crossing (highest first).
+    """
+    if not len(villages):
+        return []
+
+    rng = np.random.default_rng(seed)
+
+    population = villages.population.astype(np.float64)
+    gw_current = villages.gw_current_level
+    gw_min = villages.gw_min_required
+    rain_dev = villages.rainfall_dev_pct
+
+    n = len(villages)
+    rows_per_chunk = max(1, MC_CHUNK_ELEMENTS // samples)
+
+    wsi_pct = np.empty((n, len(PERCENTILES)))
+    deficit_pct = np.empty((n, len(PERCENTILES)))
+    wsi_mean = np.empty(n)
+    prob_critical = np.empty(n)
+
+    for start in range(0, n, rows_per_chunk):
+        stop = min(start + rows_per_chunk, n)
+        rows = slice(start, stop)
+        shape = (stop - start, samples)
+
+        gw_samples = np.maximum(
+            gw_current[rows, None] + rng.normal(0.0, gw_sigma, shape), 0.0
+        )
+        rain_samples = np.maximum(
+            rain_dev[rows, None] + rng.normal(0.0, rain_sigma, shape), -100.0
+        )
+
+        wsi = compute_wsi_batch(gw_samples, gw_min[rows, None], rain_samples)
+        deficit = calculate_deficit_batch(population[rows, None], gw_samples, gw_min[rows, None])
+
+        wsi_pct[rows] = np.percentile(wsi, PERCENTILES, axis=1).T
+        deficit_pct[rows] = np.percentile(deficit, PERCENTILES, axis=1).T
+        wsi_mean[rows] = wsi.mean(axis=1)
+        prob_critical[rows] = (wsi > threshold).mean(axis=1)
+
+    logger.info("Monte Carlo risk simulated for %d villages × %d samples", n, samples)
+
+    results = []
+    for i in range(n):
+        results.append({
+            "id": villages.ids[i],
+            "name": villages.names[i],
+            "population": int(villages.population[i]),
+            "wsi_mean": round(float(wsi_mean[i]), 2),
+            "wsi_p10": round(float(wsi_pct[i, 0]), 2),
+            "wsi_p50": round(float(wsi_pct[i, 1]), 2),
+            "wsi_p90": round(float(wsi_pct[i, 2]), 2),
+            "prob_critical": round(float(prob_critical[i]), 4),
+            "deficit_liters_p10": round(float(deficit_pct[i, 0]), 2),
+            "deficit_liters_p50": round(float(deficit_pct[i, 1]), 2),
+            "deficit_liters_p90": round(float(deficit_pct[i, 2]), 2),
+            "tankers_needed_p50": math.ceil(deficit_pct[i, 1] / DEFAULT_TANKER_CAPACITY_LITERS),
+            "tankers_needed_p90": math.ceil(deficit_pct[i, 2] / DEFAULT_TANKER_CAPACITY_LITERS),
+        })
+
+    results.sort(key=lambda r: (r["prob_critical"], r["wsi_p50"]), reverse=True)
+    return results
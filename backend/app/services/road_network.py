@@ -0,0 +1,633 @@
+"""
+Road Network — depot → village travel times from an OpenStreetMap extract.
+
+Straight-line distance badly underestimates rural trips (river crossings,
+ghats, roads that follow field boundaries). This module turns an OSM
+extract into a depot × village travel-time matrix:
+
+1. Load (offline, once per extract): the drivable ways of the .osm /
+   .osm.gz / .osm.bz2 file are streamed with iterparse into a directed
+   graph in CSR arrays — per edge the travel time at the highway class's
+   speed (or its maxspeed tag) and the length. The compiled graph is saved
+   next to the extract (<extract>.graph.npz) and reloaded on later starts;
+   compile it ahead of a deploy with
+
+       python -m app.services.road_network <extract.osm.bz2>
+
+   PBF extracts can be converted with `osmium cat in.osm.pbf -o out.osm.bz2`.
+
+2. Index: one full Dijkstra tree per depot (travel seconds and road km
+   from the depot to every node), cached in memory and on disk
+   (<extract>.trees/). Depots are few and rarely move, so the trees are
+   effectively built once.
+
+3. Matrix: villages and depots are snapped to their nearest road node
+   (grid index; the off-road stretch is driven at ROAD_ACCESS_SPEED_KMH)
+   and the matrix is a gather from the depot trees. Snaps are cached per
+   village, so a changed village table only snaps the villages that were
+   added or moved — no shortest-path work — and a lookup in the finished
+   matrix is two dict hits and an array index.
+
+Pairs without a road time (no road within ROAD_MAX_SNAP_KM, or no path)
+are NaN; planners fall back to straight-line distance for those.
+
+STRICT RULES:
+- No AI/LLM calls.
+"""
+
+import bz2
+import gzip
+import hashlib
+import heapq
+import os
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+
+from app.config import settings
+from app.core.constants import (
+    FLEET_REFRESH_SECONDS,
+    ROAD_ACCESS_SPEED_KMH,
+    ROAD_MAX_SNAP_KM,
+    ROAD_SNAP_CELL_DEG,
+    ROAD_TREE_CACHE_SIZE,
+)
+from app.database.queries import get_depots
+from app.database.repository import VillageTable
+from app.utils.geo import haversine_km
+from app.utils.logger import LogSampler, get_logger
+
+logger = get_logger(__name__)
+
+# Every allocation asks for the matrix: a missing extract is reported sampled
+_unavailable_log = LogSampler(logger)
+
+# Loaded-tanker speeds per OSM highway class (km/h); other classes are not drivable
+ROAD_SPEEDS_KMH = {
+    "motorway": 70, "motorway_link": 40,
+    "trunk": 55, "trunk_link": 35,
+    "primary": 45, "primary_link": 30,
+    "secondary": 40, "secondary_link": 30,
+    "tertiary": 32, "tertiary_link": 25,
+    "unclassified": 25, "road": 25,
+    "residential": 20, "living_street": 10, "service": 15,
+    "track": 12,
+}
+
+ONEWAY_VALUES = ("yes", "1", "true")
+NO_ACCESS = ("no", "private")
+
+# Bump when the compiled layout or the speed table changes
+GRAPH_FORMAT = 1
+
+
+class RoadGraphError(ValueError):
+    """Raised when an extract cannot be turned into a road graph."""
+
+
+# ---------------------------------------------------------------------------
+# Graph
+# ---------------------------------------------------------------------------
+
+class RoadGraph:
+    """
+    Directed road graph in CSR form.
+
+    Attributes:
+        lat, lng: float64 node coordinates.
+        indptr: int64, edges of node u are indptr[u]:indptr[u + 1].
+        targets: int32 edge heads.
+        seconds, km: float32 edge travel time and length.
+        snappable: bool, nodes of the largest connected component (the
+            only ones villages and depots are snapped to).
+        digest: Content hash (keys the tree cache).
+    """
+
+    def __init__(self, lat, lng, indptr, targets, seconds, km, snappable):
+        self.lat, self.lng = lat, lng
+        self.indptr, self.targets = indptr, targets
+        self.seconds, self.km = seconds, km
+        self.snappable = snappable
+        self.digest = hashlib.blake2b(
+            b"".join(a.tobytes() for a in (indptr, targets, seconds)), digest_size=8
+        ).hexdigest()
+        self._adjacency: tuple[list, list, list, list] | None = None
+        self._build_snap_index()
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @property
+    def edges(self) -> int:
+        return len(self.targets)
+
+    # -- persistence --------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        tmp = path + ".tmp.npz"
+        np.savez(
+            tmp, format=np.array(GRAPH_FORMAT), lat=self.lat, lng=self.lng, indptr=self.indptr,
+            targets=self.targets, seconds=self.seconds, km=self.km, snappable=self.snappable,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RoadGraph | None":
+        """Load a compiled graph (None if it was compiled by another format version)."""
+        with np.load(path) as data:
+            if int(data["format"]) != GRAPH_FORMAT:
+                return None
+            return cls(*(data[k] for k in ("lat", "lng", "indptr", "targets", "seconds", "km", "snappable")))
+
+    # -- nearest node -------------------------------------------------------
+
+    def _build_snap_index(self) -> None:
+        nodes = np.flatnonzero(self.snappable)
+        keys = self._cell_keys(self.lat[nodes], self.lng[nodes])
+        order = np.argsort(keys, kind="stable")
+        self._snap_nodes = nodes[order]
+        unique, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+        self._cells = {int(k): (int(s), int(s + c)) for k, s, c in zip(unique, starts, counts)}
+
+    @staticmethod
+    def _cell_keys(lat, lng) -> np.ndarray:
+        row = np.floor((np.asarray(lat) + 90.0) / ROAD_SNAP_CELL_DEG).astype(np.int64)
+        col = np.floor((np.asarray(lng) + 180.0) / ROAD_SNAP_CELL_DEG).astype(np.int64)
+        return row * 100_000 + col
+
+    def nearest(self, lat: float, lng: float) -> tuple[int, float]:
+        """
+        Nearest snappable node and its distance in km; (-1, inf) if no node
+        is within ROAD_MAX_SNAP_KM.
+
+        Grid rings are searched outwards; once a ring holds a node, the
+        next ring is included too, since a node there can still be closer.
+        """
+        if not (np.isfinite(lat) and np.isfinite(lng)) or not self._cells:
+            return -1, np.inf
+        (key,) = self._cell_keys([lat], [lng])
+        row, col = divmod(int(key), 100_000)
+        max_ring = int(np.ceil(ROAD_MAX_SNAP_KM / (ROAD_SNAP_CELL_DEG * 111.0 * np.cos(np.radians(lat))))) + 1
+        for ring in range(max_ring + 1):
+            if self._block(row, col, ring) is None:
+                continue
+            candidates = self._block(row, col, ring + 1)
+            dist = haversine_km(lat, lng, self.lat[candidates], self.lng[candidates])
+            best = int(np.argmin(dist))
+            if dist[best] > ROAD_MAX_SNAP_KM:
+                break
+            return int(candidates[best]), float(dist[best])
+        return -1, np.inf
+
+    def _block(self, row: int, col: int, ring: int) -> np.ndarray | None:
+        """Snappable nodes in the (2·ring + 1)² cells around (row, col), or None."""
+        spans = [
+            self._cells[k]
+            for r in range(row - ring, row + ring + 1)
+            for c in range(col - ring, col + ring + 1)
+            if (k := r * 100_000 + c) in self._cells
+        ]
+        if not spans:
+            return None
+        return np.concatenate([self._snap_nodes[s:e] for s, e in spans])
+
+    # -- shortest paths -----------------------------------------------------
+
+    def shortest_tree(self, source: int) -> np.ndarray:
+        """
+        Dijkstra from source over travel time.
+
+        Returns:
+            float32 array (2, nodes): travel seconds and road km along the
+            fastest path to every node (inf where unreachable).
+        """
+        if self._adjacency is None:
+            # Python lists index several times faster than numpy scalars here
+            self._adjacency = (
+                self.indptr.tolist(), self.targets.tolist(), self.seconds.tolist(), self.km.tolist()
+            )
+        indptr, targets, seconds, km = self._adjacency
+        inf = float("inf")
+        best = [inf] * len(self)
+        dist_km = [inf] * len(self)
+        best[source] = 0.0
+        dist_km[source] = 0.0
+        heap = [(0.0, source)]
+        pop, push = heapq.heappop, heapq.heappush
+        while heap:
+            d, u = pop(heap)
+            if d > best[u]:
+                continue
+            ku = dist_km[u]
+            for e in range(indptr[u], indptr[u + 1]):
+                v = targets[e]
+                nd = d + seconds[e]
+                if nd < best[v]:
+                    best[v] = nd
+                    dist_km[v] = ku + km[e]
+                    push(heap, (nd, v))
+        return np.array([best, dist_km], dtype=np.float32)
+
+
+def _open_extract(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def _maxspeed(value: str | None) -> float | None:
+    """Numeric maxspeed tag in km/h ("50", "30 mph"); None for anything else."""
+    if not value:
+        return None
+    number, _, unit = value.strip().partition(" ")
+    try:
+        speed = float(number)
+    except ValueError:
+        return None
+    return speed * 1.609344 if unit.strip() == "mph" else speed
+
+
+def compile_road_graph(path: str) -> RoadGraph:
+    """
+    Parse an OSM XML extract into a RoadGraph (blocking; streams the file).
+
+    Raises:
+        RoadGraphError: The file is not OSM XML or has no drivable ways.
+    """
+    started = time.perf_counter()
+    node_ids, node_lat, node_lng = array("q"), array("d"), array("d")
+    edge_from, edge_to, edge_speed = array("q"), array("q"), array("d")
+
+    try:
+        with _open_extract(path) as f:
+            context = ET.iterparse(f, events=("start", "end"))
+            _, root = next(context)
+            for event, elem in context:
+                if event != "end":
+                    continue
+                if elem.tag == "node":
+                    node_ids.append(int(elem.get("id")))
+                    node_lat.append(float(elem.get("lat")))
+                    node_lng.append(float(elem.get("lon")))
+                elif elem.tag == "way":
+                    tags = {t.get("k"): t.get("v") for t in elem.iter("tag")}
+                    highway = tags.get("highway")
+                    if (
+                        highway in ROAD_SPEEDS_KMH
+                        and tags.get("access") not in NO_ACCESS
+                        and tags.get("motor_vehicle") not in NO_ACCESS
+                        and tags.get("area") != "yes"
+                    ):
+                        refs = [int(nd.get("ref")) for nd in elem.iter("nd")]
+                        speed = min(_maxspeed(tags.get("maxspeed")) or np.inf, ROAD_SPEEDS_KMH[highway])
+                        oneway = tags.get("oneway")
+                        forward_only = (
+                            oneway in ONEWAY_VALUES or tags.get("junction") == "roundabout"
+                            or (highway == "motorway" and oneway != "no")
+                        )
+                        a, b = refs[:-1], refs[1:]
+                        if oneway == "-1":
+                            a, b = b, a
+                        pairs = [(a, b)] if forward_only or oneway == "-1" else [(a, b), (b, a)]
+                        for src, dst in pairs:
+                            edge_from.extend(src)
+                            edge_to.extend(dst)
+                            edge_speed.extend([speed] * len(src))
+                else:
+                    continue
+                root.clear()  # drop finished nodes / ways
+    except (ET.ParseError, OSError, TypeError, ValueError) as exc:
+        raise RoadGraphError(f"Not a readable OSM XML extract: {exc}") from exc
+
+    if not edge_from:
+        raise RoadGraphError("No drivable ways found in the extract")
+
+    ids = np.frombuffer(node_ids, dtype=np.int64)
+    order = np.argsort(ids)
+    ids = ids[order]
+    lat = np.frombuffer(node_lat, dtype=np.float64)[order]
+    lng = np.frombuffer(node_lng, dtype=np.float64)[order]
+
+    # Resolve way refs to node rows; edges leaving the extract are dropped
+    src_id = np.frombuffer(edge_from, dtype=np.int64)
+    dst_id = np.frombuffer(edge_to, dtype=np.int64)
+    speed = np.frombuffer(edge_speed, dtype=np.float64)
+    src = np.clip(np.searchsorted(ids, src_id), 0, len(ids) - 1)
+    dst = np.clip(np.searchsorted(ids, dst_id), 0, len(ids) - 1)
+    found = (ids[src] == src_id) & (ids[dst] == dst_id) & (src != dst)
+    src, dst, speed = src[found], dst[found], speed[found]
+
+    # Keep only nodes that are on a road
+    used, inverse = np.unique(np.concatenate([src, dst]), return_inverse=True)
+    src, dst = inverse[: len(src)], inverse[len(src):]
+    lat, lng = lat[used], lng[used]
+
+    km = haversine_km(lat[src], lng[src], lat[dst], lng[dst])
+    order = np.argsort(src, kind="stable")
+    src, dst, km, speed = src[order], dst[order], km[order], speed[order]
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(src, minlength=len(used)))]).astype(np.int64)
+
+    graph = RoadGraph(
+        lat, lng, indptr, dst.astype(np.int32),
+        (km / speed * 3600.0).astype(np.float32), km.astype(np.float32),
+        _largest_component(len(used), src, dst),
+    )
+    logger.info(
+        "Compiled road graph from %s: %d nodes, %d edges (%d snappable nodes) in %.1fs",
+        path, len(graph), graph.edges, int(graph.snappable.sum()), time.perf_counter() - started,
+    )
+    return graph
+
+
+def _largest_component(n: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Mask of the largest weakly connected component (islands are not snapped to)."""
+    both_src = np.concatenate([src, dst])
+    both_dst = np.concatenate([dst, src])
+    order = np.argsort(both_src, kind="stable")
+    neighbours = both_dst[order].tolist()
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(both_src, minlength=n))]).tolist()
+
+    label = [-1] * n
+    sizes = []
+    for start in range(n):
+        if label[start] >= 0:
+            continue
+        component = len(sizes)
+        label[start] = component
+        stack, size = [start], 0
+        while stack:
+            u = stack.pop()
+            size += 1
+            for v in neighbours[indptr[u]:indptr[u + 1]]:
+                if label[v] < 0:
+                    label[v] = component
+                    stack.append(v)
+        sizes.append(size)
+    return np.asarray(label) == int(np.argmax(sizes))
+
+
+# ---------------------------------------------------------------------------
+# Travel-time matrix
+# ---------------------------------------------------------------------------
+
+class TravelTimeMatrix:
+    """
+    Depot × village road travel times (immutable, picklable).
+
+    Attributes:
+        depot_ids, village_ids: Row / column labels.
+        depot_index, village_index: ID → row / column.
+        seconds, km: float32 (depots, villages); NaN where there is no
+            road time.
+        version: Changes whenever any entry may have.
+    """
+
+    __slots__ = ("depot_ids", "village_ids", "depot_index", "village_index", "seconds", "km", "version")
+
+    def __init__(self, depot_ids: list[str], village_ids: list[str], seconds: np.ndarray, km: np.ndarray, version: str):
+        self.depot_ids = depot_ids
+        self.village_ids = village_ids
+        self.depot_index = {d: i for i, d in enumerate(depot_ids)}
+        self.village_index = {v: j for j, v in enumerate(village_ids)}
+        self.seconds = seconds
+        self.km = km
+        self.version = version
+
+    def lookup(self, depot_id: str, village_id: str) -> tuple[float, float] | None:
+        """(seconds, km) for one pair, or None if there is no road time."""
+        i = self.depot_index.get(depot_id)
+        j = self.village_index.get(village_id)
+        if i is None or j is None or np.isnan(self.seconds[i, j]):
+            return None
+        return float(self.seconds[i, j]), float(self.km[i, j])
+
+    def submatrix(self, depot_ids: list, village_ids: list) -> tuple[np.ndarray, np.ndarray]:
+        """(seconds, km) float64 arrays for the given labels; NaN for unknown ones."""
+        rows = np.array([self.depot_index.get(d, -1) for d in depot_ids], dtype=np.int64)
+        cols = np.array([self.village_index.get(v, -1) for v in village_ids], dtype=np.int64)
+        known = (rows[:, None] >= 0) & (cols[None, :] >= 0)
+        seconds = np.where(known, self.seconds[rows[:, None], cols[None, :]], np.nan).astype(np.float64)
+        km = np.where(known, self.km[rows[:, None], cols[None, :]], np.nan).astype(np.float64)
+        return seconds, km
+
+
+class RoadNetwork:
+    """Compiled road graph, cached depot trees and the current travel-time matrix."""
+
+    def __init__(self, path: str = settings.ROAD_GRAPH_PATH):
+        self.path = path
+        self._graph: RoadGraph | None = None
+        self._graph_mtime: float | None = None
+        self._failed_mtime: float | None = None
+        self._trees: OrderedDict[int, np.ndarray] = OrderedDict()
+        self._snaps: dict[str, tuple[float, float, int, float]] = {}   # village_id → (lat, lng, node, access_km)
+        self._depots: list[tuple[str, float, float]] = []
+        self._depots_loaded_at = -np.inf
+        self._matrix: TravelTimeMatrix | None = None
+        self._matrix_key: tuple | None = None
+        self._lock = threading.RLock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    @property
+    def compiled_path(self) -> str:
+        return self.path + ".graph.npz"
+
+    @property
+    def trees_dir(self) -> str:
+        return self.path + ".trees"
+
+    def graph(self) -> RoadGraph | None:
+        """
+        The compiled graph, compiled or reloaded when the extract changes.
+
+        None when disabled or when the extract is missing or unreadable
+        (logged; a broken extract is not re-parsed until it changes).
+        """
+        if not self.enabled:
+            return None
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError as exc:
+            _unavailable_log.warning("Road graph extract unavailable: %s", exc)
+            return None
+        if self._graph is not None and self._graph_mtime == mtime:
+            return self._graph
+        if self._failed_mtime == mtime:
+            return None
+        with self._lock:
+            if self._graph is None or self._graph_mtime != mtime:
+                try:
+                    graph = None
+                    compiled = self.compiled_path
+                    if os.path.exists(compiled) and os.path.getmtime(compiled) >= mtime:
+                        graph = RoadGraph.load(compiled)
+                    if graph is None:
+                        graph = compile_road_graph(self.path)
+                        graph.save(compiled)
+                except (RoadGraphError, OSError) as exc:
+                    self._failed_mtime = mtime
+                    logger.error("Road graph unavailable, using straight-line distances: %s", exc)
+                    return None
+                self._graph, self._graph_mtime = graph, mtime
+                self._trees.clear()
+                self._snaps.clear()
+                self._matrix = None
+        return self._graph
+
+    def _tree(self, graph: RoadGraph, node: int) -> np.ndarray:
+        """
+        Shortest-path tree from a depot node (memory → disk → Dijkstra).
+
+        An unreadable cached tree is rebuilt; a tree that cannot be written
+        to disk is kept in memory only.
+        """
+        tree = self._trees.get(node)
+        if tree is not None:
+            self._trees.move_to_end(node)
+            return tree
+        path = os.path.join(self.trees_dir, f"{graph.digest}-{node}.npy")
+        tree = None
+        if os.path.exists(path):
+            try:
+                tree = np.load(path, mmap_mode="r")
+            except (OSError, ValueError) as exc:
+                _unavailable_log.warning("Cached road tree %s unreadable, rebuilding: %s", path, exc)
+        if tree is None:
+            started = time.perf_counter()
+            tree = graph.shortest_tree(node)
+            logger.info("Built shortest-path tree from road node %d in %.2fs", node, time.perf_counter() - started)
+            try:
+                os.makedirs(self.trees_dir, exist_ok=True)
+                tmp = path + ".tmp.npy"
+                np.save(tmp, tree)
+                os.replace(tmp, path)
+            except OSError as exc:
+                _unavailable_log.warning("Road tree not cached on disk (kept in memory): %s", exc)
+        self._trees[node] = tree
+        while len(self._trees) > ROAD_TREE_CACHE_SIZE:
+            self._trees.popitem(last=False)
+        return tree
+
+    def _depot_locations(self) -> list[tuple[str, float, float]]:
+        if time.monotonic() - self._depots_loaded_at >= FLEET_REFRESH_SECONDS:
+            self._depots = sorted(
+                (d["id"], float(d["lat"]), float(d["lng"]))
+                for d in get_depots()
+                if d.get("lat") is not None and d.get("lng") is not None
+            )
+            self._depots_loaded_at = time.monotonic()
+        return self._depots
+
+    def matrix(self, villages: VillageTable) -> TravelTimeMatrix | None:
+        """
+        Depot × village travel times for a village snapshot (None when no
+        road graph is configured, or the depots cannot be loaded — callers
+        then fall back to straight-line distances).
+
+        Only villages added or moved since the last call are snapped; the
+        depot trees are reused, so this is a gather for an unchanged graph.
+        """
+        graph = self.graph()
+        if graph is None:
+            return None
+        try:
+            depots = self._depot_locations()
+        except Exception as exc:
+            _unavailable_log.warning("Road travel times unavailable (depots not loaded): %s", exc)
+            return None
+        key = (graph.digest, tuple(depots), villages.version)
+        if self._matrix is not None and self._matrix_key == key:
+            return self._matrix
+
+        with self._lock:
+            if self._matrix is not None and self._matrix_key == key:
+                return self._matrix
+            started = time.perf_counter()
+
+            snapped = 0
+            for i, vid in enumerate(villages.ids):
+                lat, lng = float(villages.lat[i]), float(villages.lng[i])
+                cached = self._snaps.get(vid)
+                if cached is None or cached[:2] != (lat, lng):
+                    self._snaps[vid] = (lat, lng, *graph.nearest(lat, lng))
+                    snapped += 1
+            nodes = np.array([self._snaps[vid][2] for vid in villages.ids], dtype=np.int64)
+            access_km = np.array([self._snaps[vid][3] for vid in villages.ids], dtype=np.float64)
+
+            seconds = np.full((len(depots), len(villages)), np.nan, dtype=np.float32)
+            km = np.full((len(depots), len(villages)), np.nan, dtype=np.float32)
+            on_road = nodes >= 0
+            for d, (_, lat, lng) in enumerate(depots):
+                node, depot_access_km = graph.nearest(lat, lng)
+                if node < 0:
+                    continue
+                tree = self._tree(graph, node)
+                off_road_km = depot_access_km + access_km[on_road]
+                seconds[d, on_road] = tree[0, nodes[on_road]] + off_road_km / ROAD_ACCESS_SPEED_KMH * 3600.0
+                km[d, on_road] = tree[1, nodes[on_road]] + off_road_km
+            seconds[~np.isfinite(seconds)] = np.nan
+            km[~np.isfinite(km)] = np.nan
+
+            matrix = TravelTimeMatrix(
+                [d[0] for d in depots], list(villages.ids), seconds, km,
+                version=hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest(),
+            )
+            self._matrix, self._matrix_key = matrix, key
+            logger.info(
+                "Travel matrix: %d depots × %d villages (%d snapped) in %.1f ms",
+                len(depots), len(villages), snapped, (time.perf_counter() - started) * 1000,
+            )
+            return matrix
+
+    def status(self) -> dict:
+        graph = self._graph
+        matrix = self._matrix
+        return {
+            "enabled": self.enabled,
+            "source": self.path or None,
+            "nodes": len(graph) if graph is not None else None,
+            "edges": graph.edges if graph is not None else None,
+            "trees_cached": len(self._trees),
+            "depots": len(matrix.depot_ids) if matrix is not None else None,
+            "villages": len(matrix.village_ids) if matrix is not None else None,
+            "villages_with_road_time": (
+                int((~np.isnan(matrix.seconds)).any(axis=0).sum()) if matrix is not None else None
+            ),
+            "version": matrix.version if matrix is not None else None,
+        }
+
+
+# Process-wide instance
+road_network = RoadNetwork()
+
+
+if __name__ == "__main__":
+    # Offline compile: python -m app.services.road_network <extract.osm[.gz|.bz2]>
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m app.services.road_network <extract.osm[.gz|.bz2]>")
+    network = RoadNetwork(sys.argv[1])
+    compiled = network.graph()
+    if compiled is None:
+        sys.exit(f"Could not compile {sys.argv[1]} (see log)")
+    print(f"{network.compiled_path}: {len(compiled)} nodes, {compiled.edges} edges")
+    # Pre-build the depot trees too when the store is reachable
+    try:
+        depots = network._depot_locations()
+    except Exception as exc:
+        depots = []
+        print(f"Depot trees not built (store unavailable: {exc})")
+    for depot_id, depot_lat, depot_lng in depots:
+        depot_node, _ = compiled.nearest(depot_lat, depot_lng)
+        if depot_node >= 0:
+            network._tree(compiled, depot_node)
+            print(f"Tree cached for depot {depot_id}")
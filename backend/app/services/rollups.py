@@ -0,0 +1,273 @@
+"""
+Administrative Rollups — taluka / district / state aggregates.
+
+CRITICAL: This module contains ONLY deterministic mathematical calculations.
+No AI/LLM calls are permitted here.
+
+State officials need the picture per taluka and district, not 40k village
+rows. The rollup index keeps, for every administrative unit, running sums
+of the village metrics:
+
+    village_count, population, population-weighted WSI,
+    villages per stress band, total daily deficit (liters),
+    tankers assigned (Reserved or Dispatched)
+
+Each village's last contribution is stored in columns aligned with the
+village snapshot. When a new WSI column arrives (via on_status_computed)
+only the villages whose contribution changed are subtracted from and
+re-added to their units' sums, so a refresh costs O(changed villages) and
+reading any rollup is a lookup. The sums are rebuilt from scratch only when
+village membership (ids, talukas, districts) changes.
+
+Reads check the index against the village repository's data version and
+recompute when it moved. Worker processes that are not the shared status
+producer never compute status themselves, so they fold the WSI column of
+each new shared snapshot generation instead. The conditional-GET ETag is
+derived from the village data version, the WSI column and the tanker
+assignments, so every worker serving the same data returns the same ETag.
+
+Taluka names repeat across districts, so talukas are keyed by
+(district, taluka). Villages without a taluka or district are grouped
+under UNASSIGNED. The "state" level is the single unit covering every
+village in the store.
+"""
+
+import hashlib
+import threading
+
+import numpy as np
+
+from app.database.repository import VillageTable, village_repository
+from app.services.alert_engine import BAND_LABELS, band_of
+from app.services.fleet_state import DISPATCHED, RESERVED, fleet_state
+from app.services.shared_snapshot import StatusView, shared_status
+from app.services.tanker_allocator import calculate_deficit_batch
+from app.services.village_status import compute_status_columns, fetch_status_inputs, on_status_computed
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+LEVELS = ("state", "district", "taluka")
+UNASSIGNED = "Unassigned"
+STATE_UNIT = "All"
+
+_ACTIVE_TANKER_STATES = (RESERVED, DISPATCHED)
+
+
+class _Level:
+    """Running sums for every unit of one administrative level."""
+
+    def __init__(self, keys: list[tuple], codes: np.ndarray):
+        self.keys = keys
+        self.lookup = {key: g for g, key in enumerate(keys)}
+        self.codes = codes  # village row → unit index
+        n = len(keys)
+        self.village_count = np.bincount(codes, minlength=n).astype(np.int64)
+        self.population = np.zeros(n)
+        self.weighted_wsi = np.zeros(n)  # Σ population × WSI
+        self.bands = np.zeros((n, len(BAND_LABELS)), dtype=np.int64)
+        self.deficit = np.zeros(n)
+        self.tankers = np.zeros(n, dtype=np.int64)
+
+    def apply(self, rows: np.ndarray, sign: int, population, weighted, band, deficit) -> None:
+        codes = self.codes[rows]
+        np.add.at(self.population, codes, sign * population)
+        np.add.at(self.weighted_wsi, codes, sign * weighted)
+        np.add.at(self.bands, (codes, band), sign)
+        np.add.at(self.deficit, codes, sign * deficit)
+
+    def unit(self, g: int) -> dict:
+        population = self.population[g]
+        return {
+            "village_count": int(self.village_count[g]),
+            "population": int(round(population)),
+            "wsi": round(float(self.weighted_wsi[g] / population), 2) if population > 0 else 0.0,
+            "bands": {label: int(self.bands[g, b]) for b, label in enumerate(BAND_LABELS)},
+            "deficit_liters": round(float(self.deficit[g]), 2),
+            "tankers_assigned": int(self.tankers[g]),
+        }
+
+
+class RollupIndex:
+    """Incrementally maintained aggregates at each administrative level (thread-safe)."""
+
+    def __init__(self):
+        self._data_version: str | None = None     # village data version last folded
+        self._content_digest: str | None = None   # data version + WSI column last folded
+        self._generation: int | None = None       # shared snapshot generation last folded
+        self._membership: tuple | None = None
+        self._index: dict[str, int] = {}
+        self._levels: dict[str, _Level] = {}
+        # Per-village contributions currently included in the sums
+        self._population = np.empty(0)
+        self._weighted = np.empty(0)
+        self._band = np.empty(0, dtype=np.int64)
+        self._deficit = np.empty(0)
+        self._assignments: tuple | None = None
+        self._lock = threading.Lock()
+
+    # -----------------------------------------------------------------------
+    # Maintenance
+    # -----------------------------------------------------------------------
+
+    def update(self, table: VillageTable, wsi: np.ndarray) -> None:
+        """Fold a freshly computed WSI column into the aggregates."""
+        population = table.population.astype(np.float64)
+        weighted = population * np.asarray(wsi, dtype=np.float64)
+        band = band_of(wsi).astype(np.int64)
+        deficit = calculate_deficit_batch(table.population, table.gw_current_level, table.gw_min_required)
+
+        with self._lock:
+            self._data_version = table.version
+            self._content_digest = _content_digest(table, wsi)
+            membership = (tuple(table.ids), tuple(table.talukas), tuple(table.districts))
+            if membership != self._membership:
+                self._rebuild(table, membership)
+                changed = np.arange(len(table))
+            else:
+                changed = np.flatnonzero(
+                    (weighted != self._weighted) | (band != self._band) | (deficit != self._deficit)
+                    | (population != self._population)
+                )
+                if not len(changed):
+                    return
+                for level in self._levels.values():
+                    level.apply(
+                        changed, -1, self._population[changed], self._weighted[changed],
+                        self._band[changed], self._deficit[changed],
+                    )
+
+            for level in self._levels.values():
+                level.apply(changed, 1, population[changed], weighted[changed], band[changed], deficit[changed])
+            self._population, self._weighted, self._band, self._deficit = population, weighted, band, deficit
+
+    def refresh(self) -> None:
+        """Compute the status columns now (fires update via on_status_computed)."""
+        table, weather = fetch_status_inputs()
+        compute_status_columns(table, weather)
+
+    # -----------------------------------------------------------------------
+    # Reads
+    # -----------------------------------------------------------------------
+
+    def rollup(self, level: str, district: str | None = None) -> list[dict]:
+        """
+        Every unit of a level, highest weighted WSI first.
+
+        Args:
+            level: "state", "district" or "taluka".
+            district: For talukas, restrict to one district.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            self._sync_tankers()
+            lvl = self._levels[level]
+            units = []
+            for g, key in enumerate(lvl.keys):
+                if level == "taluka" and district is not None and key[0] != district:
+                    continue
+                units.append({**_unit_names(level, key), **lvl.unit(g)})
+        units.sort(key=lambda u: u["wsi"], reverse=True)
+        return units
+
+    def unit(self, level: str, key: tuple) -> dict | None:
+        """One unit by key: () for the state, (district,) or (district, taluka)."""
+        self._ensure_loaded()
+        with self._lock:
+            self._sync_tankers()
+            lvl = self._levels[level]
+            g = lvl.lookup.get(key)
+            if g is None:
+                return None
+            return {**_unit_names(level, key), **lvl.unit(g)}
+
+    def etag_parts(self) -> tuple:
+        """Inputs for a conditional-GET ETag (data + WSI digest and tanker assignments)."""
+        self._ensure_loaded()
+        with self._lock:
+            self._sync_tankers()
+            return self._content_digest, self._assignments
+
+    # -----------------------------------------------------------------------
+    # Internal Helpers
+    # -----------------------------------------------------------------------
+
+    def _ensure_loaded(self) -> None:
+        table = village_repository.snapshot()
+        if shared_status.enabled and not shared_status.is_producer:
+            view = shared_status.read()
+            if view is not None:
+                if view.generation != self._generation or self._data_version != table.version:
+                    self._fold_shared(table, view)
+                return
+        if not self._levels or self._data_version != table.version:
+            self.refresh()
+
+    def _fold_shared(self, table: VillageTable, view: StatusView) -> None:
+        """Update from a shared snapshot of the same village data."""
+        self.update(table, view.column_for(table, "wsi"))
+        self._generation = view.generation
+
+    def _rebuild(self, table: VillageTable, membership: tuple) -> None:
+        """Recreate units and empty sums for a new village membership (caller holds the lock)."""
+        districts = [d or UNASSIGNED for d in table.districts]
+        talukas = [(d, t or UNASSIGNED) for d, t in zip(districts, table.talukas)]
+
+        self._levels = {
+            "state": _Level([()], np.zeros(len(table), dtype=np.int64)),
+            "district": _build_level([(d,) for d in districts]),
+            "taluka": _build_level(talukas),
+        }
+        self._index = dict(table.index)
+        self._membership = membership
+        self._assignments = None
+        n = len(table)
+        self._population, self._weighted, self._deficit = np.zeros(n), np.zeros(n), np.zeros(n)
+        self._band = np.zeros(n, dtype=np.int64)
+        logger.info(
+            "Rollup index rebuilt: %d villages, %d districts, %d talukas",
+            n, len(self._levels["district"].keys), len(self._levels["taluka"].keys),
+        )
+
+    def _sync_tankers(self) -> None:
+        """
+        Recount assigned tankers per unit when assignments changed (caller
+        holds the lock). Effective status is checked on every read, so an
+        expired reservation stops counting without a fleet reload.
+        """
+        assignments = tuple(
+            (t["id"], t["assigned_village_id"])
+            for t in fleet_state.all_tankers()
+            if t["status"] in _ACTIVE_TANKER_STATES and t.get("assigned_village_id") in self._index
+        )
+        if assignments == self._assignments:
+            return
+        rows = np.array([self._index[vid] for _tid, vid in assignments], dtype=np.int64)
+        for level in self._levels.values():
+            level.tankers = np.bincount(level.codes[rows], minlength=len(level.keys)).astype(np.int64)
+        self._assignments = assignments
+
+
+def _content_digest(table: VillageTable, wsi: np.ndarray) -> str:
+    digest = hashlib.blake2b(table.version.encode("ascii"), digest_size=16)
+    digest.update(np.asarray(wsi, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def _build_level(keys_per_village: list[tuple]) -> _Level:
+    keys = sorted(set(keys_per_village))
+    lookup = {key: g for g, key in enumerate(keys)}
+    return _Level(keys, np.array([lookup[k] for k in keys_per_village], dtype=np.int64))
+
+
+def _unit_names(level: str, key: tuple) -> dict:
+    if level == "state":
+        return {"level": level, "name": STATE_UNIT}
+    if level == "district":
+        return {"level": level, "name": key[0]}
+    return {"level": level, "name": key[1], "district": key[0]}
+
+
+# Process-wide index, fed by every status computation
+rollup_index = RollupIndex()
+on_status_computed(rollup_index.update)
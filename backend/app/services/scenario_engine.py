@@ -0,0 +1,196 @@
+"""
+What-If Scenario Engine.
+
+CRITICAL: This module contains ONLY deterministic mathematical calculations.
+No AI/LLM calls are permitted here.
+
+Evaluates batches of parameter perturbations (rainfall deviation, groundwater
+level, fleet size, WSI threshold) against a snapshot of live data. WSI,
+priority and deficit are computed with the vectorized batch functions; only
+villages above the threshold are materialised for allocate_tankers. Large
+sweeps are split into one batch per job-runner worker; each batch carries
+the base snapshot once.
+"""
+
+import numpy as np
+
+from app.core.constants import (
+    DEFAULT_TANKER_CAPACITY_LITERS,
+    WSI_CRITICAL_THRESHOLD,
+)
+from app.database.repository import VillageTable
+from app.services.tanker_allocator import allocate_tankers, calculate_deficit_batch
+from app.services.wsi_calculator import compute_priority_score, compute_wsi_batch
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BASELINE_PARAMS = {
+    "name": "baseline",
+    "rainfall_dev_delta": 0.0,
+    "gw_level_delta": 0.0,
+    "tanker_delta": 0,
+    "wsi_threshold": WSI_CRITICAL_THRESHOLD,
+}
+
+# Metrics reported as differences against the baseline
+COMPARED_METRICS = (
+    "critical_villages",
+    "mean_wsi",
+    "total_deficit_liters",
+    "villages_served",
+    "villages_unserved",
+    "total_allocated_liters",
+    "coverage_pct",
+)
+
+
+def prepare_base(villages: VillageTable, tankers: list[dict]) -> dict:
+    """
+    Pick the column arrays shared by every scenario out of the snapshot.
+
+    Args:
+        villages: Columnar village snapshot from the repository.
+        tankers: Available tanker dicts.
+
+    Returns:
+        A picklable snapshot dict of per-field arrays plus the tanker list.
+    """
+    return {
+        "ids": villages.ids,
+        "names": villages.names,
+        "population": villages.population.astype(np.float64),
+        "gw_current": villages.gw_current_level,
+        "gw_min": villages.gw_min_required,
+        "rain_dev": villages.rainfall_dev_pct,
+        "tankers": list(tankers),
+    }
+
+
+def _adjust_fleet(tankers: list[dict], tanker_delta: int) -> list[dict]:
+    """Add standard-capacity simulated tankers, or drop tankers from the end of the list."""
+    if tanker_delta >= 0:
+        extra = [
+            {
+                "id": f"SIM-{n + 1:03d}",
+                "capacity_liters": DEFAULT_TANKER_CAPACITY_LITERS,
+                "status": "Available",
+            }
+            for n in range(tanker_delta)
+        ]
+        return list(tankers) + extra
+    return list(tankers)[: max(len(tankers) + tanker_delta, 0)]
+
+
+def evaluate_scenario(base: dict, params: dict) -> dict:
+    """
+    Evaluate one scenario against the base snapshot.
+
+    Args:
+        base: Snapshot produced by prepare_base.
+        params: Scenario parameters (see ScenarioParams).
+
+    Returns:
+        Coverage metrics for the scenario.
+    """
+    threshold = params["wsi_threshold"]
+
+    population = base["population"]
+    gw_current = np.maximum(base["gw_current"] + params["gw_level_delta"], 0.0)
+    rain_dev = np.maximum(base["rain_dev"] + params["rainfall_dev_delta"], -100.0)
+
+    # Rounded like the live endpoints so the baseline reproduces /allocation
+    wsi = compute_wsi_batch(gw_current, base["gw_min"], rain_dev)
+    priority = np.round(compute_priority_score(population, wsi), 2)
+    wsi = np.round(wsi, 2)
+    deficit = calculate_deficit_batch(population, gw_current, base["gw_min"])
+
+    needy = np.flatnonzero(wsi > threshold)
+    needy_villages = [
+        {
+            "id": base["ids"][i],
+            "name": base["names"][i],
+            "population": population[i],
+            "gw_current_level": gw_current[i],
+            "gw_min_required": base["gw_min"][i],
+            "wsi": float(wsi[i]),
+            "priority_score": float(priority[i]),
+        }
+        for i in needy
+    ]
+
+    tankers = _adjust_fleet(base["tankers"], params["tanker_delta"])
+    allocations = allocate_tankers(villages=needy_villages, tankers=tankers, wsi_threshold=threshold)
+
+    served_ids = {a["village_id"] for a in allocations}
+    total_deficit = float(deficit[needy].sum())
+    total_allocated = float(sum(a["allocated_liters"] for a in allocations))
+    population_served = int(sum(v["population"] for v in needy_villages if v["id"] in served_ids))
+    total_population = float(population.sum())
+
+    return {
+        "name": params.get("name"),
+        "params": params,
+        "villages_evaluated": len(base["ids"]),
+        "critical_villages": int(needy.size),
+        "mean_wsi": round(float(wsi.mean()), 2) if wsi.size else 0.0,
+        "population_weighted_wsi": (
+            round(float((wsi * population).sum() / total_population), 2) if total_population else 0.0
+        ),
+        "total_deficit_liters": round(total_deficit, 2),
+        "villages_served": len(allocations),
+        "villages_unserved": int(np.count_nonzero(deficit[needy] > 0)) - len(allocations),
+        "population_served": population_served,
+        "total_allocated_liters": round(total_allocated, 2),
+        "coverage_pct": round(total_allocated / total_deficit * 100.0, 2) if total_deficit else 100.0,
+        "tankers_available": len(tankers),
+        "tankers_used": len(allocations),
+    }
+
+
+def evaluate_batch(base: dict, scenarios: list[dict]) -> list[dict]:
+    """Evaluate a batch of scenarios against one base snapshot (job-runner entry point)."""
+    return [evaluate_scenario(base, params) for params in scenarios]
+
+
+def split_batches(scenarios: list[dict], parts: int) -> list[list[dict]]:
+    """Split scenarios into at most `parts` contiguous, near-equal batches."""
+    parts = max(1, min(parts, len(scenarios)))
+    size, extra = divmod(len(scenarios), parts)
+    batches, start = [], 0
+    for n in range(parts):
+        end = start + size + (1 if n < extra else 0)
+        batches.append(scenarios[start:end])
+        start = end
+    return batches
+
+
+def compare_with_baseline(baseline: dict, results: list[dict]) -> dict:
+    """
+    Attach delta_vs_baseline for the key coverage metrics to each result.
+
+    Returns:
+        {"baseline": metrics, "scenarios": [metrics, ...]}
+    """
+    for result in results:
+        result["delta_vs_baseline"] = {
+            metric: round(result[metric] - baseline[metric], 2) for metric in COMPARED_METRICS
+        }
+    return {"baseline": baseline, "scenarios": results}
+
+
+def run_scenarios(villages: VillageTable, tankers: list[dict], scenarios: list[dict]) -> dict:
+    """
+    Evaluate a baseline plus a batch of scenarios and compare them (in-process).
+
+    Args:
+        villages: Columnar village snapshot from the repository.
+        tankers: Available tanker dicts.
+        scenarios: Scenario parameter dicts.
+
+    Returns:
+        {"baseline": metrics, "scenarios": [metrics, ...]} where each
+        scenario carries delta_vs_baseline for the key coverage metrics.
+    """
+    base = prepare_base(villages, tankers)
+    return compare_with_baseline(evaluate_scenario(base, BASELINE_PARAMS), evaluate_batch(base, scenarios))
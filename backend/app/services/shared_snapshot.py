@@ -0,0 +1,318 @@
+"""
+Shared Status Snapshot — one producer, many uvicorn workers.
+
+With several uvicorn workers every process would otherwise keep its own
+weather cache and recompute the status view independently, multiplying
+OpenWeather calls with the worker count. Instead one worker (elected with
+an exclusive flock on SHARED_SNAPSHOT_PATH + ".lock") computes the view and
+publishes it to a memory-mapped file; every worker serves /status from
+that mapping. If the producer dies its lock is released and another
+worker takes over on its next election attempt.
+
+Publishing writes a new file and renames it over the old one, so readers
+never see a half-written snapshot; a reader notices the new inode on its
+next read and maps it, while mappings of the previous file stay valid.
+
+Binary layout (little-endian):
+
+    header     HEADER struct: magic, layout version, generation,
+               published_at, row count, strings length, ETag, data version
+    columns    len(NUMERIC_COLUMNS) float64 arrays of n_rows each
+               (rows in status order, i.e. sorted by priority)
+    strings    UTF-8 ids, names, talukas and districts, each list
+               unit-separated (\\x1f), the lists record-separated (\\x1e);
+               an empty taluka / district means unknown
+
+Columns are read with np.frombuffer straight from the mapping (no copy).
+Workers fall back to computing locally when sharing is disabled
+(SHARED_SNAPSHOT_PATH unset), the snapshot is older than
+SHARED_SNAPSHOT_MAX_AGE_SECONDS, or it was computed from a different
+village data version than the worker's own repository.
+"""
+
+import asyncio
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from app.config import settings
+from app.core.constants import SHARED_SNAPSHOT_MAX_AGE_SECONDS, SHARED_SNAPSHOT_REFRESH_SECONDS
+from app.database.repository import VillageTable, village_repository
+from app.services.data_events import on_village_data_changed
+from app.services.rainfall_grid import rainfall_grids
+from app.services.village_status import compute_villages_status, fetch_status_inputs
+from app.utils.http_cache import compute_etag
+from app.utils.logger import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, sharing stays disabled
+    fcntl = None
+
+logger = get_logger(__name__)
+
+MAGIC = b"DWSS"
+LAYOUT_VERSION = 2
+
+# magic, layout version, reserved, generation, published_at, n_rows, strings length, etag, data version
+HEADER = struct.Struct("<4sHHQdII40s40s")
+
+# Float64 columns, in file order ("live_*" feed the live_weather sub-dict)
+NUMERIC_COLUMNS = (
+    "population",
+    "lat",
+    "lng",
+    "gw_current_level",
+    "gw_min_required",
+    "gw_max_capacity",
+    "rainfall_dev_pct",
+    "wsi",
+    "priority_score",
+    "live_rainfall_mm",
+    "live_humidity",
+    "live_temp_c",
+)
+_NULLABLE = ("lat", "lng", "gw_max_capacity")
+
+# String columns, in file order
+STRING_FIELDS = ("id", "name", "taluka", "district")
+
+
+def encode_snapshot(rows: list[dict], etag: str, data_version: str, generation: int) -> bytes:
+    """Serialise a status view (see compute_villages_status) into the binary layout."""
+    columns = {name: np.empty(len(rows), dtype="<f8") for name in NUMERIC_COLUMNS}
+    for i, row in enumerate(rows):
+        for name in NUMERIC_COLUMNS:
+            if name.startswith("live_"):
+                value = row["live_weather"][name[len("live_"):]]
+            else:
+                value = row[name]
+            columns[name][i] = np.nan if value is None else value
+
+    strings = "\x1e".join(
+        "\x1f".join(r.get(field) or "" for r in rows) for field in STRING_FIELDS
+    ).encode("utf-8")
+
+    header = HEADER.pack(
+        MAGIC, LAYOUT_VERSION, 0, generation, time.time(),
+        len(rows), len(strings), etag.encode("ascii"), data_version.encode("ascii"),
+    )
+    return b"".join([header, *(columns[name].tobytes() for name in NUMERIC_COLUMNS), strings])
+
+
+class StatusView:
+    """Zero-copy view over one published snapshot."""
+
+    def __init__(self, buffer):
+        (magic, layout, _reserved, self.generation, self.published_at,
+         self.n_rows, strings_len, etag, data_version) = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or layout != LAYOUT_VERSION:
+            raise ValueError(f"Unsupported snapshot layout ({magic!r} v{layout})")
+        self.etag = etag.rstrip(b"\0").decode("ascii")
+        self.data_version = data_version.rstrip(b"\0").decode("ascii")
+
+        offset = HEADER.size
+        self.columns: dict[str, np.ndarray] = {}
+        for name in NUMERIC_COLUMNS:
+            self.columns[name] = np.frombuffer(buffer, dtype="<f8", count=self.n_rows, offset=offset)
+            offset += self.n_rows * 8
+
+        lists = bytes(buffer[offset:offset + strings_len]).decode("utf-8").split("\x1e")
+        self.ids, self.names, talukas, districts = (
+            (values.split("\x1f") if self.n_rows else []) for values in lists
+        )
+        self.talukas = [t or None for t in talukas]
+        self.districts = [d or None for d in districts]
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.published_at
+
+    def column_for(self, table: VillageTable, name: str) -> np.ndarray:
+        """A numeric column reordered to the rows of table (which must hold the same villages)."""
+        values = np.empty(len(table))
+        values[[table.index[vid] for vid in self.ids]] = self.columns[name]
+        return values
+
+    def rows(self) -> list[dict]:
+        """Materialise the status view (same shape as compute_villages_status)."""
+        cols = {name: col.tolist() for name, col in self.columns.items()}
+        for name in _NULLABLE:
+            cols[name] = [None if math.isnan(v) else v for v in cols[name]]
+        return [
+            {
+                "id": self.ids[i],
+                "name": self.names[i],
+                "taluka": self.talukas[i],
+                "district": self.districts[i],
+                "population": int(cols["population"][i]),
+                "lat": cols["lat"][i],
+                "lng": cols["lng"][i],
+                "gw_current_level": cols["gw_current_level"][i],
+                "gw_min_required": cols["gw_min_required"][i],
+                "gw_max_capacity": cols["gw_max_capacity"][i],
+                "rainfall_dev_pct": cols["rainfall_dev_pct"][i],
+                "wsi": cols["wsi"][i],
+                "priority_score": cols["priority_score"][i],
+                "live_weather": {
+                    "rainfall_mm": cols["live_rainfall_mm"][i],
+                    "humidity": cols["live_humidity"][i],
+                    "temp_c": cols["live_temp_c"][i],
+                },
+            }
+            for i in range(self.n_rows)
+        ]
+
+
+class SharedStatusSnapshot:
+    """Per-worker reader plus (in the elected worker) the producer loop."""
+
+    def __init__(self, path: str | None = None, interval: float = SHARED_SNAPSHOT_REFRESH_SECONDS):
+        self.path = settings.SHARED_SNAPSHOT_PATH if path is None else path
+        self.interval = interval
+        self.generation = 0
+
+        self._file_id: tuple | None = None
+        self._view: StatusView | None = None
+        self._read_lock = threading.Lock()
+
+        self._lock_fd: int | None = None
+        self._task: asyncio.Task | None = None
+        self._wake: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and fcntl is not None
+
+    @property
+    def is_producer(self) -> bool:
+        return self._lock_fd is not None
+
+    # -----------------------------------------------------------------------
+    # Reading
+    # -----------------------------------------------------------------------
+
+    def read(self) -> StatusView | None:
+        """
+        Return the current shared snapshot, or None if there is no usable one
+        (disabled, not yet published, too old, or from other village data).
+        """
+        if not self.enabled:
+            return None
+        view = self._mapped_view()
+        if view is None or view.age > SHARED_SNAPSHOT_MAX_AGE_SECONDS:
+            return None
+        if view.data_version != village_repository.snapshot().version:
+            return None
+        return view
+
+    def _mapped_view(self) -> StatusView | None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if file_id == self._file_id:
+            return self._view
+
+        with self._read_lock:
+            if file_id != self._file_id:
+                try:
+                    with open(self.path, "rb") as f:
+                        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._view = StatusView(buffer)
+                except (OSError, ValueError, struct.error) as exc:
+                    logger.warning("Shared snapshot unreadable: %s", exc)
+                    self._view = None
+                self._file_id = file_id
+            return self._view
+
+    # -----------------------------------------------------------------------
+    # Producing
+    # -----------------------------------------------------------------------
+
+    def publish(self) -> StatusView:
+        """Compute the status view and publish it (blocking — producer only)."""
+        table, weather = fetch_status_inputs()
+        rows = compute_villages_status(table, weather)
+        etag = compute_etag(table.version, weather, rainfall_grids.version())
+
+        self.generation += 1
+        payload = encode_snapshot(rows, etag, table.version, self.generation)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, self.path)
+        return StatusView(payload)
+
+    async def start(self) -> None:
+        """Start the election/publish loop (no-op unless SHARED_SNAPSHOT_PATH is set)."""
+        if not self.enabled or self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # releases the flock
+            self._lock_fd = None
+
+    def notify_changed(self) -> None:
+        """Publish early after a village data change (thread-safe)."""
+        if self._wake is not None and self._loop is not None and self.is_producer:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self) -> None:
+        while True:
+            if not self.is_producer and self._try_become_producer():
+                view = self._mapped_view()
+                self.generation = view.generation if view is not None else 0
+                logger.info("Shared status snapshot: this worker (pid %d) is the producer", os.getpid())
+
+            if self.is_producer:
+                try:
+                    started = time.perf_counter()
+                    view = await asyncio.to_thread(self.publish)
+                    logger.info(
+                        "Shared status snapshot %d published (%d villages, %.1f ms)",
+                        view.generation, view.n_rows, (time.perf_counter() - started) * 1000,
+                    )
+                except Exception as exc:
+                    logger.error("Shared status snapshot publish failed: %s", exc)
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _try_become_producer(self) -> bool:
+        fd = os.open(f"{self.path}.lock", os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+
+# Process-wide instance (started/stopped by the application lifespan)
+shared_status = SharedStatusSnapshot()
+
+# Re-publish promptly when village data changes in the producer process
+on_village_data_changed(lambda _village_ids: shared_status.notify_changed())
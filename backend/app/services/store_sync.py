@@ -0,0 +1,85 @@
+"""
+Store Sync Service — Supabase → local store replication.
+
+In local_first mode the dashboard reads from the embedded SQLite store.
+This service pulls the villages, groundwater, tankers and depots tables from
+Supabase on an interval and replaces the local copies atomically. When
+Supabase is unreachable the pull fails, is logged, and reads keep being
+served from the last successful snapshot.
+"""
+
+import asyncio
+
+from app.config import settings
+from app.core.constants import STORE_SYNC_INTERVAL_SECONDS
+from app.database.store import get_local_store
+from app.database.supabase_store import SupabaseStore
+from app.services.data_events import publish_village_data_changed
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Order matters: villages first (referenced by groundwater)
+SYNCED_TABLES = ("villages", "groundwater", "tankers", "depots")
+
+
+def sync_from_supabase() -> dict:
+    """
+    Pull every synced table from Supabase into the local store (blocking).
+
+    All tables are fetched before any is replaced, so a mid-pull failure
+    leaves the local store untouched.
+
+    Returns:
+        {table: row_count} for the tables written.
+    """
+    remote = SupabaseStore()
+    local = get_local_store()
+
+    fetched = {table: remote.select_all(table) for table in SYNCED_TABLES}
+    for table, rows in fetched.items():
+        local.replace_table(table, rows)
+
+    publish_village_data_changed(v["village_id"] for v in fetched["villages"])
+
+    counts = {table: len(rows) for table, rows in fetched.items()}
+    logger.info("Local store synced from Supabase: %s", counts)
+    return counts
+
+
+class StoreSyncJob:
+    """Background loop running sync_from_supabase every interval."""
+
+    def __init__(self, interval: float = STORE_SYNC_INTERVAL_SECONDS):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.STORAGE_BACKEND == "local_first"
+
+    async def start(self) -> None:
+        """Start syncing (no-op unless STORAGE_BACKEND is local_first)."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Store sync started (every %ss)", self.interval)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(sync_from_supabase)
+            except Exception as exc:
+                logger.error("Store sync from Supabase failed — serving local snapshot: %s", exc)
+            await asyncio.sleep(self.interval)
+
+
+store_sync_job = StoreSyncJob()
@@ -4,14 +4,29 @@ Tanker Allocation Engine.
 CRITICAL: This module contains ONLY deterministic mathematical calculations.
 No AI/LLM calls are permitted here.
 
-Matches water-deficit villages against available tanker capacity.
+Matches water-deficit villages against available tanker capacity, and
+repairs an existing plan locally when tankers or villages change.
 """
 
-from app.core.constants import MIN_WATER_REQUIREMENT_LPCD, WSI_CRITICAL_THRESHOLD
-from app.utils.logger import get_logger
+import heapq
+
+import numpy as np
+
+from app.core.constants import (
+    MIN_WATER_REQUIREMENT_LPCD,
+    REPAIR_PREEMPT_MARGIN,
+    WSI_CRITICAL_THRESHOLD,
+)
+from app.database.repository import VillageTable
+from app.services.road_network import TravelTimeMatrix
+from app.services.wsi_calculator import compute_priority_score, compute_wsi_batch
+from app.utils.logger import LogSampler, get_logger
 
 logger = get_logger(__name__)
 
+# One line per allocation: sampled so large districts don't flood the log
+_allocation_log = LogSampler(logger)
+
 
 def calculate_deficit(population: int, gw_current_level: float, gw_min_required: float) -> float:
     """
@@ -36,10 +51,33 @@ def calculate_deficit(population: int, gw_current_level: float, gw_min_required:
     return max(deficit, 0.0)
 
 
+def calculate_deficit_batch(
+    population: np.ndarray,
+    gw_current_level: np.ndarray,
+    gw_min_required: np.ndarray,
+) -> np.ndarray:
+    """
+    Vectorized calculate_deficit over arrays of villages.
+
+    Returns:
+        Array of daily water deficits in liters (0 where there is no deficit).
+    """
+    population = np.asarray(population, dtype=np.float64)
+    gw_current = np.asarray(gw_current_level, dtype=np.float64)
+    gw_min = np.asarray(gw_min_required, dtype=np.float64)
+
+    safe_min = np.where(gw_min > 0, gw_min, 1.0)
+    shortfall_ratio = np.where(
+        (gw_min > 0) & (gw_current < gw_min), (gw_min - gw_current) / safe_min, 0.0
+    )
+    return np.maximum(population * MIN_WATER_REQUIREMENT_LPCD * shortfall_ratio, 0.0)
+
+
 def allocate_tankers(
     villages: list[dict],
     tankers: list[dict],
     wsi_threshold: float = WSI_CRITICAL_THRESHOLD,
+    travel: TravelTimeMatrix | None = None,
 ) -> list[dict]:
     """
     Allocate available tankers to villages based on deficit and priority.
@@ -48,28 +86,41 @@ def allocate_tankers(
         1. Filter villages with WSI above threshold.
         2. Sort by priority_score (descending).
         3. Greedily assign tankers to highest-priority villages first.
+           With a travel-time matrix each village gets a tanker from the
+           depot with the shortest road time; otherwise (and where no
+           road time is known) the first available tanker.
 
     Args:
         villages: List of village dicts, each must contain:
             - id, name, population, gw_current_level, gw_min_required,
               wsi, priority_score
         tankers: List of tanker dicts, each must contain:
-            - id, capacity_liters
+            - id, capacity_liters (and depot_id for travel-time matching)
         wsi_threshold: Minimum WSI to qualify for tanker allocation.
+        travel: Depot → village road travel times (see road_network).
 
     Returns:
         List of allocation dicts with village_id, tanker_id,
-        allocated_liters, deficit_liters, priority_score.
+        allocated_liters, deficit_liters, priority_score (plus depot_id
+        and travel_min when a travel matrix is given).
     """
     # Filter and sort villages by priority
     needy_villages = [v for v in villages if v.get("wsi", 0) > wsi_threshold]
     needy_villages.sort(key=lambda v: v.get("priority_score", 0), reverse=True)
 
-    available_tankers = list(tankers)  # Copy to avoid mutation
+    # Available tankers per depot, each pool in list order
+    pools: dict[str | None, list[tuple[int, dict]]] = {}
+    for order, tanker in enumerate(tankers):
+        pools.setdefault(tanker.get("depot_id"), []).append((order, tanker))
+    for pool in pools.values():
+        pool.reverse()  # pop() from the end takes the earliest tanker
+    depot_ids = list(pools)
+    if travel is not None:
+        seconds, _ = travel.submatrix(depot_ids, [v["id"] for v in needy_villages])
     allocations = []
 
-    for village in needy_villages:
-        if not available_tankers:
+    for j, village in enumerate(needy_villages):
+        if not any(pools.values()):
             logger.warning("No more tankers available for allocation.")
             break
 
@@ -82,22 +133,321 @@ def allocate_tankers(
         if deficit <= 0:
             continue
 
-        # Assign the first available tanker
-        tanker = available_tankers.pop(0)
+        # Nearest depot (by road time) that still has a tanker; else the
+        # first available tanker
+        depot = None
+        if travel is not None:
+            depot = next(
+                (depot_ids[d] for d in np.argsort(seconds[:, j])
+                 if not np.isnan(seconds[d, j]) and pools[depot_ids[d]]),
+                None,
+            )
+        if depot is None:
+            depot = min((d for d in depot_ids if pools[d]), key=lambda d: pools[d][-1][0])
+        _, tanker = pools[depot].pop()
         allocated = min(deficit, tanker["capacity_liters"])
 
-        allocations.append({
+        allocation = {
             "village_id": village["id"],
             "village_name": village["name"],
             "tanker_id": tanker["id"],
             "allocated_liters": allocated,
             "deficit_liters": deficit,
             "priority_score": village.get("priority_score", 0),
-        })
+        }
+        if travel is not None:
+            road = travel.lookup(depot, village["id"]) if depot is not None else None
+            allocation["depot_id"] = depot
+            allocation["travel_min"] = round(road[0] / 60.0, 1) if road else None
+        allocations.append(allocation)
 
-        logger.info(
-            f"Allocated tanker {tanker['id']} → village {village['name']} "
-            f"({allocated:.0f}L / {deficit:.0f}L deficit)"
+        _allocation_log.info(
+            "Allocated tanker %s → village %s (%.0fL / %.0fL deficit)",
+            tanker["id"], village["name"], allocated, deficit,
         )
 
     return allocations
+
+
+def select_needy_villages(
+    villages: VillageTable,
+    wsi_threshold: float = WSI_CRITICAL_THRESHOLD,
+) -> list[dict]:
+    """
+    Compute WSI/priority over the village snapshot and materialise only the
+    villages above the threshold.
+
+    Args:
+        villages: Columnar village snapshot from the repository.
+        wsi_threshold: Minimum WSI to qualify for tanker allocation.
+
+    Returns:
+        Village dicts (with wsi and priority_score) ready for allocate_tankers.
+    """
+    wsi = compute_wsi_batch(
+        villages.gw_current_level,
+        villages.gw_min_required,
+        villages.rainfall_dev_pct,
+    )
+    priority = np.round(compute_priority_score(villages.population, wsi), 2)
+    wsi = np.round(wsi, 2)
+
+    needy = []
+    for i in np.flatnonzero(wsi > wsi_threshold):
+        village = villages.row_dict(i)
+        village["wsi"] = float(wsi[i])
+        village["priority_score"] = float(priority[i])
+        needy.append(village)
+    return needy
+
+
+def enrich_villages(villages: VillageTable, village_ids) -> list[dict]:
+    """
+    Compute WSI/priority for selected villages only (unknown IDs are skipped).
+
+    Args:
+        villages: Columnar village snapshot from the repository.
+        village_ids: IDs of the villages to materialise.
+
+    Returns:
+        Village dicts with wsi and priority_score, whatever their WSI.
+    """
+    rows = np.array(
+        sorted({villages.index[vid] for vid in village_ids if vid in villages.index}),
+        dtype=np.int64,
+    )
+    if rows.size == 0:
+        return []
+
+    wsi = compute_wsi_batch(
+        villages.gw_current_level[rows],
+        villages.gw_min_required[rows],
+        villages.rainfall_dev_pct[rows],
+    )
+    priority = np.round(compute_priority_score(villages.population[rows], wsi), 2)
+    wsi = np.round(wsi, 2)
+
+    enriched = []
+    for k, i in enumerate(rows):
+        village = villages.row_dict(i)
+        village["wsi"] = float(wsi[k])
+        village["priority_score"] = float(priority[k])
+        enriched.append(village)
+    return enriched
+
+
+def repair_allocation(
+    previous: list[dict],
+    changed_villages: list[dict],
+    free_tankers: list[dict],
+    removed_tanker_ids=(),
+    locked_tanker_ids=(),
+    wsi_threshold: float = WSI_CRITICAL_THRESHOLD,
+    preempt_margin: float = REPAIR_PREEMPT_MARGIN,
+    travel: TravelTimeMatrix | None = None,
+) -> dict:
+    """
+    Locally repair an allocation plan after a disruption.
+
+    Only the affected part of the plan is touched; every other assignment
+    is kept as is, so drivers are not reshuffled:
+
+        1. Allocations of removed tankers are dropped; their villages
+           become open.
+        2. Each changed village is re-evaluated: no longer needy → its
+           tankers are released; deficit shrank → surplus tankers (beyond
+           what covers it) are released; unserved and needy → open.
+        3. Open villages take tankers from the free pool (free tankers plus
+           released ones) in priority order, as allocate_tankers would:
+           from the nearest depot by road time that still has one, else
+           the first free tanker.
+        4. If the pool runs dry, an open village may take a tanker from the
+           lowest-priority served village, but only when it outranks it by
+           preempt_margin and the tanker is not locked (e.g. dispatched).
+
+    Args:
+        previous: The current allocations (village_id, tanker_id,
+            capacity_liters, priority_score, depot_id, ...).
+        changed_villages: Fresh village dicts (with wsi and priority_score)
+            for every village whose data changed.
+        free_tankers: Unassigned tanker dicts (id, capacity_liters, depot_id).
+        removed_tanker_ids: Tankers withdrawn from service (breakdowns).
+        locked_tanker_ids: Tankers that must stay where they are.
+        wsi_threshold: Minimum WSI to qualify for tanker allocation.
+        preempt_margin: Priority ratio needed to take a held tanker.
+        travel: Depot → village road travel times (see road_network).
+
+    Returns:
+        {"allocations": repaired plan, "changes": [{tanker_id,
+        from_village_id, to_village_id, reason}], "kept": unchanged count}.
+        New assignments carry depot_id and travel_min when a travel matrix
+        is given.
+    """
+    removed = set(removed_tanker_ids)
+    locked = set(locked_tanker_ids)
+    changed = {v["id"]: v for v in changed_villages}
+
+    held: dict[str, list[dict]] = {}
+    open_villages: dict[str, dict] = {}
+    changes: list[dict] = []
+    pool = [t for t in free_tankers if t["id"] not in removed]
+
+    for a in previous:
+        if a["tanker_id"] in removed:
+            changes.append({"tanker_id": a["tanker_id"], "from_village_id": a["village_id"],
+                            "to_village_id": None, "reason": "tanker_removed"})
+            open_villages.setdefault(a["village_id"], {
+                "id": a["village_id"],
+                "name": a["village_name"],
+                "deficit": a["deficit_liters"],
+                "priority_score": a["priority_score"],
+            })
+            continue
+        held.setdefault(a["village_id"], []).append(a)
+
+    # Step 2: re-evaluate changed villages (and villages that lost a tanker)
+    for vid in set(changed) | set(open_villages):
+        village = changed.get(vid)
+        allocations = held.get(vid, [])
+        if village is None:
+            # Lost a tanker but its data is unchanged: open only if now unserved
+            if allocations:
+                open_villages.pop(vid, None)
+            continue
+
+        deficit = calculate_deficit(
+            population=village["population"],
+            gw_current_level=village["gw_current_level"],
+            gw_min_required=village["gw_min_required"],
+        )
+        needy = village["wsi"] > wsi_threshold and deficit > 0
+
+        keep, covered = [], 0.0
+        # Locked tankers first, then largest — released surplus is the smallest
+        for a in sorted(allocations, key=lambda a: (a["tanker_id"] not in locked, -a["capacity_liters"])):
+            if a["tanker_id"] in locked or (needy and covered < deficit):
+                keep.append(a)
+                covered += a["capacity_liters"]
+            else:
+                pool.append({"id": a["tanker_id"], "capacity_liters": a["capacity_liters"],
+                             "depot_id": a.get("depot_id")})
+                changes.append({"tanker_id": a["tanker_id"], "from_village_id": vid,
+                                "to_village_id": None, "reason": "village_demand_dropped"})
+        held.pop(vid, None)
+        remaining = deficit
+        for a in keep:
+            allocated = min(remaining, a["capacity_liters"])
+            remaining -= allocated
+            held.setdefault(vid, []).append({
+                **a,
+                "allocated_liters": allocated,
+                "deficit_liters": deficit,
+                "priority_score": village["priority_score"],
+            })
+
+        open_villages.pop(vid, None)
+        if needy and vid not in held:
+            open_villages[vid] = {
+                "id": vid,
+                "name": village["name"],
+                "deficit": deficit,
+                "priority_score": village["priority_score"],
+            }
+
+    # Steps 3–4: serve open villages by priority
+    pool.sort(key=lambda t: t["id"])
+    victims = [
+        (a["priority_score"], vid, a["tanker_id"])
+        for vid, allocations in held.items()
+        if len(allocations) == 1 and allocations[0]["tanker_id"] not in locked
+        for a in allocations
+    ]
+    heapq.heapify(victims)
+
+    for village in sorted(open_villages.values(), key=lambda v: v["priority_score"], reverse=True):
+        if pool:
+            tanker = pool.pop(_nearest_in_pool(pool, village["id"], travel))
+            from_vid, reason = None, "assigned"
+        else:
+            while victims and victims[0][1] not in held:
+                heapq.heappop(victims)
+            if not victims or victims[0][0] * preempt_margin >= village["priority_score"]:
+                continue
+            _, from_vid, _ = heapq.heappop(victims)
+            taken = held.pop(from_vid)[0]
+            tanker = {"id": taken["tanker_id"], "capacity_liters": taken["capacity_liters"],
+                      "depot_id": taken.get("depot_id")}
+            reason = "preempted"
+
+        allocation = {
+            "village_id": village["id"],
+            "village_name": village["name"],
+            "tanker_id": tanker["id"],
+            "capacity_liters": tanker["capacity_liters"],
+            "depot_id": tanker.get("depot_id"),
+            "allocated_liters": min(village["deficit"], tanker["capacity_liters"]),
+            "deficit_liters": village["deficit"],
+            "priority_score": village["priority_score"],
+        }
+        if travel is not None:
+            road = travel.lookup(tanker.get("depot_id"), village["id"])
+            allocation["travel_min"] = round(road[0] / 60.0, 1) if road else None
+        held[village["id"]] = [allocation]
+        changes.append({"tanker_id": tanker["id"], "from_village_id": from_vid,
+                        "to_village_id": village["id"], "reason": reason})
+
+    allocations = [a for allocs in held.values() for a in allocs]
+    moved = {c["tanker_id"] for c in changes}
+    return {
+        "allocations": allocations,
+        "changes": changes,
+        "kept": sum(1 for a in allocations if a["tanker_id"] not in moved),
+    }
+
+
+def _nearest_in_pool(pool: list[dict], village_id: str, travel: TravelTimeMatrix | None) -> int:
+    """Index of the first pool tanker at the depot nearest to the village by road (0 without road times)."""
+    if travel is None:
+        return 0
+    best, best_seconds = 0, float("inf")
+    seen = set()
+    for k, tanker in enumerate(pool):
+        depot = tanker.get("depot_id")
+        if depot in seen:
+            continue
+        seen.add(depot)
+        road = travel.lookup(depot, village_id)
+        if road is not None and road[0] < best_seconds:
+            best, best_seconds = k, road[0]
+    return best
+
+
+def build_allocation_plan(
+    villages: VillageTable,
+    tankers: list[dict],
+    wsi_threshold: float = WSI_CRITICAL_THRESHOLD,
+    travel: TravelTimeMatrix | None = None,
+) -> dict:
+    """
+    Compute WSI/priority for the village snapshot and run the allocation.
+
+    Args:
+        villages: Columnar village snapshot from the repository.
+        tankers: Available tanker dicts.
+        wsi_threshold: Minimum WSI to qualify for tanker allocation.
+        travel: Depot → village road travel times, if a road graph is loaded.
+
+    Returns:
+        The allocation plan: total_villages_in_need (villages above the
+        threshold, served or not), villages_served, total_tankers_assigned
+        and the list of allocations.
+    """
+    needy = select_needy_villages(villages, wsi_threshold)
+    allocations = allocate_tankers(villages=needy, tankers=tankers, wsi_threshold=wsi_threshold, travel=travel)
+
+    return {
+        "total_villages_in_need": len(needy),
+        "villages_served": len({a["village_id"] for a in allocations}),
+        "total_tankers_assigned": len(allocations),
+        "allocations": allocations,
+    }
@@ -0,0 +1,440 @@
+"""
+Tanker Telemetry — GPS ping ingestion, live positions and ETAs.
+
+Trackers (or a gateway batching for them) post GPS pings every few
+seconds. Each tanker's recent fixes live in a ring buffer: one row of
+fixed-size numpy arrays (timestamp, lat, lng, speed) per tanker, so a
+batch is written with a handful of vectorized operations and memory stays
+constant however long the trackers run:
+
+    batch ──validate──▶ sort by (tanker, time) ──▶ scatter into the rings
+
+A ping no newer than the tanker's latest accepted fix (a retried or
+reordered batch) is dropped as stale, so every ring stays in time order.
+
+Every TELEMETRY_PERSIST_SECONDS a background loop writes the fixes
+received since its last run to the tanker_positions table, downsampled to
+one point per tanker per TELEMETRY_TRACK_INTERVAL_SECONDS, and each
+tanker's latest fix to tankers.current_location. The database sees one
+write per tanker per interval however often the trackers report.
+
+Fixes are held per process. With several uvicorn workers, pings must all
+reach the same worker (e.g. trackers or their gateway pinned to one
+instance); otherwise each worker only knows the pings it received, and
+its positions and ETAs lag the others'. Persistence stays consistent
+either way: tankers.current_location is only ever moved to a newer fix.
+
+ETA and delivery progress are measured against the tanker's current
+allocation (the village it is Reserved or Dispatched to): progress is the
+share of the depot → village distance already covered, the ETA the
+remaining distance at the tanker's recent average speed. Distances are
+straight-line distances scaled by TELEMETRY_ROAD_FACTOR.
+"""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from app.core.constants import (
+    FLEET_REFRESH_SECONDS,
+    INGEST_MAX_ERRORS_REPORTED,
+    TELEMETRY_ARRIVAL_RADIUS_KM,
+    TELEMETRY_DEFAULT_SPEED_KMH,
+    TELEMETRY_INITIAL_TANKERS,
+    TELEMETRY_MAX_CLOCK_SKEW_SECONDS,
+    TELEMETRY_MAX_PING_AGE_SECONDS,
+    TELEMETRY_MIN_MOVING_KMH,
+    TELEMETRY_PERSIST_SECONDS,
+    TELEMETRY_RING_SIZE,
+    TELEMETRY_ROAD_FACTOR,
+    TELEMETRY_SPEED_WINDOW_SECONDS,
+    TELEMETRY_STALE_SECONDS,
+    TELEMETRY_TRACK_INTERVAL_SECONDS,
+)
+from app.database.queries import get_depots, record_tanker_positions, update_tanker_locations
+from app.database.repository import village_repository
+from app.services.fleet_state import DISPATCHED, RESERVED, fleet_state
+from app.utils.geo import haversine_km
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Fleet states with a destination to report ETA / progress against
+EN_ROUTE_STATES = (RESERVED, DISPATCHED)
+
+
+class TelemetryStore:
+    """Per-tanker GPS ring buffers with periodic downsampled persistence."""
+
+    def __init__(self, ring_size: int = TELEMETRY_RING_SIZE, capacity: int = TELEMETRY_INITIAL_TANKERS):
+        self.ring_size = ring_size
+        self._slots: dict[str, int] = {}
+        self._ids: list[str] = []
+        self._ts = np.full((capacity, ring_size), np.nan)
+        self._lat = np.full((capacity, ring_size), np.nan)
+        self._lng = np.full((capacity, ring_size), np.nan)
+        self._speed = np.full((capacity, ring_size), np.nan)
+        self._written = np.zeros(capacity, dtype=np.int64)    # Fixes ever written (head = written % ring_size)
+        self._last_ts = np.full(capacity, -np.inf)
+        self._persisted_ts = np.full(capacity, -np.inf)
+        self._lock = threading.Lock()
+
+        self._depots: dict[str, tuple[float, float]] = {}
+        self._depots_loaded_at = -np.inf
+        self._counters = {"received": 0, "accepted": 0, "stale": 0, "rejected": 0, "persisted": 0}
+        self._task: asyncio.Task | None = None
+
+    # -----------------------------------------------------------------------
+    # Ingestion
+    # -----------------------------------------------------------------------
+
+    def ingest(self, pings: list[dict]) -> dict:
+        """
+        Validate a batch of pings and append them to the tankers' rings.
+
+        Each ping is {"tanker_id", "lat", "lng", "ts" (Unix seconds,
+        default: now), "speed_kmh" (optional)}.
+
+        Returns:
+            {"received", "accepted", "stale", "rejected", "errors"}.
+        """
+        now = time.time()
+        n = len(pings)
+        known = {t["id"] for t in fleet_state.all_tankers()}
+        ids: list[str | None] = [None] * n
+        ts = np.full(n, np.nan)
+        lat = np.full(n, np.nan)
+        lng = np.full(n, np.nan)
+        speed = np.full(n, np.nan)
+        valid = np.zeros(n, dtype=bool)
+        errors: list[str] = []
+
+        def reject(i: int, message: str) -> None:
+            if len(errors) < INGEST_MAX_ERRORS_REPORTED:
+                errors.append(f"ping {i}: {message}")
+
+        for i, ping in enumerate(pings):
+            try:
+                tanker_id = ping["tanker_id"]
+                if not isinstance(tanker_id, str):
+                    raise TypeError(f"tanker_id must be a string, got {type(tanker_id).__name__}")
+                lat[i] = float(ping["lat"])
+                lng[i] = float(ping["lng"])
+                stamp = ping.get("ts")
+                ts[i] = now if stamp is None else float(stamp)
+                reported = ping.get("speed_kmh")
+                if reported is not None:
+                    speed[i] = float(reported)
+            except (KeyError, TypeError, ValueError, AttributeError) as exc:
+                reject(i, f"malformed ({exc.__class__.__name__}: {exc})")
+                continue
+            if tanker_id not in known:
+                reject(i, f"unknown tanker '{tanker_id}'")
+                continue
+            ids[i] = tanker_id
+            valid[i] = True
+
+        in_range = (
+            np.isfinite(lat) & np.isfinite(lng) & np.isfinite(ts)
+            & (np.abs(lat) <= 90.0) & (np.abs(lng) <= 180.0)
+            & (ts <= now + TELEMETRY_MAX_CLOCK_SKEW_SECONDS)
+            & (ts >= now - TELEMETRY_MAX_PING_AGE_SECONDS)
+        )
+        for i in np.nonzero(valid & ~in_range)[0]:
+            reject(int(i), "coordinates or timestamp out of range")
+        valid &= in_range
+        speed[~(speed >= 0)] = np.nan  # negative / NaN speeds count as not reported
+
+        rows = np.nonzero(valid)[0]
+        with self._lock:
+            accepted = self._append(
+                np.fromiter((self._slot(ids[i]) for i in rows), dtype=np.int64, count=len(rows)),
+                ts[rows], lat[rows], lng[rows], speed[rows],
+            )
+            report = {
+                "received": n,
+                "accepted": accepted,
+                "stale": len(rows) - accepted,
+                "rejected": n - len(rows),
+            }
+            for key, value in report.items():
+                self._counters[key] += value
+        return {**report, "errors": errors}
+
+    def _slot(self, tanker_id: str) -> int:
+        slot = self._slots.get(tanker_id)
+        if slot is None:
+            slot = len(self._ids)
+            if slot == len(self._written):
+                self._grow()
+            self._slots[tanker_id] = slot
+            self._ids.append(tanker_id)
+        return slot
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._written)
+        for name in ("_ts", "_lat", "_lng", "_speed"):
+            old = getattr(self, name)
+            new = np.full((capacity, self.ring_size), np.nan)
+            new[: len(old)] = old
+            setattr(self, name, new)
+        self._written = np.concatenate([self._written, np.zeros(capacity - len(self._written), dtype=np.int64)])
+        for name in ("_last_ts", "_persisted_ts"):
+            old = getattr(self, name)
+            setattr(self, name, np.concatenate([old, np.full(capacity - len(old), -np.inf)]))
+
+    def _append(self, slot: np.ndarray, ts: np.ndarray, lat: np.ndarray, lng: np.ndarray, speed: np.ndarray) -> int:
+        """Scatter fixes into the rings (caller holds the lock); returns how many were kept."""
+        if not len(slot):
+            return 0
+        order = np.lexsort((ts, slot))
+        slot, ts, lat, lng, speed = slot[order], ts[order], lat[order], lng[order], speed[order]
+
+        # Drop fixes not newer than the ring's latest or than the previous fix in the batch
+        same_tanker = np.r_[False, slot[1:] == slot[:-1]]
+        keep = (ts > self._last_ts[slot]) & ~(same_tanker & (ts == np.r_[np.nan, ts[:-1]]))
+        slot, ts, lat, lng, speed = slot[keep], ts[keep], lat[keep], lng[keep], speed[keep]
+        if not len(slot):
+            return 0
+
+        # Rank of each fix within its tanker's run, and the run lengths
+        index = np.arange(len(slot))
+        first = np.r_[True, slot[1:] != slot[:-1]]
+        rank = index - np.maximum.accumulate(np.where(first, index, 0))
+        tankers, counts = np.unique(slot, return_counts=True)
+        run_length = np.repeat(counts, counts)
+
+        # A run longer than the ring only keeps its newest ring_size fixes
+        fits = run_length - rank <= self.ring_size
+        column = (self._written[slot] + rank) % self.ring_size
+        s, c = slot[fits], column[fits]
+        self._ts[s, c] = ts[fits]
+        self._lat[s, c] = lat[fits]
+        self._lng[s, c] = lng[fits]
+        self._speed[s, c] = speed[fits]
+
+        self._written[tankers] += counts
+        self._last_ts[tankers] = ts[np.r_[first[1:], True]]
+        return len(slot)
+
+    # -----------------------------------------------------------------------
+    # Reads
+    # -----------------------------------------------------------------------
+
+    def _ring(self, slot: int, since: float = -np.inf) -> tuple[np.ndarray, ...]:
+        """Copy of one tanker's fixes newer than since, oldest first (caller holds the lock)."""
+        written = int(self._written[slot])
+        size = min(written, self.ring_size)
+        columns = (np.arange(written - size, written) % self.ring_size)
+        ts = self._ts[slot, columns]
+        newer = ts > since
+        return (
+            ts[newer], self._lat[slot, columns][newer],
+            self._lng[slot, columns][newer], self._speed[slot, columns][newer],
+        )
+
+    def track(self, tanker_id: str, since: float | None = None) -> list[dict] | None:
+        """Recent fixes of one tanker, oldest first (None if it never reported)."""
+        with self._lock:
+            slot = self._slots.get(tanker_id)
+            if slot is None:
+                return None
+            ts, lat, lng, speed = self._ring(slot, -np.inf if since is None else since)
+        return [
+            {"ts": float(t), "lat": float(a), "lng": float(o), "speed_kmh": None if np.isnan(v) else float(v)}
+            for t, a, o, v in zip(ts, lat, lng, speed)
+        ]
+
+    def _recent_speed(self, ts: np.ndarray, lat: np.ndarray, lng: np.ndarray, speed: np.ndarray) -> float | None:
+        """Average speed (km/h) over the speed window before the latest fix."""
+        window = ts >= ts[-1] - TELEMETRY_SPEED_WINDOW_SECONDS
+        reported = speed[window]
+        reported = reported[~np.isnan(reported)]
+        if len(reported):
+            return float(reported.mean())
+        if window.sum() < 2:
+            return None
+        path_km = haversine_km(lat[window][:-1], lng[window][:-1], lat[window][1:], lng[window][1:]).sum()
+        hours = (ts[-1] - ts[window][0]) / 3600.0
+        return float(path_km / hours) if hours > 0 else None
+
+    def _depot_locations(self) -> dict[str, tuple[float, float]]:
+        if time.monotonic() - self._depots_loaded_at >= FLEET_REFRESH_SECONDS:
+            self._depots = {
+                d["id"]: (float(d["lat"]), float(d["lng"]))
+                for d in get_depots()
+                if d.get("lat") is not None and d.get("lng") is not None
+            }
+            self._depots_loaded_at = time.monotonic()
+        return self._depots
+
+    def positions(self, tanker_ids: list[str] | None = None) -> list[dict]:
+        """
+        Latest fix, speed, ETA and delivery progress per tanker.
+
+        Args:
+            tanker_ids: Tankers to report (default: every tanker in the fleet).
+
+        Returns:
+            One dict per tanker, ordered by ID. Position fields are None for
+            tankers that never reported; ETA fields are None unless the
+            tanker is Reserved or Dispatched to a village.
+        """
+        tankers = fleet_state.all_tankers()
+        if tanker_ids is not None:
+            wanted = set(tanker_ids)
+            tankers = [t for t in tankers if t["id"] in wanted]
+        now = time.time()
+        villages = village_repository.snapshot()
+        depots = self._depot_locations()
+
+        results = []
+        with self._lock:
+            fixes = {
+                t["id"]: self._ring(self._slots[t["id"]])
+                for t in tankers
+                if t["id"] in self._slots
+            }
+        for tanker in tankers:
+            entry = {
+                "tanker_id": tanker["id"],
+                "status": tanker["status"],
+                "village_id": tanker.get("assigned_village_id") if tanker["status"] in EN_ROUTE_STATES else None,
+                "lat": None, "lng": None, "last_seen_at": None, "age_sec": None, "stale": None,
+                "speed_kmh": None, "moving": None,
+                "remaining_km": None, "total_km": None, "progress_pct": None,
+                "eta_sec": None, "eta_at": None, "arrived": None,
+            }
+            ring = fixes.get(tanker["id"])
+            if ring is not None and len(ring[0]):
+                ts, lat, lng, speed = ring
+                recent = self._recent_speed(ts, lat, lng, speed)
+                entry.update({
+                    "lat": float(lat[-1]),
+                    "lng": float(lng[-1]),
+                    "last_seen_at": float(ts[-1]),
+                    "age_sec": round(max(0.0, now - ts[-1]), 1),
+                    "stale": bool(now - ts[-1] > TELEMETRY_STALE_SECONDS),
+                    "speed_kmh": None if recent is None else round(recent, 1),
+                    "moving": bool(recent is not None and recent >= TELEMETRY_MIN_MOVING_KMH),
+                })
+                i = villages.index.get(entry["village_id"]) if entry["village_id"] else None
+                if i is not None and not np.isnan(villages.lat[i]) and not np.isnan(villages.lng[i]):
+                    entry.update(self._progress(entry, tanker, villages.lat[i], villages.lng[i], depots, ring, now))
+            results.append(entry)
+        return results
+
+    def _progress(self, entry: dict, tanker: dict, v_lat: float, v_lng: float, depots: dict, ring: tuple, now: float) -> dict:
+        """Remaining distance, progress and ETA towards the assigned village."""
+        ts, lat, lng, _ = ring
+        remaining = float(haversine_km(lat[-1], lng[-1], v_lat, v_lng)) * TELEMETRY_ROAD_FACTOR
+        # Trip origin: the tanker's depot, else its oldest fix still in memory
+        o_lat, o_lng = depots.get(tanker.get("depot_id"), (lat[0], lng[0]))
+        total = max(float(haversine_km(o_lat, o_lng, v_lat, v_lng)) * TELEMETRY_ROAD_FACTOR, remaining)
+        if remaining <= TELEMETRY_ARRIVAL_RADIUS_KM:
+            return {"remaining_km": 0.0, "total_km": round(total, 2), "progress_pct": 100.0,
+                    "eta_sec": 0.0, "eta_at": float(ts[-1]), "arrived": True}
+
+        speed = entry["speed_kmh"] if entry["moving"] else TELEMETRY_DEFAULT_SPEED_KMH
+        # The ETA counts from the latest fix, so a lagging tracker is not credited with progress
+        eta_sec = remaining / speed * 3600.0
+        return {
+            "remaining_km": round(remaining, 2),
+            "total_km": round(total, 2),
+            "progress_pct": round(100.0 * (1.0 - remaining / total), 1) if total > 0 else 0.0,
+            "eta_sec": round(max(0.0, ts[-1] + eta_sec - now), 0),
+            "eta_at": round(float(ts[-1]) + eta_sec, 0),
+            "arrived": False,
+        }
+
+    def stats(self) -> dict:
+        """Counters for health reporting."""
+        with self._lock:
+            return {"tankers": len(self._ids), **self._counters}
+
+    # -----------------------------------------------------------------------
+    # Persistence
+    # -----------------------------------------------------------------------
+
+    def persist(self) -> int:
+        """
+        Write fixes received since the last run (downsampled) and the latest
+        location of each tanker that reported (blocking).
+
+        Returns:
+            Number of track points written.
+        """
+        rows = []
+        locations: dict[str, tuple[float, float, float]] = {}
+        with self._lock:
+            for slot, tanker_id in enumerate(self._ids):
+                if self._last_ts[slot] <= self._persisted_ts[slot]:
+                    continue
+                ts, lat, lng, speed = self._ring(slot, self._persisted_ts[slot])
+                # Last fix of each track interval; the key repeats for a
+                # partly-filled interval, so its point is replaced next run
+                bucket = np.floor(ts / TELEMETRY_TRACK_INTERVAL_SECONDS).astype(np.int64)
+                last_in_bucket = np.r_[bucket[1:] != bucket[:-1], True]
+                rows.extend(
+                    {
+                        "entry_id": f"{tanker_id}:{b}",
+                        "tanker_id": tanker_id,
+                        "recorded_at": float(t),
+                        "lat": float(a),
+                        "lng": float(o),
+                        "speed_kmh": None if np.isnan(v) else float(v),
+                    }
+                    for b, t, a, o, v in zip(
+                        bucket[last_in_bucket], ts[last_in_bucket], lat[last_in_bucket],
+                        lng[last_in_bucket], speed[last_in_bucket],
+                    )
+                )
+                locations[tanker_id] = (float(lat[-1]), float(lng[-1]), float(ts[-1]))
+
+        if not rows:
+            return 0
+        record_tanker_positions(rows)
+        update_tanker_locations(locations)
+
+        # Mark as persisted only once written, so a failed run is retried
+        with self._lock:
+            for tanker_id, (_, _, ts) in locations.items():
+                slot = self._slots[tanker_id]
+                self._persisted_ts[slot] = max(self._persisted_ts[slot], ts)
+            self._counters["persisted"] += len(rows)
+        return len(rows)
+
+    async def start(self) -> None:
+        """Start the persistence loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Telemetry persistence started (every %ss)", TELEMETRY_PERSIST_SECONDS)
+
+    async def stop(self) -> None:
+        """Stop the loop and flush what has not been written yet."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            try:
+                await asyncio.to_thread(self.persist)
+            except Exception as exc:
+                logger.warning("Final telemetry flush failed: %s", exc)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(TELEMETRY_PERSIST_SECONDS)
+            try:
+                written = await asyncio.to_thread(self.persist)
+                if written:
+                    logger.debug("Persisted %d tanker track points", written)
+            except Exception as exc:
+                logger.warning("Telemetry persistence failed (will retry): %s", exc)
+
+
+telemetry = TelemetryStore()
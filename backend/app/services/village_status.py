@@ -0,0 +1,130 @@
+"""
+Village Status Service.
+
+Builds the live village status view shared by the status endpoint, the
+chat assistant and the live-update hub: village rows joined with
+groundwater, adjusted by the latest weather reading, with WSI and
+priority computed deterministically.
+
+Village data comes from the columnar repository snapshot, and WSI /
+priority are computed over whole columns with the vectorized functions.
+Services that maintain derived state (e.g. the administrative rollups)
+register with on_status_computed to receive every freshly computed WSI
+column instead of recomputing it themselves.
+
+When gridded rainfall rasters are configured (see rainfall_grid), the
+seasonal rainfall deviation is sampled from them per village instead of
+read from the stored column.
+"""
+
+from typing import Callable
+
+import numpy as np
+
+from app.database.repository import VillageTable, village_repository
+from app.services.rainfall_grid import rainfall_grids
+from app.services.wsi_calculator import compute_priority_score, compute_wsi_batch
+from app.services.weather_service import fetch_weather
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+StatusListener = Callable[[VillageTable, np.ndarray], None]
+
+_status_listeners: list[StatusListener] = []
+
+
+def on_status_computed(listener: StatusListener) -> StatusListener:
+    """
+    Register a listener called with (table, wsi) after each status computation.
+
+    Listeners run synchronously on the computing thread, so they must be
+    cheap and thread-safe. Usable as a decorator.
+    """
+    _status_listeners.append(listener)
+    return listener
+
+
+def fetch_status_inputs() -> tuple[VillageTable, list[dict]]:
+    """
+    Fetch the raw inputs behind the status view: the village snapshot,
+    plus the (cached) live weather reading for each village.
+    """
+    table = village_repository.snapshot()
+    weather = []
+    for i, vid in enumerate(table.ids):
+        lat, lon = table.coordinates(i)
+        weather.append(fetch_weather(village_id=vid, lat=lat, lon=lon))
+    return table, weather
+
+
+def compute_status_columns(
+    table: VillageTable, weather_readings: list[dict]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Weather-adjusted WSI columns for every village in the table.
+
+    Returns:
+        (wsi, priority_score, rainfall_dev_pct) arrays, in table row order.
+    """
+    actual_rain = np.array([w["rainfall_mm_last_hour"] for w in weather_readings], dtype=np.float64)
+    humidity = np.array([w["humidity_percent"] for w in weather_readings], dtype=np.float64)
+
+    # Retrieve the seasonal cumulative deviation from the database.
+    # When actual rain happens (and the weather API answered, i.e. humidity > 0),
+    # it relieves the existing drought deficit: +5% deviation per mm of rain.
+    # Otherwise we stick to the realistic seasonal base rather than an
+    # hourly expectation, which would produce an unrealistic -100% deficit.
+    # Gridded rainfall rasters, when configured, replace the stored deviation
+    # for every village they cover.
+    base_dev_pct = table.rainfall_dev_pct
+    grid_dev_pct = rainfall_grids.seasonal_deviation(table)
+    if grid_dev_pct is not None:
+        base_dev_pct = np.where(np.isnan(grid_dev_pct), base_dev_pct, grid_dev_pct)
+    raining = (humidity > 0) & (actual_rain > 0)
+    rainfall_dev_pct = np.where(raining, np.minimum(100.0, base_dev_pct + actual_rain * 5.0), base_dev_pct)
+
+    wsi = compute_wsi_batch(table.gw_current_level, table.gw_min_required, rainfall_dev_pct)
+    priority = compute_priority_score(table.population, wsi)
+
+    for listener in list(_status_listeners):
+        try:
+            listener(table, wsi)
+        except Exception as exc:
+            logger.error("Status listener %r failed: %s", listener, exc)
+
+    return wsi, priority, rainfall_dev_pct
+
+
+def compute_villages_status(table: VillageTable, weather_readings: list[dict]) -> list[dict]:
+    """Compute WSI and priority for each village and sort by priority (highest first)."""
+    if not len(table):
+        return []
+
+    wsi, priority, rainfall_dev_pct = compute_status_columns(table, weather_readings)
+
+    results = []
+    for i, weather in enumerate(weather_readings):
+        row = table.row_dict(i)
+        row["wsi"] = round(float(wsi[i]), 2)
+        row["priority_score"] = round(float(priority[i]), 2)
+        row["rainfall_dev_pct"] = round(float(rainfall_dev_pct[i]), 2)
+        row["live_weather"] = {
+            "rainfall_mm": weather["rainfall_mm_last_hour"],
+            "humidity": weather["humidity_percent"],
+            "temp_c": weather["temperature_celsius"],
+        }
+        results.append(row)
+
+    results.sort(key=lambda r: r["priority_score"], reverse=True)
+    return results
+
+
+def load_villages_status() -> list[dict]:
+    """
+    Return the full village status list (live weather + computed WSI).
+
+    Shared by the status endpoint and the chat assistant's context builder.
+    """
+    table, weather = fetch_status_inputs()
+    return compute_villages_status(table, weather)
@@ -0,0 +1,144 @@
+"""
+Startup Warm-Up and Readiness.
+
+A freshly started worker has an empty village snapshot, fleet cache and
+weather cache, so the first /api/villages/status after a deploy would pay
+for all of them. The warm-up runs in the background as soon as the
+application starts:
+
+1. load the village snapshot and the fleet (required — retried every
+   WARMUP_RETRY_SECONDS until the store answers);
+2. prefetch live weather for the WARMUP_WEATHER_VILLAGES villages with the
+   highest database-only priority score, WARMUP_CONCURRENCY at a time
+   (best effort, bounded by WARMUP_WEATHER_TIMEOUT_SECONDS — villages not
+   reached are fetched on demand as before);
+3. build the depot → village travel-time matrix when a road graph is
+   configured (best effort — allocation falls back to straight-line
+   distances until it is available).
+
+/ready reports 503 until the warm-up finished, so a load balancer only
+routes traffic to warm workers; /health stays a pure liveness check.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+
+from app.core.constants import (
+    WARMUP_CONCURRENCY,
+    WARMUP_RETRY_SECONDS,
+    WARMUP_WEATHER_TIMEOUT_SECONDS,
+    WARMUP_WEATHER_VILLAGES,
+)
+from app.database.repository import VillageTable, village_repository
+from app.services.fleet_state import fleet_state
+from app.services.road_network import road_network
+from app.services.weather_service import fetch_weather
+from app.services.wsi_calculator import compute_priority_score, compute_wsi_batch
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def top_priority_rows(table: VillageTable, limit: int) -> np.ndarray:
+    """Row indices of the `limit` highest-priority villages, from stored data only."""
+    wsi = compute_wsi_batch(table.gw_current_level, table.gw_min_required, table.rainfall_dev_pct)
+    priority = compute_priority_score(table.population, wsi)
+    return np.argsort(-priority, kind="stable")[:limit]
+
+
+class WarmUp:
+    """Background cache warm-up plus the readiness state it drives."""
+
+    def __init__(self):
+        self.ready = False
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.checks: dict[str, str] = {}
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Start warming up in the background (the app accepts requests meanwhile)."""
+        if self._task is None:
+            self.started_at = time.time()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "checks": dict(self.checks),
+            "warmup_sec": (
+                round(self.finished_at - self.started_at, 2)
+                if self.finished_at is not None and self.started_at is not None else None
+            ),
+        }
+
+    async def _run(self) -> None:
+        table = await self._load_core()
+        await self._prefetch_weather(table)
+        await self._build_travel_matrix(table)
+
+        self.ready = True
+        self.finished_at = time.time()
+        logger.info("Warm-up complete in %.2fs: %s", self.finished_at - self.started_at, self.checks)
+
+    async def _load_core(self) -> VillageTable:
+        while True:
+            try:
+                table, _ = await asyncio.gather(
+                    asyncio.to_thread(village_repository.snapshot),
+                    asyncio.to_thread(fleet_state.refresh),
+                )
+                self.checks["villages"] = f"{len(table)} loaded"
+                self.checks["fleet"] = "loaded"
+                return table
+            except Exception as exc:
+                self.checks["villages"] = f"failed: {exc}"
+                logger.warning("Warm-up: store not reachable (%s), retrying in %ss", exc, WARMUP_RETRY_SECONDS)
+                await asyncio.sleep(WARMUP_RETRY_SECONDS)
+
+    async def _prefetch_weather(self, table: VillageTable) -> None:
+        rows = top_priority_rows(table, WARMUP_WEATHER_VILLAGES) if len(table) else []
+        semaphore = asyncio.Semaphore(WARMUP_CONCURRENCY)
+
+        async def fetch(i: int) -> None:
+            lat, lon = table.coordinates(int(i))
+            async with semaphore:
+                await asyncio.to_thread(fetch_weather, village_id=table.ids[int(i)], lat=lat, lon=lon)
+
+        tasks = [asyncio.create_task(fetch(i)) for i in rows]
+        if not tasks:
+            self.checks["weather"] = "0 prefetched"
+            return
+        done, pending = await asyncio.wait(tasks, timeout=WARMUP_WEATHER_TIMEOUT_SECONDS)
+        for task in pending:
+            task.cancel()
+        self.checks["weather"] = f"{len(done)} of {len(rows)} prefetched"
+
+    async def _build_travel_matrix(self, table: VillageTable) -> None:
+        if not road_network.enabled:
+            return
+        try:
+            travel = await asyncio.to_thread(road_network.matrix, table)
+        except Exception as exc:
+            self.checks["travel_matrix"] = f"failed: {exc}"
+            logger.warning("Warm-up: travel matrix not built (%s)", exc)
+            return
+        self.checks["travel_matrix"] = (
+            f"{len(travel.depot_ids)} depots x {len(travel.village_ids)} villages"
+            if travel is not None else "road graph unavailable"
+        )
+
+
+# Process-wide instance (started/stopped by the application lifespan)
+warm_up = WarmUp()
@@ -4,6 +4,11 @@ Weather Service — Deterministic Rainfall Data Ingestion.
 Fetches current weather data from OpenWeather API for a given lat/lon.
 Includes a simple in-memory cache (15 min TTL) to avoid redundant API calls.
 
+Calls go through a circuit breaker with a latency-adaptive timeout. While
+OpenWeather is failing, calls return immediately with the last known
+(possibly stale) reading for the village, or safe defaults, instead of
+each waiting out the full timeout.
+
 STRICT RULES:
 - This module does NOT perform business logic or AI calls.
 - It only fetches, caches, and formats weather data.
@@ -13,14 +18,34 @@ TODO: Integrate OpenWeather Forecast API (5-day / 3-hour) for predictive drought
 """
 
 import time
-import requests
 
 from app.config import settings
-from app.core.constants import OPENWEATHER_BASE_URL, WEATHER_CACHE_TTL_SECONDS
-from app.utils.logger import get_logger
+from app.core.constants import (
+    OPENWEATHER_BASE_URL,
+    OPENWEATHER_FORECAST_URL,
+    WEATHER_CACHE_TTL_SECONDS,
+    WEATHER_MIN_TIMEOUT_SECONDS,
+    WEATHER_TIMEOUT_SECONDS,
+)
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.lazy_import import lazy_import
+from app.utils.logger import LogSampler, get_logger
+
+requests = lazy_import("requests")
 
 logger = get_logger(__name__)
 
+# Per-village lines, sampled (a status refresh fetches every village)
+_fetch_log = LogSampler(logger)
+_missing_key_log = LogSampler(logger)
+
+# Shared by current-weather and forecast calls (same upstream)
+openweather_breaker = CircuitBreaker(
+    "openweather",
+    max_timeout=WEATHER_TIMEOUT_SECONDS,
+    min_timeout=WEATHER_MIN_TIMEOUT_SECONDS,
+)
+
 # ---------------------------------------------------------------------------
 # In-Memory Weather Cache
 # ---------------------------------------------------------------------------
@@ -37,6 +62,12 @@ def _get_cached(village_id: str) -> dict | None:
     return None
 
 
+def _get_stale(village_id: str):
+    """Return the last cached value regardless of age (fallback while the upstream is down)."""
+    entry = _weather_cache.get(village_id)
+    return entry["data"] if entry else None
+
+
 def _set_cache(village_id: str, data: dict) -> None:
     """Store weather data in the in-memory cache."""
     _weather_cache[village_id] = {
@@ -60,7 +91,8 @@ def fetch_weather(village_id: str, lat: float, lon: float) -> dict:
             "temperature_celsius": float,
         }
 
-    If the API call fails or times out, returns safe defaults (rainfall=0)
+    If the API call fails or times out — or the circuit is open — returns
+    the last known reading for the village, else safe defaults (rainfall=0),
     so the system NEVER crashes.
 
     Args:
@@ -79,7 +111,7 @@ def fetch_weather(village_id: str, lat: float, lon: float) -> dict:
     # 2. Build request
     api_key = settings.OPENWEATHER_API_KEY
     if not api_key:
-        logger.warning("OPENWEATHER_API_KEY not set — returning default weather data.")
+        _missing_key_log.warning("OPENWEATHER_API_KEY not set — returning default weather data.")
         return _default_weather()
 
     params = {
@@ -89,32 +121,42 @@ def fetch_weather(village_id: str, lat: float, lon: float) -> dict:
         "units": "metric",
     }
 
-    # 3. Call OpenWeather API with 5-second timeout
+    # 3. Fail fast while the circuit is open
+    if not openweather_breaker.allow():
+        return _get_stale(village_id) or _default_weather()
+
+    # 4. Call OpenWeather API with the adaptive timeout
+    timeout = openweather_breaker.timeout()
+    started = time.perf_counter()
     try:
-        response = requests.get(OPENWEATHER_BASE_URL, params=params, timeout=5)
+        response = requests.get(OPENWEATHER_BASE_URL, params=params, timeout=timeout)
 
         if response.status_code != 200:
+            openweather_breaker.record_failure()
             logger.error(
                 "OpenWeather API returned status %d for village %s: %s",
                 response.status_code,
                 village_id,
                 response.text[:200],
             )
-            return _default_weather()
+            return _get_stale(village_id) or _default_weather()
 
         data = response.json()
+        openweather_breaker.record_success(time.perf_counter() - started)
         result = _parse_weather_response(data)
         _set_cache(village_id, result)
-        logger.info("Weather fetched for village %s: %s", village_id, result)
+        _fetch_log.info("Weather fetched for village %s: %s", village_id, result)
         return result
 
     except requests.exceptions.Timeout:
-        logger.error("OpenWeather API TIMEOUT for village %s (5s exceeded).", village_id)
-        return _default_weather()
+        openweather_breaker.record_failure()
+        logger.error("OpenWeather API TIMEOUT for village %s (%.1fs exceeded).", village_id, timeout)
+        return _get_stale(village_id) or _default_weather()
 
-    except requests.exceptions.RequestException as exc:
+    except (requests.exceptions.RequestException, ValueError) as exc:
+        openweather_breaker.record_failure()
         logger.error("OpenWeather API request failed for village %s: %s", village_id, exc)
-        return _default_weather()
+        return _get_stale(village_id) or _default_weather()
 
 
 def fetch_forecast(village_id: str, lat: float, lon: float) -> list:
@@ -147,15 +189,20 @@ def fetch_forecast(village_id: str, lat: float, lon: float) -> list:
         "units": "metric",
     }
 
+    if not openweather_breaker.allow():
+        return _get_stale(cache_key) or []
+
+    started = time.perf_counter()
     try:
-        from app.core.constants import OPENWEATHER_FORECAST_URL
-        response = requests.get(OPENWEATHER_FORECAST_URL, params=params, timeout=5)
+        response = requests.get(OPENWEATHER_FORECAST_URL, params=params, timeout=openweather_breaker.timeout())
 
         if response.status_code != 200:
+            openweather_breaker.record_failure()
             logger.error("Forecast API error %d for %s", response.status_code, village_id)
-            return []
+            return _get_stale(cache_key) or []
 
         data = response.json()
+        openweather_breaker.record_success(time.perf_counter() - started)
         daily_forecast = {}
 
         # Aggregate 3-hour chunks into daily
@@ -201,8 +248,9 @@ def fetch_forecast(village_id: str, lat: float, lon: float) -> list:
         return result
 
     except Exception as exc:
+        openweather_breaker.record_failure()
         logger.error("Forecast API request failed for village %s: %s", village_id, exc)
-        return []
+        return _get_stale(cache_key) or []
 
 # ---------------------------------------------------------------------------
 # Internal Helpers
@@ -5,8 +5,15 @@ CRITICAL: This module contains ONLY deterministic mathematical calculations.
 No AI/LLM calls are permitted here.
 """
 
+import numpy as np
+
 from app.utils.helpers import clamp
-from app.core.constants import WSI_MAX, WSI_MIN
+from app.core.constants import (
+    WSI_CRITICAL_THRESHOLD,
+    WSI_MAX,
+    WSI_MIN,
+    WSI_MODERATE_THRESHOLD,
+)
 
 
 def compute_wsi(
@@ -51,6 +58,37 @@ def compute_wsi(
     return clamp(wsi, WSI_MIN, WSI_MAX)
 
 
+def compute_wsi_batch(
+    gw_current_level: np.ndarray,
+    gw_min_required: np.ndarray,
+    rainfall_dev_pct: np.ndarray,
+) -> np.ndarray:
+    """
+    Vectorized compute_wsi over arrays of villages (or samples).
+
+    Applies exactly the same formula and clamping as compute_wsi,
+    element-wise, so results match the scalar path.
+
+    Args:
+        gw_current_level: Current groundwater levels in meters.
+        gw_min_required: Minimum required groundwater levels in meters.
+        rainfall_dev_pct: Rainfall deviation percentages.
+
+    Returns:
+        Array of WSI values clamped between 0 and 100.
+    """
+    gw_current = np.asarray(gw_current_level, dtype=np.float64)
+    gw_min = np.asarray(gw_min_required, dtype=np.float64)
+    rain_dev = np.asarray(rainfall_dev_pct, dtype=np.float64)
+
+    safe_min = np.where(gw_min > 0, gw_min, 1.0)
+    groundwater_stress = np.where(gw_min > 0, (gw_min - gw_current) / safe_min * 100.0, 0.0)
+    rainfall_stress = np.where(rain_dev < 0, -rain_dev, 0.0)
+
+    wsi = 0.6 * groundwater_stress + 0.4 * rainfall_stress
+    return np.clip(wsi, WSI_MIN, WSI_MAX)
+
+
 def compute_priority_score(population: int, wsi: float) -> float:
     """
     Compute a priority score for resource allocation.
@@ -92,3 +130,20 @@ def calculate_rainfall_deviation(actual_rainfall: float, expected_rainfall: floa
 
     deviation = ((expected_rainfall - actual_rainfall) / expected_rainfall) * 100.0
     return max(0.0, min(deviation, 100.0))
+
+
+def wsi_status_label(wsi: float) -> str:
+    """
+    Return the human-readable stress band for a WSI value.
+
+    Args:
+        wsi: Computed Water Stress Index (0–100).
+
+    Returns:
+        "Severe Stress", "Moderate Stress" or "Safe".
+    """
+    if wsi > WSI_CRITICAL_THRESHOLD:
+        return "Severe Stress"
+    if wsi > WSI_MODERATE_THRESHOLD:
+        return "Moderate Stress"
+    return "Safe"
@@ -0,0 +1,176 @@
+"""
+Circuit breaker with latency-adaptive timeouts for upstream HTTP calls.
+
+States:
+    closed     — calls go through; consecutive failures are counted
+    open       — calls fail fast (callers serve cached/default data) until
+                 the cooldown elapses
+    half_open  — one probe call is let through; success closes the
+                 breaker, failure re-opens it with a doubled cooldown
+
+The request timeout adapts to the upstream's observed latency: once enough
+successful calls have been seen it is the chosen percentile times a
+multiplier, clamped to [min_timeout, max_timeout]. A healthy upstream
+answering in 300 ms therefore gets a ~1 s timeout instead of the fixed
+worst-case one, so a sudden outage is detected in seconds. Opening the
+breaker forgets the learned latencies, and half-open probes always get
+max_timeout, so an upstream that recovers slower than before is not
+locked out by a timeout learned while it was fast.
+
+Usage:
+    if not breaker.allow():
+        return fallback()
+    started = time.perf_counter()
+    try:
+        response = requests.get(url, timeout=breaker.timeout())
+        ...
+    except requests.RequestException:
+        breaker.record_failure()
+        return fallback()
+    breaker.record_success(time.perf_counter() - started)
+"""
+
+import threading
+import time
+from collections import deque
+
+from app.core.constants import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_LATENCY_WINDOW,
+    BREAKER_MAX_OPEN_SECONDS,
+    BREAKER_MIN_SAMPLES,
+    BREAKER_OPEN_SECONDS,
+    BREAKER_TIMEOUT_MULTIPLIER,
+    BREAKER_TIMEOUT_PERCENTILE,
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# name → breaker, for health reporting
+_breakers: dict[str, "CircuitBreaker"] = {}
+
+
+def breaker_states() -> dict[str, dict]:
+    """Snapshot of every registered breaker."""
+    return {name: breaker.snapshot() for name, breaker in _breakers.items()}
+
+
+class CircuitBreaker:
+    """Per-upstream failure tracking and adaptive timeout (thread-safe)."""
+
+    def __init__(
+        self,
+        name: str,
+        max_timeout: float,
+        min_timeout: float,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+        max_open_seconds: float = BREAKER_MAX_OPEN_SECONDS,
+    ):
+        self.name = name
+        self.max_timeout = max_timeout
+        self.min_timeout = min_timeout
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+
+        self._state = CLOSED
+        self._failures = 0
+        self._cooldown = open_seconds
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._latencies: deque[float] = deque(maxlen=BREAKER_LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+        _breakers[name] = self
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> bool:
+        """True if a call may be made now (False → fail fast)."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            # A probe that never reported back (caller crashed) expires after max_timeout
+            probe_stale = time.monotonic() - self._probe_started > self.max_timeout
+            if state == HALF_OPEN and (not self._probe_in_flight or probe_stale):
+                self._probe_in_flight = True
+                self._probe_started = time.monotonic()
+                return True
+            return False
+
+    def timeout(self) -> float:
+        """Request timeout in seconds, adapted to recent successful latencies."""
+        with self._lock:
+            if self._current_state() != CLOSED or len(self._latencies) < BREAKER_MIN_SAMPLES:
+                return self.max_timeout
+            ordered = sorted(self._latencies)
+            index = min(len(ordered) - 1, int(len(ordered) * BREAKER_TIMEOUT_PERCENTILE / 100))
+            adaptive = ordered[index] * BREAKER_TIMEOUT_MULTIPLIER
+        return min(max(adaptive, self.min_timeout), self.max_timeout)
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+            if self._state != CLOSED:
+                logger.info("Circuit '%s' closed (upstream recovered)", self.name)
+            self._state = CLOSED
+            self._failures = 0
+            self._cooldown = self.open_seconds
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            self._probe_in_flight = False
+            if state == HALF_OPEN:
+                # Probe failed: back off further before the next one
+                self._cooldown = min(self._cooldown * 2, self.max_open_seconds)
+                self._open()
+                return
+            self._failures += 1
+            if state == CLOSED and self._failures >= self.failure_threshold:
+                self._open()
+
+    def snapshot(self) -> dict:
+        """State summary for health reporting."""
+        timeout = self.timeout()
+        with self._lock:
+            state = self._current_state()
+            retry_in = max(0.0, self._opened_at + self._cooldown - time.monotonic()) if state == OPEN else 0.0
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "timeout_sec": round(timeout, 3),
+                "retry_in_sec": round(retry_in, 1),
+            }
+
+    # -----------------------------------------------------------------------
+    # Internal Helpers (caller holds the lock)
+    # -----------------------------------------------------------------------
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self._cooldown:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        # Latencies from before the outage say nothing about the recovered upstream
+        self._latencies.clear()
+        logger.warning(
+            "Circuit '%s' opened after %d failures — failing fast for %.0fs",
+            self.name, self._failures, self._cooldown,
+        )
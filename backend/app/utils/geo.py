@@ -0,0 +1,58 @@
+"""
+Geographic helper utilities.
+"""
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6_371.0
+MERCATOR_MAX_LAT = 85.05112878
+
+
+def haversine_km(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """
+    Great-circle distance in kilometers (vectorized, broadcasts like numpy).
+
+    Args:
+        lat1, lng1: Origin coordinates in degrees (scalars or arrays).
+        lat2, lng2: Destination coordinates in degrees (scalars or arrays).
+
+    Returns:
+        Array of distances in kilometers.
+    """
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lng1, lat2, lng2))
+    a = (
+        np.sin((lat2 - lat1) / 2.0) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2.0) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def lnglat_to_mercator(lng, lat) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Project to normalized Web Mercator (vectorized).
+
+    Returns:
+        (x, y) in [0, 1), origin at the top-left like slippy-map tiles;
+        latitudes beyond ±85.0511° are clamped to the map edge.
+    """
+    lng = np.asarray(lng, dtype=np.float64)
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -MERCATOR_MAX_LAT, MERCATOR_MAX_LAT)
+    x = (lng + 180.0) / 360.0
+    y = 0.5 - np.log(np.tan(np.pi / 4.0 + np.radians(lat) / 2.0)) / (2.0 * np.pi)
+    return np.clip(x, 0.0, np.nextafter(1.0, 0.0)), np.clip(y, 0.0, np.nextafter(1.0, 0.0))
+
+
+def morton_encode(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Interleave the bits of integer tile coordinates (x in even bits, y in
+    odd bits), vectorized. Points in one tile at zoom z share the key
+    prefix, so sorting by key puts every tile's points in one contiguous run.
+    """
+    def spread(v: np.ndarray) -> np.ndarray:
+        v = v.astype(np.uint64) & np.uint64(0xFFFFFFFF)
+        for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF),
+                            (4, 0x0F0F0F0F0F0F0F0F), (2, 0x3333333333333333), (1, 0x5555555555555555)):
+            v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+        return v
+
+    return spread(np.asarray(x)) | (spread(np.asarray(y)) << np.uint64(1))
@@ -0,0 +1,67 @@
+"""
+HTTP conditional-request helpers.
+
+Builds ETags from the data snapshot behind a response (database rows,
+cached weather entries, tanker table) so polling dashboards can revalidate
+with If-None-Match and receive a bodiless 304 when nothing has changed.
+"""
+
+import hashlib
+import json
+
+from fastapi import Request, Response
+
+from app.core.constants import HTTP_CACHE_CONTROL
+
+
+def compute_etag(*parts) -> str:
+    """
+    Derive a strong ETag from one or more JSON-serialisable data parts.
+
+    Args:
+        *parts: The raw inputs a response is computed from.
+
+    Returns:
+        A quoted ETag string, e.g. '"3f2a..."'.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\x1f")
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check whether the client's If-None-Match header matches the given ETag.
+
+    Uses weak comparison (RFC 9110 §13.1.2), so a W/ prefix is ignored.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cache_headers(etag: str) -> dict:
+    """Return the validator and Cache-Control headers for a response."""
+    return {"ETag": etag, "Cache-Control": HTTP_CACHE_CONTROL}
+
+
+def apply_cache_headers(response: Response, etag: str) -> None:
+    """Attach the ETag and Cache-Control headers to an outgoing response."""
+    response.headers.update(cache_headers(etag))
+
+
+def not_modified(etag: str) -> Response:
+    """Build a bodiless 304 Not Modified response for the given ETag."""
+    return Response(status_code=304, headers=cache_headers(etag))
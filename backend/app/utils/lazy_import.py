@@ -0,0 +1,44 @@
+"""
+Deferred imports for heavy client libraries.
+
+    requests = lazy_import("requests")
+
+binds a module proxy that performs the real import on first attribute
+access (e.g. requests.get(...)), so importing the application — and
+therefore a worker's cold start — does not pay for HTTP / database client
+libraries until a request actually needs them.
+"""
+
+import importlib
+import threading
+from types import ModuleType
+
+
+class _LazyModule(ModuleType):
+    """Module proxy that imports its target on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return a proxy for module `name`; the import happens on first use."""
+    return _LazyModule(name)
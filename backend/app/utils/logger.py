@@ -1,9 +1,106 @@
 """
 Application-wide logging configuration.
+
+All loggers returned by get_logger share one pipeline:
+
+    caller ──► QueueHandler ──► bounded queue ──► listener thread ──► stdout
+
+The calling thread only captures the record (message and arguments stay
+unformatted) and the current request ID; formatting and the write happen
+on the listener thread, so a log call never blocks on stdout. When the
+queue is full, records are dropped and counted instead of blocking.
+
+Output is one JSON object per line (settings.LOG_FORMAT="json") or the
+classic "[time] LEVEL name: message" text.
+
+Request correlation: request_id_var holds the ID of the request being
+served (set by the request-context middleware). Threads started with
+asyncio.to_thread inherit it, so service-level logs carry the ID too.
+
+Hot paths (one line per village / tanker) log through a LogSampler, which
+checks the level first and then lets at most LOG_SAMPLE_PER_SECOND lines
+per call site through, reporting how many were suppressed.
 """
 
+import atexit
+import contextvars
+import json
 import logging
+import queue
 import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from app.config import settings
+from app.core.constants import LOG_QUEUE_SIZE, LOG_SAMPLE_BURST, LOG_SAMPLE_PER_SECOND
+from app.utils.rate_limit import TokenBucket
+
+APP_LOGGER = "app"
+
+# ID of the request being served ("-" outside requests)
+request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _AsyncQueueHandler(QueueHandler):
+    """Enqueues records unformatted, tagged with the request ID; drops when full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting is deferred to the listener thread (same process, so
+        # the record does not need to be made picklable)
+        record.request_id = request_id_var.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _build_pipeline() -> tuple[_AsyncQueueHandler, QueueListener]:
+    stream = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter(
+            "[%(asctime)s] %(levelname)s %(name)s [%(request_id)s]: %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        ))
+
+    handler = _AsyncQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    listener = QueueListener(handler.queue, stream, respect_handler_level=False)
+    listener.start()
+    atexit.register(listener.stop)  # flush what is queued on exit
+    return handler, listener
+
+
+_handler, _listener = _build_pipeline()
+
+_app_logger = logging.getLogger(APP_LOGGER)
+_app_logger.addHandler(_handler)
+_app_logger.setLevel(settings.LOG_LEVEL)
+_app_logger.propagate = False
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -18,14 +115,62 @@ def get_logger(name: str) -> logging.Logger:
     """
     logger = logging.getLogger(name)
 
-    if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        formatter = logging.Formatter(
-            "[%(asctime)s] %(levelname)s %(name)s: %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        logger.setLevel(logging.INFO)
+    # Loggers under "app" inherit the pipeline from the "app" logger
+    if name != APP_LOGGER and not name.startswith(APP_LOGGER + ".") and _handler not in logger.handlers:
+        logger.addHandler(_handler)
+        logger.setLevel(settings.LOG_LEVEL)
+        logger.propagate = False
 
     return logger
+
+
+def logging_stats() -> dict:
+    """Pipeline counters for health reporting."""
+    return {"queued": _handler.queue.qsize(), "dropped": _handler.dropped}
+
+
+class LogSampler:
+    """
+    Rate-limited logging for one hot-path call site (thread-safe).
+
+    Records below the logger's level cost one isEnabledFor check. Others
+    pass at up to `per_second` lines per second (with a burst); the next
+    line that passes reports how many were suppressed. ERROR and above are
+    never sampled.
+
+    Usage:
+        _allocation_log = LogSampler(logger)
+        _allocation_log.info("Allocated tanker %s → village %s", tanker_id, village_name)
+    """
+
+    def __init__(self, logger: logging.Logger, per_second: float = LOG_SAMPLE_PER_SECOND, burst: float = LOG_SAMPLE_BURST):
+        self.logger = logger
+        self._bucket = TokenBucket(per_second * 60.0, burst)
+        self._suppressed = 0
+        self._lock = threading.Lock()
+
+    def log(self, level: int, msg: str, *args) -> None:
+        self._log(level, msg, args)
+
+    def debug(self, msg: str, *args) -> None:
+        self._log(logging.DEBUG, msg, args)
+
+    def info(self, msg: str, *args) -> None:
+        self._log(logging.INFO, msg, args)
+
+    def warning(self, msg: str, *args) -> None:
+        self._log(logging.WARNING, msg, args)
+
+    def _log(self, level: int, msg: str, args: tuple) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        if level < logging.ERROR:
+            with self._lock:
+                if self._bucket.take(time.monotonic()) > 0:
+                    self._suppressed += 1
+                    return
+                suppressed, self._suppressed = self._suppressed, 0
+            if suppressed:
+                msg, args = msg + " (+%d similar suppressed)", (*args, suppressed)
+        # stacklevel 3: report the caller of info()/log(), not the sampler
+        self.logger.log(level, msg, *args, stacklevel=3)
@@ -0,0 +1,299 @@
+"""
+Sampling profiler and slow-request capture (stdlib only).
+
+StackSampler snapshots the Python stack of every thread
+(sys._current_frames) at a fixed interval from a background thread. The
+profiled code is not instrumented, so the cost while sampling is one
+stack walk per thread per interval, and nothing at all otherwise.
+
+A Profile (the aggregated samples) can be exported as:
+    folded  — "thread;outer;...;inner count" lines, the input format of
+              flamegraph.pl, speedscope and inferno
+    pstats  — a marshalled stats file readable by pstats.Stats / snakeviz
+              (times are estimated as samples × interval)
+    summary — the top functions by self / total samples, as JSON
+
+Threads blocked waiting for work (idle pool workers, the event loop in
+select, ...) are left out by default, so profiles show where time is
+actually spent; see IDLE_FRAMES.
+
+SlowRequestMonitor captures a profile for any request running longer
+than a threshold. The request middleware only records start times; a
+watchdog thread checks them every SLOW_REQUEST_CHECK_SECONDS and samples
+stacks only while some request is past the threshold. The profile
+therefore covers what the process was doing from the moment the request
+became slow until it finished.
+"""
+
+import marshal
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from app.core.constants import (
+    PROFILE_MAX_STACK_DEPTH,
+    SLOW_REQUEST_CHECK_SECONDS,
+    SLOW_REQUEST_HISTORY,
+    SLOW_REQUEST_MAX_SAMPLES,
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# (filename, first line, function name) — the pstats function key
+FrameKey = tuple[str, int, str]
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _short_path(filename: str) -> str:
+    if "site-packages" + os.sep in filename:
+        return filename.split("site-packages" + os.sep, 1)[1]
+    if filename.startswith(_APP_ROOT):
+        return os.path.relpath(filename, _APP_ROOT)
+    return os.path.basename(filename)
+
+
+# Innermost frames of a thread that is blocked waiting for work, by
+# (file name, function); such samples are dropped unless idle=True
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("pool.py", "_handle_tasks"),
+    ("pool.py", "_handle_results"),
+    ("selectors.py", "select"),
+    ("connection.py", "_recv"),
+    ("connection.py", "_poll"),
+    ("connection.py", "wait"),
+    ("socket.py", "accept"),
+}
+
+PROFILER_THREADS = ("stack-sampler", "slow-request-monitor")
+
+
+def capture_stacks(idle: bool = False) -> list[tuple[str, tuple[FrameKey, ...]]]:
+    """Current stack (outermost first) of every thread but the profiler's own."""
+    names = {t.ident: t.name for t in threading.enumerate()}
+    stacks = []
+    for ident, frame in sys._current_frames().items():
+        name = names.get(ident, str(ident))
+        if name in PROFILER_THREADS:
+            continue
+        if not idle and (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES:
+            continue
+        stack = []
+        while frame is not None and len(stack) < PROFILE_MAX_STACK_DEPTH:
+            code = frame.f_code
+            stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        stack.reverse()
+        stacks.append((name, tuple(stack)))
+    return stacks
+
+
+class Profile:
+    """Aggregated stack samples."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = 0
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.stacks: Counter[tuple[str, tuple[FrameKey, ...]]] = Counter()
+
+    def add(self, stacks: list[tuple[str, tuple[FrameKey, ...]]]) -> None:
+        self.samples += 1
+        self.stacks.update(stacks)
+
+    def to_folded(self) -> str:
+        """Collapsed stacks, one "thread;frame;...;frame count" line each."""
+        lines = []
+        for (thread, stack), count in self.stacks.most_common():
+            frames = ";".join(f"{name} ({_short_path(filename)}:{line})" for filename, line, name in stack)
+            lines.append(f"{thread};{frames} {count}" if frames else f"{thread} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_pstats(self) -> bytes:
+        """
+        Marshalled pstats data (load with pstats.Stats(path)).
+
+        Raises:
+            ValueError: No stack was sampled; pstats cannot load an empty profile.
+        """
+        interval = self.interval
+        stats: dict[FrameKey, list] = {}
+        for (_, stack), count in self.stacks.items():
+            if not stack:
+                continue
+            seen = set()
+            for depth, func in enumerate(stack):
+                entry = stats.setdefault(func, [0, 0, 0.0, 0.0, {}])
+                if func not in seen:  # recursion counts once towards total time
+                    seen.add(func)
+                    entry[0] += count
+                    entry[1] += count
+                    entry[3] += count * interval
+                if depth:
+                    caller = stack[depth - 1]
+                    cc, nc, tt, ct = entry[4].get(caller, (0, 0, 0.0, 0.0))
+                    own = count * interval if depth == len(stack) - 1 else 0.0
+                    entry[4][caller] = (cc + count, nc + count, tt + own, ct + count * interval)
+            stats[stack[-1]][2] += count * interval
+        if not stats:
+            raise ValueError("Profile has no sampled stacks")
+        return marshal.dumps({func: tuple(entry) for func, entry in stats.items()})
+
+    def summary(self, limit: int = 30) -> dict:
+        """
+        Top functions by self and total samples.
+
+        pct is relative to the number of sampling ticks, i.e. the share of
+        wall time some thread was in the function (can exceed 100 when
+        several threads are).
+        """
+        self_counts: Counter[FrameKey] = Counter()
+        total_counts: Counter[FrameKey] = Counter()
+        for (_, stack), count in self.stacks.items():
+            if stack:
+                self_counts[stack[-1]] += count
+            total_counts.update({func: count for func in set(stack)})
+
+        def rows(counter: Counter) -> list[dict]:
+            return [
+                {
+                    "function": f"{name} ({_short_path(filename)}:{line})",
+                    "samples": count,
+                    "pct": round(100.0 * count / self.samples, 1) if self.samples else 0.0,
+                }
+                for (filename, line, name), count in counter.most_common(limit)
+            ]
+
+        return {
+            "samples": self.samples,
+            "interval_ms": round(self.interval * 1000, 3),
+            "duration_sec": round(self.duration, 3),
+            "top_self": rows(self_counts),
+            "top_total": rows(total_counts),
+        }
+
+
+class StackSampler:
+    """Samples all thread stacks into a Profile until stopped."""
+
+    def __init__(self, interval: float, idle: bool = False):
+        self.profile = Profile(interval)
+        self.idle = idle
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        self._thread.join()
+        return self.profile
+
+    def _run(self) -> None:
+        started = time.perf_counter()
+        while not self._stop.wait(self.profile.interval):
+            self.profile.add(capture_stacks(self.idle))
+        self.profile.duration = time.perf_counter() - started
+
+
+class SlowRequestMonitor:
+    """
+    Captures stack profiles of requests slower than threshold_ms.
+
+    begin()/end() are called by the request middleware for every request
+    (a dict insert and delete); the watchdog thread does the rest.
+    """
+
+    def __init__(self, threshold_ms: float, interval: float):
+        self.threshold = threshold_ms / 1000.0
+        self.interval = interval
+        self.captured: deque[dict] = deque(maxlen=SLOW_REQUEST_HISTORY)
+        self._in_flight: dict[int, dict] = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def begin(self, request_id: str, method: str, path: str) -> int | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._seq += 1
+            token = self._seq
+            self._in_flight[token] = {
+                "request_id": request_id, "method": method, "path": path,
+                "started": time.perf_counter(), "profile": None,
+            }
+        return token
+
+    def end(self, token: int | None, status: int | None) -> None:
+        if token is None:
+            return
+        with self._lock:
+            request = self._in_flight.pop(token, None)
+        if request is None:
+            return
+        elapsed = time.perf_counter() - request["started"]
+        if elapsed < self.threshold:
+            return
+
+        profile = request["profile"] or Profile(self.interval)
+        profile.duration = max(0.0, elapsed - self.threshold)
+        self.captured.appendleft({
+            "request_id": request["request_id"],
+            "method": request["method"],
+            "path": request["path"],
+            "status": status,
+            "duration_ms": round(elapsed * 1000, 1),
+            "captured_at": time.time(),
+            "profile": profile,
+        })
+        logger.warning(
+            "Slow request %s %s took %.0f ms (profile: %d samples)",
+            request["method"], request["path"], elapsed * 1000, profile.samples,
+        )
+
+    def get(self, request_id: str) -> dict | None:
+        return next((c for c in list(self.captured) if c["request_id"] == request_id), None)
+
+    def start(self) -> None:
+        if self.enabled and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="slow-request-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        sampling = False
+        while not self._stop.wait(self.interval if sampling else SLOW_REQUEST_CHECK_SECONDS):
+            now = time.perf_counter()
+            with self._lock:
+                slow = [r for r in self._in_flight.values() if now - r["started"] >= self.threshold]
+            sampling = bool(slow)
+            if not sampling:
+                continue
+            stacks = capture_stacks()
+            for request in slow:
+                if request["profile"] is None:
+                    request["profile"] = Profile(self.interval)
+                if request["profile"].samples < SLOW_REQUEST_MAX_SAMPLES:
+                    request["profile"].add(stacks)
@@ -0,0 +1,80 @@
+"""
+Token-bucket rate limiting.
+
+A bucket holds up to `burst` tokens and refills at `rate_per_minute`; each
+request takes one token. Buckets are refilled lazily on access (no timer),
+so checking a limit is a few float operations. When a request must pass
+several buckets, peek them all first and take only if every one allows,
+so a rejection does not drain the buckets that had room.
+"""
+
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """A single token bucket (not thread-safe; used from the event loop)."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate_per_minute: float, burst: float):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def peek(self, now: float | None = None) -> float:
+        """
+        Check for a token without taking it.
+
+        Returns:
+            0.0 if a token is available, else the seconds until one is.
+        """
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def take(self, now: float | None = None) -> float:
+        """
+        Take one token.
+
+        Returns:
+            0.0 if allowed, else the seconds until a token is available.
+        """
+        wait = self.peek(now)
+        if wait == 0.0:
+            self.tokens -= 1.0
+        return wait
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class BucketTable:
+    """Buckets by key, least recently used evicted beyond max_buckets."""
+
+    def __init__(self, rate_per_minute: float, burst: float, max_buckets: int):
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.max_buckets = max_buckets
+        self._buckets: OrderedDict[object, TokenBucket] = OrderedDict()
+
+    def peek(self, key, now: float | None = None) -> float:
+        """Check key's bucket without taking a token (see TokenBucket.peek)."""
+        return self._bucket(key).peek(now)
+
+    def take(self, key, now: float | None = None) -> float:
+        """Take a token from key's bucket (see TokenBucket.take)."""
+        return self._bucket(key).take(now)
+
+    def _bucket(self, key) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate_per_minute, self.burst)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
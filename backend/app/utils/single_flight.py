@@ -0,0 +1,111 @@
+"""
+Request coalescing (single-flight) for expensive read endpoints.
+
+When a critical alert goes out, dozens of officers open the dashboard at
+once and each request recomputes the same status table, allocation plan or
+LLM advisory. A SingleFlight group lets concurrent callers with the same
+key share one in-flight computation: the first caller starts it, later
+callers await the same result, and the key is released as soon as the
+computation finishes (nothing is cached beyond that).
+
+Keys should combine the endpoint, its normalized parameters and the
+version of the data it is computed from (see flight_key), so a request
+arriving after the data changed never receives a stale shared result.
+
+Usage:
+    result = await status_flight.do(key, lambda: compute_async(...))
+
+The shared computation runs as its own task: one caller disconnecting does
+not cancel it for the others, but it is cancelled once every waiter has
+gone away.
+"""
+
+import asyncio
+
+from app.utils.http_cache import compute_etag
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# name → group, for health reporting
+_groups: dict[str, "SingleFlight"] = {}
+
+
+def flight_key(endpoint: str, *parts) -> str:
+    """Coalescing key from an endpoint name plus its params / data versions."""
+    return compute_etag(endpoint, *parts)
+
+
+def flight_stats() -> dict[str, dict]:
+    """Snapshot of every registered single-flight group."""
+    return {name: group.snapshot() for name, group in _groups.items()}
+
+
+class _Call:
+    """One in-flight computation and the number of callers awaiting it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls onto one computation (event-loop only)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[str, _Call] = {}
+        self._started = 0
+        self._shared = 0
+
+        _groups[name] = self
+
+    async def do(self, key: str, fn):
+        """
+        Return the result of fn() for key, joining an in-flight call if any.
+
+        Args:
+            key: Coalescing key (see flight_key).
+            fn: Zero-argument callable returning an awaitable; only invoked
+                when no call for key is in flight.
+
+        Raises:
+            Whatever the shared computation raised (every waiter sees it).
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            self._started += 1
+            call.task.add_done_callback(lambda _task: self._release(key, call))
+        else:
+            self._shared += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.task.done():
+                raise
+            # This caller went away; stop the work only if nobody else wants it
+            call.waiters -= 1
+            if call.waiters == 0:
+                call.task.cancel()
+            raise
+
+    def snapshot(self) -> dict:
+        """Counters for health reporting."""
+        return {
+            "in_flight": len(self._calls),
+            "computations": self._started,
+            "coalesced_requests": self._shared,
+        }
+
+    def _release(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled() and call.task.exception() is not None and call.waiters > 1:
+            logger.warning(
+                "Coalesced call '%s' failed for %d waiters: %s",
+                self.name, call.waiters, call.task.exception(),
+            )
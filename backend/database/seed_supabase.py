@@ -52,6 +52,7 @@ if __name__ == "__main__":
     seed_table(f"{base_dir}/villages.csv", "villages")
     seed_table(f"{base_dir}/groundwater.csv", "groundwater")
     seed_table(f"{base_dir}/tankers.csv", "tankers")
+    seed_table(f"{base_dir}/depots.csv", "depots")
 
     print()
     print("Database seeding complete.")
@@ -42,6 +42,32 @@ export const fetchVillageInsight = async (villageId, lang = "english") => {
   return response.data;
 };
 
+/**
+ * Fetch a village insight in tiers: the instant template advisory first,
+ * then the AI advisory once the backend has generated it.
+ * @param {string} villageId - The village ID.
+ * @param {string} lang - Response language.
+ * @param {Function} onUpdate - Called with each insight response (template, then AI).
+ * @param {Function} isCancelled - Returns true once the caller no longer needs updates.
+ * @returns {Promise<void>} Resolves when the AI advisory arrived or is unavailable.
+ */
+export const fetchTieredInsight = async (villageId, lang, onUpdate, isCancelled = () => false) => {
+  let { data } = await backendClient.get(`/api/villages/${villageId}/insight`, { params: { lang } });
+  if (isCancelled()) return;
+  onUpdate(data);
+  while (data.llm_status === "pending") {
+    await new Promise((resolve) => setTimeout(resolve, (data.retry_after || 3) * 1000));
+    if (isCancelled()) return;
+    try {
+      ({ data } = await backendClient.get(`/api/villages/${villageId}/insight/upgrade`, { params: { lang } }));
+    } catch {
+      return; // Keep showing the template advisory
+    }
+    if (isCancelled()) return;
+    onUpdate(data);
+  }
+};
+
 // -----------------------------------------------------------------------
 // Tanker endpoints
 // -----------------------------------------------------------------------
@@ -1,7 +1,7 @@
 import React, { useState, useRef, useEffect } from 'react';
 import TacticalMap from './TacticalMap';
 import InsightDrawer from './InsightDrawer';
-import api from '../api/backendClient';
+import { fetchTieredInsight } from '../api/backendClient';
 
 export default function MapViewPanel({ villages, loading }) {
     const [selectedVillage, setSelectedVillage] = useState(null);
@@ -12,6 +12,7 @@ export default function MapViewPanel({ villages, loading }) {
     const [language, setLanguage] = useState('English');
     const [containerHeight, setContainerHeight] = useState(0);
     const containerRef = useRef(null);
+    const insightRequest = useRef(0);
 
     // Measure the actual available height using a ref
     useEffect(() => {
@@ -31,38 +32,47 @@ export default function MapViewPanel({ villages, loading }) {
         };
     }, []);
 
-    const handleVillageClick = async (village) => {
-        setSelectedVillage(village);
-        setDrawerOpen(true);
-        setInsight('');
+    // Stop polling for the AI advisory once the panel unmounts
+    useEffect(() => () => { insightRequest.current += 1; }, []);
+
+    // Only the latest request may touch the drawer state; a superseded one
+    // (another village, language or a closed drawer) is ignored entirely
+    const loadInsight = async (village, lang, errorMessage) => {
+        const request = ++insightRequest.current;
+        const isStale = () => request !== insightRequest.current;
         setInsightError(null);
         setInsightLoading(true);
         try {
-            const res = await api.get(`/api/villages/${village.id}/insight?lang=${language}`);
-            setInsight(res.data.insight || 'No insight available.');
+            await fetchTieredInsight(village.id, lang, (data) => {
+                setInsight(data.insight || 'No insight available.');
+                setInsightLoading(false);
+            }, isStale);
         } catch (err) {
-            setInsightError('Failed to generate AI report. Model may be offline.');
+            if (!isStale()) setInsightError(errorMessage);
         } finally {
-            setInsightLoading(false);
+            if (!isStale()) setInsightLoading(false);
         }
     };
 
+    const handleVillageClick = async (village) => {
+        setSelectedVillage(village);
+        setDrawerOpen(true);
+        setInsight('');
+        await loadInsight(village, language, 'Failed to generate AI report. Model may be offline.');
+    };
+
     const handleLanguageChange = async (lang) => {
         setLanguage(lang);
         if (selectedVillage) {
-            setInsightLoading(true);
-            setInsightError(null);
-            try {
-                const res = await api.get(`/api/villages/${selectedVillage.id}/insight?lang=${lang}`);
-                setInsight(res.data.insight || 'No insight available.');
-            } catch (err) {
-                setInsightError('Failed to load insight in selected language.');
-            } finally {
-                setInsightLoading(false);
-            }
+            await loadInsight(selectedVillage, lang, 'Failed to load insight in selected language.');
         }
     };
 
+    const handleDrawerClose = () => {
+        insightRequest.current += 1;
+        setDrawerOpen(false);
+    };
+
     return (
         <div
             ref={containerRef}
@@ -82,7 +92,7 @@ export default function MapViewPanel({ villages, loading }) {
             {drawerOpen && (
                 <InsightDrawer
                     isOpen={drawerOpen}
-                    onClose={() => setDrawerOpen(false)}
+                    onClose={handleDrawerClose}
                     village={selectedVillage}
                     insight={insight}
                     loading={insightLoading}
@@ -1,5 +1,5 @@
-import React, { useState, useEffect } from 'react';
-import api from '../api/backendClient';
+import React, { useState, useEffect, useRef } from 'react';
+import { fetchTieredInsight } from '../api/backendClient';
 
 import DashboardStats from './DashboardStats';
 import VillageGrid from './VillageGrid';
@@ -27,6 +27,7 @@ export default function VillagesPanel({
     const [loadingInsight, setLoadingInsight] = useState(false);
     const [insightLanguage, setInsightLanguage] = useState('English');
     const [insightError, setInsightError] = useState(null);
+    const insightRequest = useRef(0);
 
     const handleAnalyze = async (village) => {
         setSelectedVillage(village);
@@ -34,17 +35,32 @@ export default function VillagesPanel({
         setInsight(null);
         setInsightError(null);
         setLoadingInsight(true);
+        const request = ++insightRequest.current;
+        // A superseded request (another village, language or a closed drawer) is ignored entirely
+        const isStale = () => request !== insightRequest.current;
 
         try {
-            const response = await api.get(`/api/villages/${village.id}/insight?lang=${insightLanguage}`);
-            setInsight(response.data.insight);
+            await fetchTieredInsight(village.id, insightLanguage, (data) => {
+                setInsight(data.insight);
+                setLoadingInsight(false);
+            }, isStale);
         } catch (err) {
-            setInsightError(err.response?.data?.detail || err.message || "Failed to generate AI insight.");
+            if (!isStale()) {
+                setInsightError(err.response?.data?.detail || err.message || "Failed to generate AI insight.");
+            }
         } finally {
-            setLoadingInsight(false);
+            if (!isStale()) setLoadingInsight(false);
         }
     };
 
+    const handleDrawerClose = () => {
+        insightRequest.current += 1;
+        setIsDrawerOpen(false);
+    };
+
+    // Stop polling for the AI advisory once the panel unmounts
+    useEffect(() => () => { insightRequest.current += 1; }, []);
+
     // Re-trigger language update if already open
     useEffect(() => {
         if (selectedVillage && isDrawerOpen) {
@@ -120,7 +136,7 @@ export default function VillagesPanel({
 
             <InsightDrawer
                 isOpen={isDrawerOpen}
-                onClose={() => setIsDrawerOpen(false)}
+                onClose={handleDrawerClose}
                 village={selectedVillage}
                 insight={insight}
                 loading={loadingInsight}